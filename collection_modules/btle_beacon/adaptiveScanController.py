@@ -0,0 +1,91 @@
+"""
+Adapts the BLED112 scan parameters to the load the pipeline sees.
+
+The controller walks a ladder of scan settings.  The first rung is the
+configured interval, window and duplicate filtering.  Every rung after it
+cuts the adverts the device sends: duplicate filtering goes on first if it
+is not on already, then the scan window is halved rung by rung down to the
+configured minimum.
+
+Every period the reader reports its scan responses per second and the
+collection point how full queueBLE is and whether it dropped batches.  The
+controller backs off one rung when the device sends more than the maximum
+rate or the queue is filling up, and steps back one rung when the queue is
+nearly empty and the rate it expects on the more aggressive rung is still
+comfortably under the maximum.  That expectation uses how much the rate
+fell the last time the controller stepped off that rung, so it does not
+bounce between two rungs.
+"""
+
+from collections import namedtuple
+
+# BGAPI scan interval and window are in units of 0.625ms
+SCAN_UNIT = 0.625
+
+def toScanUnits(milliseconds):
+    """Milliseconds to scan units, inside the 0x4 - 0x4000 range the device accepts"""
+    return max(0x4, min(0x4000, int(round(milliseconds/SCAN_UNIT))))
+
+class ScanSettings(namedtuple('ScanSettings', ('interval', 'window', 'duplicateFiltering'))):
+    """Scan interval and window in scan units, and whether the device filters duplicates"""
+    __slots__ = ()
+
+    @property
+    def dutyCycle(self):
+        return self.window/self.interval
+
+    def asDict(self):
+        return {'ScanInterval': self.interval*SCAN_UNIT, 'ScanWindow': self.window*SCAN_UNIT,
+            'DutyCycle': self.dutyCycle, 'DuplicateFiltering': self.duplicateFiltering}
+
+class AdaptiveScanController(object):
+    # queueBLE fill at which the controller backs off, and below which it may scan harder again
+    QUEUE_HIGH = .5
+    QUEUE_LOW = .1
+    # only step back when the expected rate leaves this much headroom under the maximum
+    HEADROOM = .8
+
+    def __init__(self, settings, minWindow, maxRate):
+        self.maxRate = maxRate
+        self.levels = [settings]
+        if not settings.duplicateFiltering:
+            self.levels.append(ScanSettings(settings.interval, settings.window, True))
+        window = settings.window
+        while window//2 >= max(minWindow, 0x4):
+            window //= 2
+            self.levels.append(ScanSettings(settings.interval, window, True))
+        # how much the rate drops stepping onto each rung, measured, starting from the duty cycle
+        self.gains = [1.0]
+        for previous, level in zip(self.levels, self.levels[1:]):
+            self.gains.append(previous.window/level.window)
+        self.level = 0
+        self.pendingGain = None # (level, rate before stepping onto it) until the next update measures it
+        self.changes = 0
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def update(self, rate, queueFill, dropped=False):
+        """Feed the scan responses per second, the queue fill (0-1) and whether the queue dropped
+        since the last update.  Returns (settings, reason) when the device should be reprogrammed,
+        else None"""
+        if self.pendingGain is not None:
+            level, rateBefore = self.pendingGain
+            # nothing heard says nothing about the gain, keep the estimate
+            if rate > 0:
+                self.gains[level] = max(1.0, rateBefore/rate)
+            self.pendingGain = None
+
+        if rate > self.maxRate or queueFill >= self.QUEUE_HIGH or dropped:
+            if self.level + 1 < len(self.levels):
+                self.level += 1
+                self.pendingGain = (self.level, rate)
+                self.changes += 1
+                return self.settings, 'saturated'
+        elif self.level > 0 and queueFill <= self.QUEUE_LOW:
+            if rate*self.gains[self.level] < self.maxRate*self.HEADROOM:
+                self.level -= 1
+                self.changes += 1
+                return self.settings, 'quiet'
+        return None
@@ -0,0 +1,126 @@
+"""
+Bounded in-process channel between the BTLE reader threads and the collection loop.
+
+The readers and BtleCollectionPoint.run are threads of the same process, so
+the batches they pass around do not need to be pickled and pushed through a
+pipe the way multiprocessing.Queue does.  AdvertChannel is a ring buffer on a
+deque with the get/put/empty/qsize interface of queue.Queue.  When it is full
+a put either drops the oldest item, drops the new item, or blocks until the
+consumer makes room.  Drops and the high-water mark are counted in items,
+which for queueBLE are batches of detected clients.
+
+shutdown() queues SHUTDOWN past the bound and whatever the policy, so a
+consumer blocked in get() always wakes up to stop.  After it the channel is
+closed: puts are dropped and counted, so a reader still flushing its last
+batch can never push the sentinel out of the ring.
+"""
+
+from collections import deque
+import queue
+import threading
+import time
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+BLOCK = 'block'
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+# handed to the consumer after everything already queued
+SHUTDOWN = object()
+
+class AdvertChannel(object):
+    def __init__(self, maxsize, overflowPolicy=DROP_OLDEST):
+        if overflowPolicy not in OVERFLOW_POLICIES:
+            raise ValueError("overflow policy must be one of %s, not %s" % (', '.join(OVERFLOW_POLICIES), overflowPolicy))
+        if maxsize < 1:
+            raise ValueError("channel size must be at least 1, not %s" % maxsize)
+        self.maxsize = maxsize
+        self.overflowPolicy = overflowPolicy
+        self.items = deque()
+        self.lock = threading.Lock()
+        self.notEmpty = threading.Condition(self.lock)
+        self.notFull = threading.Condition(self.lock)
+        self.closed = False
+
+        # Counters
+        self.totalPuts = 0
+        self.totalDropped = 0
+        self.highWaterMark = 0
+
+    def put(self, item, block=True, timeout=None):
+        """Add item, applying the overflow policy when the channel is full.
+        With the block policy queue.Full is raised if there is still no room
+        after timeout seconds, or straight away when block is False.  Once
+        the channel is shut down the item is dropped."""
+        with self.lock:
+            if not self.closed and len(self.items) >= self.maxsize:
+                if self.overflowPolicy == DROP_NEWEST:
+                    self.totalDropped += 1
+                    return
+                elif self.overflowPolicy == DROP_OLDEST:
+                    self.items.popleft()
+                    self.totalDropped += 1
+                else:
+                    self.__waitForRoom(block, timeout)
+            if self.closed:
+                self.totalDropped += 1
+                return
+
+            self.items.append(item)
+            self.totalPuts += 1
+            if len(self.items) > self.highWaterMark:
+                self.highWaterMark = len(self.items)
+            self.notEmpty.notify()
+
+    def __waitForRoom(self, block, timeout):
+        if not block:
+            raise queue.Full
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while len(self.items) >= self.maxsize and not self.closed:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise queue.Full
+            self.notFull.wait(remaining)
+
+    def shutdown(self):
+        """Queue the SHUTDOWN sentinel behind everything already waiting and
+        close the channel to further puts"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.items.append(SHUTDOWN)
+            self.notEmpty.notify()
+            # blocked puts wake up to drop their item
+            self.notFull.notify_all()
+
+    def get(self, block=True, timeout=None):
+        """Remove and return the oldest item, raises queue.Empty like queue.Queue"""
+        with self.lock:
+            if not block:
+                if not self.items:
+                    raise queue.Empty
+            elif timeout is None:
+                while not self.items:
+                    self.notEmpty.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while not self.items:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self.notEmpty.wait(remaining)
+            item = self.items.popleft()
+            self.notFull.notify()
+            return item
+
+    def qsize(self):
+        return len(self.items)
+
+    def empty(self):
+        return not self.items
+
+    def getStats(self):
+        """Depth, high-water mark and drop counts since the channel was created"""
+        return {'Depth': len(self.items), 'MaxSize': self.maxsize, 'OverflowPolicy': self.overflowPolicy,
+            'HighWaterMark': self.highWaterMark, 'TotalPuts': self.totalPuts, 'TotalDropped': self.totalDropped}
@@ -0,0 +1,48 @@
+"""
+Merges the advert streams of several BTLE devices.
+
+Adverts are collected for a short window that opens with the first advert
+after a flush.  Within a window each beacon MAC keeps only its strongest
+advert, so the event manager sees one detected client per beacon per window
+no matter how many devices heard it.
+"""
+
+import time
+
+class AdvertDeduplicator(object):
+    def __init__(self, windowInMilliseconds):
+        self.window = windowInMilliseconds/1000
+        self.pending = {} # beacon mac -> strongest detected client this window
+        self.windowEnd = None
+        self.totalAdverts = 0
+        self.totalDuplicates = 0
+
+    def add(self, detectedClient, now=None):
+        if self.windowEnd is None:
+            self.windowEnd = (time.time() if now is None else now) + self.window
+        self.totalAdverts += 1
+
+        mac = detectedClient.extraData['beaconMac']
+        kept = self.pending.get(mac)
+        if kept is None:
+            self.pending[mac] = detectedClient
+        else:
+            self.totalDuplicates += 1
+            if detectedClient.extraData['rssi'] > kept.extraData['rssi']:
+                self.pending[mac] = detectedClient
+
+    def timeUntilFlush(self, now=None):
+        """Seconds until the open window closes, None if there is nothing pending"""
+        if self.windowEnd is None:
+            return None
+        return max(0, self.windowEnd - (time.time() if now is None else now))
+
+    def flushDue(self, now=None):
+        return self.windowEnd is not None and (time.time() if now is None else now) >= self.windowEnd
+
+    def flush(self):
+        """Close the window and return the strongest advert of every beacon seen in it"""
+        detectedClients = list(self.pending.values())
+        self.pending = {}
+        self.windowEnd = None
+        return detectedClients
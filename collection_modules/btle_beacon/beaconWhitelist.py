@@ -0,0 +1,74 @@
+"""
+Known beacon MACs for the BLED112 whitelist.
+
+The list starts from btle_whitelist and the MACs in btle_whitelist_file, one
+per line.  In learn and enforce mode every beacon that registers is added
+and appended to the file, so the beacons a gateway has seen carry over to
+its next start.  In enforce mode the devices only report advertisers on the
+list, everything else nearby is dropped by the radio before it reaches the
+serial link.
+
+MACs are kept the way IBeaconDecoder reports them, 12 upper case hex digits
+most significant byte first.  Colons and dashes are accepted in the config.
+"""
+
+import os.path
+import re
+
+OFF = 'off'
+LEARN = 'learn'
+ENFORCE = 'enforce'
+WHITELIST_MODES = (OFF, LEARN, ENFORCE)
+
+def normalizeMac(mac):
+    """'aa:bb:cc:dd:ee:ff' -> 'AABBCCDDEEFF', None if it is not a MAC"""
+    mac = re.sub(r'[:\-\s]', '', mac).upper()
+    if not re.match(r'^[0-9A-F]{12}$', mac):
+        return None
+    return mac
+
+def macToAddress(mac):
+    """The little endian bd_addr the BGAPI whitelist commands take"""
+    return bytes.fromhex(mac)[::-1]
+
+class BeaconWhitelist(object):
+    def __init__(self, mode, macs=(), path=""):
+        if mode not in WHITELIST_MODES:
+            raise ValueError("whitelist mode must be one of %s, not %s" % (', '.join(WHITELIST_MODES), mode))
+        self.mode = mode
+        self.path = path
+        self.macs = [] # in the order they became known, the order the devices get them
+        self._known = set()
+        for mac in macs:
+            self.__remember(mac)
+        if self.path and os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    self.__remember(line)
+
+    def __remember(self, mac):
+        mac = normalizeMac(mac)
+        if mac is None or mac in self._known:
+            return None
+        self._known.add(mac)
+        self.macs.append(mac)
+        return mac
+
+    def add(self, mac):
+        """Remember a registered beacon, returns its normalized MAC if it was not known yet, else None"""
+        if self.mode == OFF:
+            return None
+        mac = self.__remember(mac)
+        if mac is not None and self.path:
+            with open(self.path, 'a') as f:
+                f.write(mac + '\n')
+        return mac
+
+    def enforced(self):
+        return self.mode == ENFORCE
+
+    def __contains__(self, mac):
+        return normalizeMac(mac) in self._known
+
+    def __len__(self):
+        return len(self.macs)
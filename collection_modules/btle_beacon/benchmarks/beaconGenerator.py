@@ -0,0 +1,206 @@
+"""
+Synthetic iBeacon traffic as real BGAPI frames.
+
+BeaconTrafficGenerator simulates N virtual iBeacons and yields the
+ble_evt_gap_scan_response packets a BLED112 would send for them.  Every
+beacon advertises at its own rate with the up to 10ms random delay the BLE
+spec adds to each advertising event, its RSSI does a random walk inside a
+range, and beacons leave and come back at a configurable churn rate.
+
+The traffic can be written to a capture file for btle_replay_file and
+replayBenchmark, to a raw byte stream for dispatchBenchmark, or played in
+real time on a pty that the module can open like a BLED112.  On a pty the
+command responses the scanner waits for during setup are answered too.
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.beaconGenerator --beacons 1000 --rate 10 --duration 10 --capture load.bgcap
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.beaconGenerator --beacons 1000 --rate 10 --pty
+"""
+
+import argparse
+import heapq
+import os
+import random
+import struct
+import threading
+import time
+import tty
+from simplesensor.collection_modules.btle_beacon.libs.bglib.ble import PACKETS
+from simplesensor.collection_modules.btle_beacon.devices.bluegiga.serialCapture import CaptureWriter
+from simplesensor.collection_modules.btle_beacon.benchmarks.dispatchBenchmark import scanResponsePacket, scanSetupResponses
+
+
+# a capture answers each setup command 10ms after the last and the adverts start after that,
+# so a real-time replay hands the scanner one response per command like the device does
+SETUP_STEP = 0.01
+SETUP_TIME = 0.1
+
+
+class VirtualBeacon(object):
+    __slots__ = ('mac', 'rssi', 'present')
+
+    def __init__(self, mac, rssi):
+        self.mac = mac
+        self.rssi = rssi
+        self.present = True
+
+
+class BeaconTrafficGenerator(object):
+    """Yields (secondsSinceStart, packet) for a room of virtual iBeacons, in time order.
+
+    rate is adverts per second per beacon.  rssi does a gaussian random walk
+    with rssiStep dB per advert inside rssiRange.  churn is the fraction of
+    the present beacons that leave each second, each one comes back after an
+    absence averaging absence seconds.
+    """
+
+    def __init__(self, beacons, uuid=bytes(range(16)), major=10, minor=20, txPower=-59, rate=10,
+            rssiRange=(-95, -40), rssiStep=2, churn=0, absence=30, seed=1):
+        self.random = random.Random(seed)
+        self.uuid = uuid
+        self.major = major
+        self.minor = minor
+        self.txPower = txPower
+        self.interval = 1/rate
+        self.rssiRange = rssiRange
+        self.rssiStep = rssiStep
+        self.leaveChance = churn/rate
+        self.absence = absence
+        self.beacons = [VirtualBeacon(bytes(self.random.randrange(256) for _ in range(6)),
+            self.random.randint(*rssiRange)) for _ in range(beacons)]
+
+    def adverts(self, duration):
+        rnd = self.random
+        low, high = self.rssiRange
+        # (next advertising event, beacon index), beacons start out of phase
+        schedule = [(rnd.random()*self.interval, i) for i in range(len(self.beacons))]
+        heapq.heapify(schedule)
+        while schedule and schedule[0][0] < duration:
+            at, i = schedule[0]
+            beacon = self.beacons[i]
+            if not beacon.present:
+                beacon.present = True
+            elif self.leaveChance and rnd.random() < self.leaveChance:
+                beacon.present = False
+                heapq.heapreplace(schedule, (at + rnd.expovariate(1/self.absence), i))
+                continue
+            else:
+                beacon.rssi = min(high, max(low, beacon.rssi + int(round(rnd.gauss(0, self.rssiStep)))))
+                yield at, scanResponsePacket(beacon.mac, beacon.rssi, self.major, self.minor, self.txPower, self.uuid)
+            heapq.heapreplace(schedule, (at + self.interval + rnd.random()*0.01, i))
+
+    def chunks(self, duration, chunkInterval=0.001):
+        """Adverts grouped into the serial reads a BLED112 would produce, chunkInterval seconds apart"""
+        pending = []
+        chunkEnd = chunkInterval
+        for at, packet in self.adverts(duration):
+            if at >= chunkEnd:
+                if pending:
+                    yield chunkEnd, b''.join(pending)
+                    pending = []
+                chunkEnd = (int(at/chunkInterval) + 1)*chunkInterval
+            pending.append(packet)
+        if pending:
+            yield chunkEnd, b''.join(pending)
+
+    def writeCapture(self, path, duration):
+        """Write a capture file that opens with the setup responses, returns the bytes written"""
+        writer = CaptureWriter(path, startTime=0)
+        written = 0
+        for i, response in enumerate(scanSetupResponses()):
+            writer.write(response, now=i*SETUP_STEP)
+        for at, chunk in self.chunks(duration):
+            writer.write(chunk, now=SETUP_TIME + at)
+            written += len(chunk)
+        writer.close()
+        return written
+
+    def writeRaw(self, path, duration):
+        with open(path, 'wb') as f:
+            for _, chunk in self.chunks(duration):
+                f.write(chunk)
+
+    def playOnPty(self, fd, duration):
+        """Write the adverts to fd in real time, returns the number of bytes sent"""
+        sent = 0
+        start = time.perf_counter()
+        for at, chunk in self.chunks(duration):
+            delay = at - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+            os.write(fd, chunk)
+            sent += len(chunk)
+        return sent
+
+
+def commandResponse(command):
+    """A successful response to a BGAPI command, every field zero"""
+    key = (0x00, command[2], command[3])
+    fmt = PACKETS[key][1] if key in PACKETS else None
+    payload = bytes(struct.calcsize(fmt)) if fmt else b''
+    return bytes([0x00, len(payload), command[2], command[3]]) + payload
+
+
+def answerCommands(fd, stop):
+    """Reply to whatever commands the scanner writes to the pty"""
+    buffer = b''
+    while not stop.is_set():
+        try:
+            buffer += os.read(fd, 256)
+        except OSError:
+            return
+        while len(buffer) >= 4 and len(buffer) >= 4 + (((buffer[0] & 0x07) << 8) | buffer[1]):
+            length = 4 + (((buffer[0] & 0x07) << 8) | buffer[1])
+            os.write(fd, commandResponse(buffer[:length]))
+            buffer = buffer[length:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--beacons', type=int, default=1000)
+    parser.add_argument('--rate', type=float, default=10, help='adverts per second per beacon')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of traffic')
+    parser.add_argument('--uuid', default='000102030405060708090a0b0c0d0e0f', help='proximity uuid as 32 hex digits')
+    parser.add_argument('--major', type=int, default=10)
+    parser.add_argument('--minor', type=int, default=20)
+    parser.add_argument('--tx-power', type=int, default=-59, help='measured power at 1m')
+    parser.add_argument('--rssi-min', type=int, default=-95)
+    parser.add_argument('--rssi-max', type=int, default=-40)
+    parser.add_argument('--rssi-step', type=float, default=2, help='std deviation of the rssi walk per advert, dB')
+    parser.add_argument('--churn', type=float, default=0, help='fraction of beacons leaving per second')
+    parser.add_argument('--absence', type=float, default=30, help='mean seconds a beacon stays away')
+    parser.add_argument('--seed', type=int, default=1)
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--capture', help='write a capture file for btle_replay_file or replayBenchmark')
+    output.add_argument('--raw', help='write the raw byte stream, as dispatchBenchmark --capture reads it')
+    output.add_argument('--pty', action='store_true', help='play in real time on a pty, point btle_device_id at it')
+    args = parser.parse_args()
+
+    generator = BeaconTrafficGenerator(args.beacons, uuid=bytes.fromhex(args.uuid), major=args.major,
+        minor=args.minor, txPower=args.tx_power, rate=args.rate, rssiRange=(args.rssi_min, args.rssi_max),
+        rssiStep=args.rssi_step, churn=args.churn, absence=args.absence, seed=args.seed)
+    print("%d beacons at %g adverts/s each, about %d adverts/s for %gs" % (args.beacons, args.rate,
+        args.beacons*args.rate, args.duration))
+
+    if args.capture:
+        written = generator.writeCapture(args.capture, args.duration)
+        print("wrote %d bytes of adverts to %s" % (written, args.capture))
+    elif args.raw:
+        generator.writeRaw(args.raw, args.duration)
+        print("wrote %s" % args.raw)
+    else:
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        stop = threading.Event()
+        threading.Thread(target=answerCommands, args=(master, stop), daemon=True).start()
+        print("btle_device_id:%s" % os.ttyname(slave))
+        input("start the module, then press enter to start the adverts ")
+        try:
+            sent = generator.playOnPty(master, args.duration)
+            print("sent %d bytes" % sent)
+        finally:
+            stop.set()
+            os.close(master)
+            os.close(slave)
+
+if __name__ == '__main__':
+    main()
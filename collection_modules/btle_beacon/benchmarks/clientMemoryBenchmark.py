@@ -0,0 +1,73 @@
+"""
+Memory of the registered clients at a large venue.
+
+Registers --clients beacons, one BtleRegisteredClient each, the way
+EventManager does, and measures with tracemalloc what they hold on top of
+the detected clients they were made from:
+
+    bytes/client   everything a client allocates, its rssi filter included
+    filter bytes   the rssi filter's share of that
+    shared bytes   the BtleClientSettings every client points at, paid once
+    update us      updateWithNewDetectedClientData plus the in and out checks
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.clientMemoryBenchmark
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.clientMemoryBenchmark --clients 10000 --filters average kalman
+"""
+
+import argparse
+import multiprocessing as mp
+import time
+import tracemalloc
+from simplesensor.collection_modules.btle_beacon import moduleConfigLoader as configLoader
+from simplesensor.collection_modules.btle_beacon.btleRegisteredClient import BtleRegisteredClient, BtleClientSettings
+from simplesensor.collection_modules.btle_beacon.detectedClient import DetectedClient
+from simplesensor.collection_modules.btle_beacon.rssiFilter import RSSI_FILTERS, createRssiFilter
+from simplesensor.collection_modules.btle_beacon.benchmarks.replayBenchmark import drain
+
+
+def traced(build):
+    """What build() allocates and keeps, and what it returned"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+def run(config, loggingQueue, detectedClients):
+    count = len(detectedClients)
+    shared, settings = traced(lambda: BtleClientSettings(config, loggingQueue))
+    size, clients = traced(lambda: [BtleRegisteredClient(detectedClient, settings) for detectedClient in detectedClients])
+    filterSize, _ = traced(lambda: [createRssiFilter(config) for _ in range(count)])
+
+    start = time.perf_counter()
+    for client, detectedClient in zip(clients, detectedClients):
+        client.updateWithNewDetectedClientData(detectedClient)
+        client.shouldSendClientInEvent()
+        client.shouldSendClientOutEvent()
+    elapsed = time.perf_counter() - start
+    return size/count, filterSize/count, shared, elapsed/count*1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--clients', type=int, default=100000)
+    parser.add_argument('--filters', nargs='+', default=list(RSSI_FILTERS), help='btle_rssi_filter values')
+    args = parser.parse_args()
+
+    loggingQueue = mp.Queue()
+    stopDraining = drain(loggingQueue)
+    try:
+        config = configLoader.load(loggingQueue, __name__)
+        detectedClients = [DetectedClient('btle', '%032X' % (i % 10 + 1), '%012X' % i, config['BtleAdvertisingMajor'],
+            config['BtleAdvertisingMinor'], -59, -60, config['BtleDeviceId']) for i in range(args.clients)]
+        print("%8s %13s %13s %13s %10s" % ('filter', 'bytes/client', 'filter bytes', 'shared bytes', 'update us'))
+        for kind in args.filters:
+            config['BtleRssiFilter'] = kind
+            perClient, perFilter, shared, update = run(config, loggingQueue, detectedClients)
+            print("%8s %13.0f %13.0f %13d %10.2f" % (kind, perClient, perFilter, shared, update))
+    finally:
+        stopDraining()
+
+if __name__ == '__main__':
+    main()
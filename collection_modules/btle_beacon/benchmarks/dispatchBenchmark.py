@@ -0,0 +1,142 @@
+"""
+Per-packet cost of BGAPI packet dispatch on scan-response traffic.
+
+Compares the dispatch table (precompiled structs and generated decoders) with
+a replica of the old if/elif walk for ble_evt_gap_scan_response, which tested
+the message type, six packet classes and the command before calling
+struct.unpack with a format string.  Decode is timed on its own and as part
+of parse_packet with one subscribed handler, and parse_packet is timed once
+more with nobody subscribed, where the payload is never unpacked.
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.dispatchBenchmark
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.dispatchBenchmark --capture scan.bin
+
+A capture is the raw byte stream read from a BLED112 while scanning.
+"""
+
+import argparse
+import random
+import struct
+import time
+from simplesensor.collection_modules.btle_beacon.libs import BGLib
+
+
+def scanResponsePacket(mac, rssi, major, minor, txPower, uuid=bytes(range(16))):
+    """Build a ble_evt_gap_scan_response packet carrying an iBeacon advertisement."""
+    advData = (bytes([0x02, 0x01, 0x06, 0x1A, 0xFF, 0x4C, 0x00, 0x02, 0x15])
+        + uuid
+        + struct.pack('>HHb', major, minor, txPower))
+    payload = struct.pack('<bB6sBBB', rssi, 0, mac, 0, 0xFF, len(advData)) + advData
+    return bytes([0x80, len(payload), 6, 0]) + payload
+
+
+def responsePacket(packetClass, command, payload):
+    """Build a BGAPI command response packet."""
+    return bytes([0x00, len(payload), packetClass, command]) + payload
+
+
+def scanSetupResponses():
+    """What a BLED112 answers to BtleThreadCollectionPoint.scanSetupCommands, in order."""
+    return [
+        responsePacket(3, 0, struct.pack('<BH', 0, 0)), # connection_disconnect
+        responsePacket(6, 1, struct.pack('<H', 0)),     # gap_set_mode
+        responsePacket(6, 4, struct.pack('<H', 0)),     # gap_end_procedure
+        responsePacket(3, 2, struct.pack('<BH', 0, 0)), # connection_update
+        responsePacket(6, 6, struct.pack('<H', 0)),     # gap_set_filtering
+        responsePacket(6, 7, struct.pack('<H', 0)),     # gap_set_scan_parameters
+        responsePacket(6, 2, struct.pack('<H', 0)),     # gap_discover
+    ]
+
+
+def syntheticTraffic(count, beacons=200, seed=1):
+    rnd = random.Random(seed)
+    macs = [bytes(rnd.randrange(256) for _ in range(6)) for _ in range(beacons)]
+    return [scanResponsePacket(rnd.choice(macs), rnd.randint(-95, -40), 10, 20, -59) for _ in range(count)]
+
+
+def capturedTraffic(path):
+    """Split a raw capture into packets with the BGLib framer."""
+    packets = []
+    ble = BGLib()
+    ble.parse_packet = packets.append
+    with open(path, 'rb') as f:
+        ble.feed(f.read())
+    return packets
+
+
+def legacyDecode(packet):
+    """Replica of the old if/elif walk, as taken by a scan response."""
+    packet_type, payload_length, packet_class, packet_command = packet[:4]
+    payload = packet[4:]
+    if packet_type & 0x88 == 0x00:
+        return
+    elif packet_type & 0x88 == 0x80:
+        if packet_class == 0:
+            return
+        elif packet_class == 1:
+            return
+        elif packet_class == 2:
+            return
+        elif packet_class == 3:
+            return
+        elif packet_class == 4:
+            return
+        elif packet_class == 5:
+            return
+        elif packet_class == 6:
+            if packet_command == 0:
+                rssi, packet_type, sender, address_type, bond, data_len = struct.unpack('<bB6sBBB', payload[:11])
+                sender = sender
+                data_data = payload[11:]
+                return { 'rssi': rssi, 'packet_type': packet_type, 'sender': sender, 'address_type': address_type, 'bond': bond, 'data': data_data }
+
+
+def tableDecoder(decoders):
+    """The lookup and decode half of BGLib.parse_packet."""
+    def tableDecode(packet):
+        return decoders[(packet[0] & 0x88, packet[2], packet[3])].decode(packet)
+    return tableDecode
+
+
+def timePerPacket(parse, packets, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for packet in packets:
+            parse(packet)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(packets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--capture', help='raw BLED112 byte stream to replay')
+    parser.add_argument('--packets', type=int, default=100000, help='synthetic packet count')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    packets = capturedTraffic(args.capture) if args.capture else syntheticTraffic(args.packets)
+    received = []
+    ble = BGLib()
+    ble.ble_evt_gap_scan_response += lambda sender, earg: received.append(earg)
+
+    def legacyParse(packet):
+        ble.ble_evt_gap_scan_response(legacyDecode(packet))
+
+    results = [
+        ('decode, if/elif chain', timePerPacket(legacyDecode, packets, args.rounds)),
+        ('decode, dispatch table', timePerPacket(tableDecoder(ble.packet_decoders), packets, args.rounds)),
+        ('parse, if/elif chain', timePerPacket(legacyParse, packets, args.rounds)),
+        ('parse, dispatch table', timePerPacket(ble.parse_packet, packets, args.rounds)),
+        ('parse, no subscribers', timePerPacket(BGLib().parse_packet, packets, args.rounds)),
+    ]
+
+    print("packets: %d" % len(packets))
+    for name, perPacket in results:
+        print("%-24s %6.0f ns/packet" % (name, perPacket * 1e9))
+    print("decode speedup: %.2fx" % (results[0][1] / results[1][1]))
+    print("parse speedup:  %.2fx" % (results[2][1] / results[3][1]))
+
+if __name__ == '__main__':
+    main()
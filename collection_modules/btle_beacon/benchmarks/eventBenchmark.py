@@ -0,0 +1,115 @@
+"""
+Per-fire cost of the BGLib and registry events.
+
+LegacyEvent below is the descriptor both used to share: every attribute
+access built a handler object and every fire went through a try/except
+and a setdefault on obj.__eventhandler__.  BGAPIEvent and RegistryEvent
+cache the handler on the instance instead and fire from a tuple.  Each is
+timed with 0, 1 and 3 do-nothing handlers:
+
+    attribute    obj.event(arg), the way the registry and BGLib fire on_idle
+    dispatch     the parse_packet path, check for subscribers then fire
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.eventBenchmark
+"""
+
+import argparse
+import timeit
+from simplesensor.collection_modules.btle_beacon.libs.bglib import BGAPIEvent
+from simplesensor.collection_modules.btle_beacon.registeredClientRegistry import RegistryEvent
+
+
+class LegacyEvent(object):
+
+    def __init__(self, doc=None):
+        self.__doc__ = doc
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return LegacyEventHandler(self, obj)
+
+    def __set__(self, obj, value):
+        pass
+
+
+class LegacyEventHandler(object):
+
+    def __init__(self, event, obj):
+        self.event = event
+        self.obj = obj
+
+    def _getfunctionlist(self):
+        try:
+            eventhandler = self.obj.__eventhandler__
+        except AttributeError:
+            eventhandler = self.obj.__eventhandler__ = {}
+        return eventhandler.setdefault(self.event, [])
+
+    def add(self, func):
+        self._getfunctionlist().append(func)
+        return self
+
+    def fire(self, earg=None):
+        for func in self._getfunctionlist():
+            func(self.obj, earg)
+
+    __iadd__ = add
+    __call__ = fire
+
+
+class Legacy(object):
+    event = LegacyEvent()
+
+class Bglib(object):
+    event = BGAPIEvent()
+
+class Registry(object):
+    event = RegistryEvent()
+
+
+def handler(sender, args):
+    pass
+
+
+def legacyDispatch(obj):
+    descriptor = type(obj).__dict__['event']
+    def dispatch(args):
+        handlers = obj.__dict__.get('__eventhandler__')
+        if handlers and handlers.get(descriptor):
+            LegacyEventHandler(descriptor, obj).fire(args)
+    return dispatch
+
+def cachedDispatch(obj):
+    def dispatch(args):
+        cached = obj.__dict__.get('event')
+        if cached is not None and cached.handlers:
+            cached.fire(args)
+    return dispatch
+
+
+def perCall(function, number):
+    return min(timeit.repeat(lambda: function(None), number=number, repeat=5))/number*1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--fires', type=int, default=200000)
+    args = parser.parse_args()
+
+    print("%-10s %-9s %9s %13s %13s" % ('handlers', 'event', 'legacy ns', 'BGAPIEvent ns', 'Registry ns'))
+    for count in (0, 1, 3):
+        objects = [Legacy(), Bglib(), Registry()]
+        for obj in objects:
+            obj.event # the first lookup creates the handler list
+            for _ in range(count):
+                obj.event += handler
+        legacy, bglib, registry = objects
+        attribute = [perCall(lambda a, obj=obj: obj.event(a), args.fires) for obj in objects]
+        dispatch = [perCall(legacyDispatch(legacy), args.fires), perCall(cachedDispatch(bglib), args.fires),
+            perCall(cachedDispatch(registry), args.fires)]
+        print("%-10d %-9s %9.0f %13.0f %13.0f" % ((count, 'attribute') + tuple(attribute)))
+        print("%-10d %-9s %9.0f %13.0f %13.0f" % ((count, 'dispatch') + tuple(dispatch)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Import time and memory of the BGLib package.
+
+Every scenario runs in a fresh interpreter and reports the wall time and the
+resident memory added by importing BGLib and loading the listed command sets:
+
+    import      the package alone
+    ble         plus the BLE command set, what a scanner process pays
+    ble+wifi    plus the Wi-Fi command set, the size of the old single module
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.importBenchmark
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.importBenchmark --path old/bglib.py
+
+--path also accepts a single-module BGLib (the layout before the split), which
+loads everything on import.  Memory is read from /proc, so this needs Linux.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = (('import', ()), ('ble', ('ble',)), ('ble+wifi', ('ble', 'wifi')))
+
+CHILD = '''
+import importlib.util, os, sys, time
+
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+path, sets = sys.argv[1], sys.argv[2:]
+if os.path.isdir(path):
+    spec = importlib.util.spec_from_file_location('bglib', os.path.join(path, '__init__.py'), submodule_search_locations=[path])
+else:
+    spec = importlib.util.spec_from_file_location('bglib', path)
+before = rss()
+start = time.perf_counter()
+module = importlib.util.module_from_spec(spec)
+sys.modules['bglib'] = module
+spec.loader.exec_module(module)
+if hasattr(module.BGLib, 'load_command_set'):
+    for technology in sets:
+        module.BGLib.load_command_set(technology)
+elapsed = time.perf_counter() - start
+print(elapsed, rss() - before)
+'''
+
+
+def measure(path, sets, runs):
+    times, sizes = [], []
+    for _ in range(runs):
+        out = subprocess.check_output([sys.executable, '-c', CHILD, path] + list(sets))
+        elapsed, size = out.split()
+        times.append(float(elapsed))
+        sizes.append(int(size))
+    return statistics.median(times), statistics.median(sizes)
+
+
+def main():
+    default = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'libs', 'bglib')
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--path', default=os.path.normpath(default), help='BGLib package directory or module file')
+    parser.add_argument('--runs', type=int, default=9)
+    args = parser.parse_args()
+
+    # warm up so byte-compiling is not part of the first measurement
+    measure(args.path, ('ble', 'wifi'), 1)
+
+    print(args.path)
+    for name, sets in SCENARIOS:
+        elapsed, size = measure(args.path, sets, args.runs)
+        print("%-10s %7.2f ms %8.0f KiB" % (name, elapsed * 1000, size / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Where the scanner pipeline saturates under real-time synthetic load.
+
+For each offered load a BeaconTrafficGenerator capture is replayed at the
+recorded pace through the module pipeline (see replayBenchmark).  A stage
+keeps up while it finishes within a moment of the last advert; the lag
+columns show how far behind the reader (BGLib and eventScanResponse) and the
+event manager (EventManager.registerDetectedClient and the registry) were
+when the traffic stopped.
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.loadBenchmark --beacons 250 500 1000 2000 4000
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+from simplesensor.collection_modules.btle_beacon import moduleConfigLoader as configLoader
+from simplesensor.collection_modules.btle_beacon.benchmarks.beaconGenerator import BeaconTrafficGenerator, SETUP_TIME
+from simplesensor.collection_modules.btle_beacon.benchmarks.replayBenchmark import runPipeline, drain
+
+# finishing later than this after the last advert counts as falling behind
+KEEPING_UP = 0.25
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--beacons', type=int, nargs='+', default=[250, 500, 1000, 2000, 4000])
+    parser.add_argument('--rate', type=float, default=10, help='adverts per second per beacon')
+    parser.add_argument('--duration', type=float, default=5, help='seconds of traffic per load')
+    parser.add_argument('--churn', type=float, default=0.01, help='fraction of beacons leaving per second')
+    parser.add_argument('--mode', choices=('blocking', 'poll'), default='blocking', help='reader mode')
+    args = parser.parse_args()
+
+    loggingQueue = mp.Queue()
+    stopDraining = drain(loggingQueue)
+    config = configLoader.load(loggingQueue, __name__)
+    fd, capture = tempfile.mkstemp(suffix='.bgcap')
+    os.close(fd)
+
+    try:
+        print("%8s %10s %10s %12s %12s %8s" % ('beacons', 'offered/s', 'handled/s', 'reader lag', 'manager lag', 'status'))
+        for beacons in args.beacons:
+            generator = BeaconTrafficGenerator(beacons, major=config['BtleAdvertisingMajor'],
+                minor=config['BtleAdvertisingMinor'], rate=args.rate, churn=args.churn)
+            generator.writeCapture(capture, args.duration)
+            result = runPipeline(config, loggingQueue, capture, speed=1, mode=args.mode)
+
+            readerLag = max(0, result['readerElapsed'] - SETUP_TIME - args.duration)
+            managerLag = max(0, result['elapsed'] - SETUP_TIME - args.duration)
+            if readerLag > KEEPING_UP:
+                status = 'reader'
+            elif managerLag > KEEPING_UP:
+                status = 'manager'
+            else:
+                status = 'ok'
+            print("%8d %10.0f %10.0f %10.2f s %10.2f s %8s" % (beacons, result['registered'] / args.duration,
+                result['registered'] / (args.duration + managerLag), readerLag, managerLag, status))
+    finally:
+        stopDraining()
+        os.remove(capture)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""
+Per-stage and end-to-end cost of the scanner pipeline, for gateway sizing.
+
+Synthetic iBeacon traffic from BeaconTrafficGenerator is pushed through each
+stage on its own and then through all of them together, one advert at a
+time, for a range of beacon counts:
+
+    framing          BGLib.feed, splitting the byte stream into packets
+    decode           the ble_evt_gap_scan_response decoder
+    detectedClient   eventScanResponse, iBeacon decode and appending to a DetectedClientBatch
+    queue            put and get of each batch on the AdvertChannel, or a multiprocessing queue
+    register         EventManager.registerDetectedClient into a growing registry
+    sweep            RegisteredClientRegistry.sweepOldClients, the items are the
+                     clients it expired
+    message          the outbound Message for every registered client
+    end-to-end       feed, eventScanResponse, queue and registerDetectedClient
+
+Latency is timed per call with perf_counter_ns, so every figure includes
+around 0.1us of timer overhead.  Queue and register latency is per batch,
+sweep latency per sweep.  A sweep only pops the expiry entries that are
+due and within abandoned_client_timeout of registering none are, so the
+sweep row has no items and its latency is the check of every shard's heap
+top.  End-to-end latency runs from the feed of an advert to the
+registration of its batch, so it includes the wait for the batch to fill.
+Peak memory is the tracemalloc peak of a second, untimed run of the stage,
+on top of what its inputs already use.
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.pipelineBenchmark
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.pipelineBenchmark --beacons 10 1000 100000 --no-memory
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.pipelineBenchmark --batch-size 1
+"""
+
+import argparse
+import itertools
+import multiprocessing as mp
+import time
+import tracemalloc
+from simplesensor.shared import Message
+from simplesensor.collection_modules.btle_beacon import moduleConfigLoader as configLoader
+from simplesensor.collection_modules.btle_beacon.advertChannel import AdvertChannel
+from simplesensor.collection_modules.btle_beacon.libs import BGLib
+from simplesensor.collection_modules.btle_beacon.devices.bluegiga.btleThread import BlueGigaBtleCollectionPointThread
+from simplesensor.collection_modules.btle_beacon.registeredClientRegistry import RegisteredClientRegistry
+from simplesensor.collection_modules.btle_beacon.eventManager import EventManager
+from simplesensor.collection_modules.btle_beacon.benchmarks.beaconGenerator import BeaconTrafficGenerator
+from simplesensor.collection_modules.btle_beacon.benchmarks.replayBenchmark import drain
+
+SWEEPS = 20
+
+
+class ListQueue(list):
+    """Collects what a stage puts on its queue, so the queue is left out of the timing"""
+    put = list.append
+
+
+def timeEach(call, items):
+    latencies = []
+    clock = time.perf_counter_ns
+    for item in items:
+        start = clock()
+        call(item)
+        latencies.append(clock() - start)
+    return latencies
+
+
+class Pipeline(object):
+    """Builds fresh pipeline objects for each run of a stage"""
+
+    def __init__(self, config, loggingQueue, outQueue, channel='ring'):
+        self.config = config
+        self.loggingQueue = loggingQueue
+        self.outQueue = outQueue
+        self.channel = channel
+
+    def advertQueue(self):
+        if self.channel == 'mp':
+            return mp.Queue()
+        return AdvertChannel(self.config['BtleQueueSize'], self.config['BtleQueueOverflow'])
+
+    def reader(self, queue):
+        reader = BlueGigaBtleCollectionPointThread(queue, self.config, self.loggingQueue)
+        return reader
+
+    def eventManager(self):
+        registry = RegisteredClientRegistry(self.config, self.loggingQueue)
+        return EventManager(self.config, self.outQueue, registry, self.loggingQueue)
+
+    def framing(self, packets):
+        found = []
+        ble = BGLib()
+        ble.parse_packet = found.append
+        return timeEach(ble.feed, packets), len(packets), found
+
+    def decode(self, packets):
+        decoded = []
+        BGLib.load_command_set('ble')
+        decoder = BGLib.packet_decoders[(0x80, 6, 0)]
+        return timeEach(lambda packet: decoded.append(decoder.decode(packet)), packets), len(packets), decoded
+
+    def detectedClient(self, decoded):
+        queue = ListQueue()
+        reader = self.reader(queue)
+        latencies = timeEach(lambda args: reader.eventScanResponse(None, args), decoded)
+        reader.flushDetectedClients()
+        return latencies, len(decoded), list(queue)
+
+    def queue(self, batches):
+        queue = self.advertQueue()
+        def handoff(batch):
+            queue.put(batch)
+            queue.get()
+        return timeEach(handoff, batches), sum(len(batch) for batch in batches), batches
+
+    def register(self, batches):
+        eventManager = self.eventManager()
+        return timeEach(eventManager.registerClients, batches), sum(len(batch) for batch in batches), eventManager.registeredClientRegistry
+
+    def sweep(self, registry):
+        expired = []
+        latencies = timeEach(lambda _: expired.extend(registry.sweepOldClients()), range(SWEEPS))
+        return latencies, len(expired), registry
+
+    def message(self, registry):
+        messages = []
+        def createMessage(registeredClient):
+            messages.append(Message(
+                topic='clientIn',
+                sender_id=self.config['CollectionPointId'],
+                sender_type=self.config['GatewayType'],
+                extended_data=registeredClient.getExtendedDataForEvent(),
+                timestamp=registeredClient.lastRegisteredTime))
+        return timeEach(createMessage, registry.snapshot()), len(registry), messages
+
+    def endToEnd(self, packets):
+        queue = self.advertQueue()
+        reader = self.reader(queue)
+        ble = BGLib()
+        ble.ble_evt_gap_scan_response += reader.eventScanResponse
+        eventManager = self.eventManager()
+        latencies = []
+        waiting = [] # feed times of the adverts in the open batch
+        clock = time.perf_counter_ns
+        for i, packet in enumerate(packets):
+            batches = reader.batches
+            waiting.append(clock())
+            ble.feed(packet)
+            if i == len(packets) - 1:
+                reader.flushDetectedClients()
+            if reader.batches != batches:
+                eventManager.registerClients(queue.get())
+                done = clock()
+                latencies.extend(done - start for start in waiting)
+                waiting = []
+        return latencies, len(packets), None
+
+
+def peakMemory(stage, inputs):
+    tracemalloc.start()
+    try:
+        stage(inputs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--beacons', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument('--adverts', type=int, default=20000, help='adverts per run, at least two per beacon')
+    parser.add_argument('--batch-size', type=int, help='override btle_batch_size')
+    parser.add_argument('--channel', choices=('ring', 'mp'), default='ring',
+        help='hand batches over through the AdvertChannel ring buffer or a multiprocessing queue')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='skip the tracemalloc runs')
+    args = parser.parse_args()
+
+    loggingQueue = mp.Queue()
+    outQueue = mp.Queue()
+    stopDraining = drain(loggingQueue, outQueue)
+    config = configLoader.load(loggingQueue, __name__)
+    if args.batch_size:
+        config['BtleBatchSize'] = args.batch_size
+    pipeline = Pipeline(config, loggingQueue, outQueue, args.channel)
+
+    try:
+        print("%8s %-15s %9s %12s %10s %10s %10s" % ('beacons', 'stage', 'items', 'items/s', 'p50 us', 'p99 us', 'peak KiB'))
+        for beacons in args.beacons:
+            generator = BeaconTrafficGenerator(beacons, major=config['BtleAdvertisingMajor'],
+                minor=config['BtleAdvertisingMinor'])
+            count = max(args.adverts, 2*beacons)
+            packets = [packet for _, packet in itertools.islice(generator.adverts(float('inf')), count)]
+
+            inputs = packets
+            stages = [('framing', pipeline.framing), ('decode', pipeline.decode),
+                ('detectedClient', pipeline.detectedClient), ('queue', pipeline.queue),
+                ('register', pipeline.register), ('sweep', pipeline.sweep), ('message', pipeline.message)]
+            for name, stage in stages + [('end-to-end', pipeline.endToEnd)]:
+                if name == 'end-to-end':
+                    inputs = packets
+                stageInputs = inputs
+                start = time.perf_counter()
+                latencies, items, inputs = stage(stageInputs)
+                elapsed = time.perf_counter() - start
+                latencies.sort()
+                peak = peakMemory(stage, stageInputs) / 1024 if args.memory else float('nan')
+                print("%8d %-15s %9d %12.0f %10.2f %10.2f %10.0f" % (beacons, name, items, items / elapsed,
+                    percentile(latencies, .5) / 1e3, percentile(latencies, .99) / 1e3, peak))
+    finally:
+        stopDraining()
+
+if __name__ == '__main__':
+    main()
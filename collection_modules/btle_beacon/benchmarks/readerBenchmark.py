@@ -0,0 +1,99 @@
+"""
+Wakeups and advert latency of the poll and blocking serial reader modes.
+
+A pseudo terminal stands in for the BLED112.  A writer thread sends iBeacon
+scan responses at a fixed rate, each stamped with its send time, while the
+reader loop of each mode (poll: check_activity then sleep 10ms, blocking:
+wait_activity) frames and dispatches them.  Each mode is measured once with
+an idle port and once under traffic.
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.readerBenchmark --rate 200
+
+Needs pyserial and a POSIX pty.
+"""
+
+import argparse
+import os
+import struct
+import threading
+import time
+import tty
+from serial import Serial
+from simplesensor.collection_modules.btle_beacon.libs import BGLib
+from simplesensor.collection_modules.btle_beacon.benchmarks.dispatchBenchmark import scanResponsePacket
+
+MODES = ('poll', 'blocking')
+
+
+def writeAdverts(fd, rate, duration):
+    interval = 1.0 / rate
+    mac = bytes([1, 2, 3, 4, 5, 6])
+    deadline = time.perf_counter() + duration
+    nextSend = time.perf_counter()
+    while nextSend < deadline:
+        delay = nextSend - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        stamp = struct.pack('>Q8x', time.perf_counter_ns())
+        os.write(fd, scanResponsePacket(mac, -60, 10, 20, -59, uuid=stamp))
+        nextSend += interval
+
+
+def runReader(mode, ser, duration, timeout):
+    latencies = []
+    ble = BGLib()
+    ble.chunked_mode = True
+    ble.ble_evt_gap_scan_response += lambda sender, args: latencies.append(
+        time.perf_counter_ns() - struct.unpack_from('>Q', args['data'], 9)[0])
+
+    wakeups = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        wakeups += 1
+        if mode == 'blocking':
+            ble.wait_activity(ser, timeout)
+        else:
+            ble.check_activity(ser)
+            time.sleep(0.01)
+    return wakeups / duration, latencies
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--rate', type=float, default=200, help='adverts per second while busy')
+    parser.add_argument('--duration', type=float, default=5, help='seconds per measurement')
+    parser.add_argument('--timeout', type=float, default=0.25, help='blocking read timeout in seconds')
+    args = parser.parse_args()
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    ser = Serial(os.ttyname(slave), timeout=0)
+    try:
+        print("%-9s %-5s %12s %14s %14s %8s" % ('mode', 'load', 'wakeups/s', 'p50 latency', 'p99 latency', 'adverts'))
+        for mode in MODES:
+            for load in ('idle', 'busy'):
+                ser.reset_input_buffer()
+                writer = None
+                if load == 'busy':
+                    writer = threading.Thread(target=writeAdverts, args=(master, args.rate, args.duration))
+                    writer.start()
+                wakeups, latencies = runReader(mode, ser, args.duration, args.timeout)
+                if writer is not None:
+                    writer.join()
+                print("%-9s %-5s %12.1f %11.2f ms %11.2f ms %8d" % (mode, load, wakeups,
+                    percentile(latencies, .5) / 1e6, percentile(latencies, .99) / 1e6, len(latencies)))
+    finally:
+        ser.close()
+        os.close(master)
+        os.close(slave)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Registry throughput with several threads feeding it while it is swept.
+
+Every feeder thread plays a scanner: it looks a beacon up and updates it,
+or adds it when it is not registered, over and over for random beacons
+out of the whole population.  A sweeper thread runs sweepOldClients every
+--sweep-interval ms at the same time, with a client timeout short enough
+that every sweep has clients to expire.  Each thread and shard count runs
+for --seconds:
+
+    ops/s        lookups plus adds or updates per second, all feeders together
+    p99 us       99th percentile time of one lookup and update
+    max us       the longest one, how long a feeder was held up at worst
+    sweep ms     longest sweep
+    expired      clients the sweeps removed
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.registryBenchmark
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.registryBenchmark --threads 1 4 8 --shards 1 64
+"""
+
+import argparse
+import multiprocessing as mp
+import random
+import threading
+import time
+from simplesensor.collection_modules.btle_beacon import moduleConfigLoader as configLoader
+from simplesensor.collection_modules.btle_beacon.registeredClientRegistry import RegisteredClientRegistry
+from simplesensor.collection_modules.btle_beacon.benchmarks.replayBenchmark import drain
+
+
+class Beacon(object):
+    """What the registry needs of a registered client"""
+    __slots__ = ('udid', 'lastRegisteredTime')
+
+    def __init__(self, udid, lastRegisteredTime):
+        self.udid = udid
+        self.lastRegisteredTime = lastRegisteredTime
+
+    def getUdid(self):
+        return self.udid
+
+
+def run(config, loggingQueue, udids, threads, seconds, sweepInterval):
+    registry = RegisteredClientRegistry(config, loggingQueue)
+    stop = threading.Event()
+    latencies = [[] for _ in range(threads)]
+    sweeps = []
+    expired = [0]
+
+    def feed(index):
+        rnd = random.Random(index)
+        timings = latencies[index]
+        clock = time.perf_counter
+        while not stop.is_set():
+            udid = rnd.choice(udids)
+            start = clock()
+            client = registry.getRegisteredClient(udid)
+            if client is None:
+                registry.addNewRegisteredClient(Beacon(udid, time.time()))
+            else:
+                client.lastRegisteredTime = time.time()
+                registry.updateRegisteredClient(client)
+            timings.append(clock() - start)
+
+    def sweep():
+        while not stop.wait(sweepInterval):
+            start = time.perf_counter()
+            expired[0] += len(registry.sweepOldClients())
+            sweeps.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=feed, args=(i,)) for i in range(threads)]
+    workers.append(threading.Thread(target=sweep))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    timings = sorted(t for perThread in latencies for t in perThread)
+    return {'rate': len(timings)/seconds, 'p99': timings[int(len(timings)*.99)], 'max': timings[-1],
+        'sweep': max(sweeps, default=0), 'expired': expired[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--beacons', type=int, default=100000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4], help='feeder thread counts')
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 16], help='btle_registry_shards values')
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--timeout', type=int, default=500, help='abandoned_client_timeout in ms')
+    parser.add_argument('--sweep-interval', type=int, default=100, help='ms between sweeps')
+    args = parser.parse_args()
+
+    loggingQueue = mp.Queue()
+    stopDraining = drain(loggingQueue)
+    try:
+        config = configLoader.load(loggingQueue, __name__)
+        config['AbandonedClientTimeout'] = args.timeout
+        udids = ['%032x' % i for i in range(args.beacons)]
+        print("%7s %7s %10s %8s %8s %9s %8s" % ('threads', 'shards', 'ops/s', 'p99 us', 'max us', 'sweep ms', 'expired'))
+        for shards in args.shards:
+            config['BtleRegistryShards'] = shards
+            for threads in args.threads:
+                result = run(config, loggingQueue, udids, threads, args.seconds, args.sweep_interval/1000)
+                print("%7d %7d %10.0f %8.1f %8.0f %9.2f %8d" % (threads, shards, result['rate'], result['p99']*1e6,
+                    result['max']*1e6, result['sweep']*1e3, result['expired']))
+    finally:
+        stopDraining()
+
+if __name__ == '__main__':
+    main()
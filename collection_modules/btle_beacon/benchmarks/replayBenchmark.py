@@ -0,0 +1,130 @@
+"""
+Line-rate throughput of the scanner pipeline, replayed from a capture file.
+
+A ReplaySerial stands in for the BLED112, so everything from BGLib.parse
+through eventScanResponse, the advert queue, EventManager.registerDetectedClient
+and the outbound queue runs as it does in the module.  The reader thread and
+the event manager run on their own threads like in BtleCollectionPoint.
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.replayBenchmark
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.replayBenchmark --capture scan.bgcap --speed 1
+
+Without --capture a BeaconTrafficGenerator capture is written to a
+temporary file first.  Record a real one by setting btle_capture_file in
+module.conf.
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import tempfile
+import threading
+import time
+from simplesensor.collection_modules.btle_beacon import moduleConfigLoader as configLoader
+from simplesensor.collection_modules.btle_beacon.advertChannel import AdvertChannel
+from simplesensor.collection_modules.btle_beacon.devices.bluegiga.btleThread import BlueGigaBtleCollectionPointThread
+from simplesensor.collection_modules.btle_beacon.registeredClientRegistry import RegisteredClientRegistry
+from simplesensor.collection_modules.btle_beacon.eventManager import EventManager
+from simplesensor.collection_modules.btle_beacon.benchmarks.beaconGenerator import BeaconTrafficGenerator
+
+
+def drain(*queues):
+    """Empty the queues on background threads the way the main process would,
+    returns a function that stops the threads"""
+    stop = threading.Event()
+    def emptyQueue(q):
+        while not stop.is_set():
+            try:
+                q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+    threads = [threading.Thread(target=emptyQueue, args=(q,), daemon=True) for q in queues]
+    for thread in threads:
+        thread.start()
+    def stopDraining():
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return stopDraining
+
+
+def runPipeline(config, loggingQueue, capture, speed=0, mode='blocking'):
+    """Replay capture through the module pipeline, returns a dict of counts and timings"""
+    config = dict(config, BtleReplayFile=capture, BtleReplaySpeed=speed, BtleCaptureFile='',
+        BtleReaderMode=mode, BtleDeviceIds=[config['BtleDeviceId']])
+    outQueue = mp.Queue()
+    advertQueue = AdvertChannel(config['BtleQueueSize'], config['BtleQueueOverflow'])
+    registry = RegisteredClientRegistry(config, loggingQueue)
+    eventManager = EventManager(config, outQueue, registry, loggingQueue)
+    reader = BlueGigaBtleCollectionPointThread(advertQueue, config, loggingQueue)
+    readerThread = threading.Thread(target=reader.bleDetect, args=(__name__, 10), daemon=True)
+
+    start = time.perf_counter()
+    readerThread.start()
+    registered = 0
+    lastRegistered = start
+    while True:
+        try:
+            for detectedClient in advertQueue.get(timeout=0.1):
+                eventManager.registerDetectedClient(detectedClient)
+                registered += 1
+            lastRegistered = time.perf_counter()
+        except queue.Empty:
+            serial = getattr(reader.btleCollectionPoint, 'serial', None)
+            if serial is not None and serial.finished and registered >= reader.adverts:
+                reader.stop()
+                break
+    readerThread.join()
+
+    outbound = 0
+    while True:
+        try:
+            outQueue.get(timeout=0.5)
+            outbound += 1
+        except queue.Empty:
+            break
+
+    return {'bytes': serial.bytesTotal, 'registered': registered, 'outbound': outbound,
+        'clients': len(registry), 'readerElapsed': serial.finishedAt - start,
+        'elapsed': lastRegistered - start, 'queue': advertQueue.getStats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--capture', help='capture file to replay, see btle_capture_file')
+    parser.add_argument('--speed', type=float, default=0, help='1 replays at the recorded pace, 0 as fast as possible')
+    parser.add_argument('--adverts', type=int, default=50000, help='about how many synthetic adverts to replay')
+    parser.add_argument('--beacons', type=int, default=200, help='synthetic beacon count')
+    parser.add_argument('--rate', type=float, default=10000, help='synthetic adverts per second')
+    parser.add_argument('--mode', choices=('blocking', 'poll'), default='blocking', help='reader mode')
+    args = parser.parse_args()
+
+    loggingQueue = mp.Queue()
+    stopDraining = drain(loggingQueue)
+
+    config = configLoader.load(loggingQueue, __name__)
+    capture = args.capture
+    if capture is None:
+        fd, capture = tempfile.mkstemp(suffix='.bgcap')
+        os.close(fd)
+        generator = BeaconTrafficGenerator(args.beacons, major=config['BtleAdvertisingMajor'],
+            minor=config['BtleAdvertisingMinor'], rate=args.rate/args.beacons)
+        generator.writeCapture(capture, args.adverts/args.rate)
+
+    try:
+        result = runPipeline(config, loggingQueue, capture, args.speed, args.mode)
+        print("capture:             %s (%d bytes)" % (capture if args.capture else 'synthetic', result['bytes']))
+        print("adverts registered:  %d" % result['registered'])
+        print("reader throughput:   %.0f adverts/s" % (result['registered'] / result['readerElapsed']))
+        print("end-to-end:          %.0f adverts/s" % (result['registered'] / result['elapsed']))
+        print("outbound events:     %d" % result['outbound'])
+        print("registered clients:  %d" % result['clients'])
+        print("queue high water:    %d batches, %d dropped" % (result['queue']['HighWaterMark'], result['queue']['TotalDropped']))
+    finally:
+        stopDraining()
+        if args.capture is None:
+            os.remove(capture)
+
+if __name__ == '__main__':
+    main()
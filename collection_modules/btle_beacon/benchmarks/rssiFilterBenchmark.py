@@ -0,0 +1,85 @@
+"""
+Cost and accuracy of the per-beacon rssi filters.
+
+Builds one filter per beacon for every btle_rssi_filter and window size,
+then feeds them noisy samples of a slowly walking true rssi, round robin
+over the beacons like a busy room, with an occasional spike of 15-25dB:
+
+    ns/sample    time per RssiFilter.add, outlier check included
+    bytes/beacon tracemalloc size of a filter divided by the beacon count
+    rms dB       error of the estimate against the true rssi
+    spikes kept  share of the spikes that got through the outlier check
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.rssiFilterBenchmark
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.rssiFilterBenchmark --beacons 100000 --sizes 1 10
+"""
+
+import argparse
+import math
+import random
+import time
+import tracemalloc
+from simplesensor.collection_modules.btle_beacon.rssiFilter import RSSI_FILTERS, createRssiFilter
+
+
+def traffic(beacons, samples, noise, spikeChance, seed=1):
+    """(beacon index, sample, true rssi, is spike) round robin over the beacons"""
+    rnd = random.Random(seed)
+    truth = [rnd.uniform(-90, -50) for _ in range(beacons)]
+    out = []
+    for _ in range(samples):
+        for i in range(beacons):
+            truth[i] = min(-40, max(-95, truth[i] + rnd.gauss(0, .3)))
+            spike = rnd.random() < spikeChance
+            sample = truth[i] + rnd.gauss(0, noise) + (rnd.choice((-1, 1))*rnd.uniform(15, 25) if spike else 0)
+            out.append((i, max(-127, min(20, int(round(sample)))), truth[i], spike))
+    return out
+
+
+def run(config, beacons, samples):
+    tracemalloc.start()
+    filters = [createRssiFilter(config) for _ in range(beacons)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    adds = [(filters[i].add, rssi) for i, rssi, _, _ in samples]
+    start = time.perf_counter()
+    for add, rssi in adds:
+        add(rssi)
+    elapsed = time.perf_counter() - start
+
+    # accuracy on a second pass, once every filter has warmed up
+    squares = 0
+    spikes = kept = 0
+    for i, rssi, truth, spike in samples:
+        accepted = filters[i].add(rssi)
+        if spike:
+            spikes += 1
+            kept += accepted
+        squares += (filters[i].estimate - truth)**2
+    return elapsed/len(samples)*1e9, size/beacons, math.sqrt(squares/len(samples)), kept/max(spikes, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--beacons', type=int, default=100000)
+    parser.add_argument('--samples', type=int, default=10, help='samples per beacon per pass')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 5, 10, 20], help='btle_rssi_max_sample_size values')
+    parser.add_argument('--noise', type=float, default=4, help='std deviation of a sample around the true rssi, dB')
+    parser.add_argument('--spikes', type=float, default=.02, help='chance a sample is a spike')
+    parser.add_argument('--error-variance', type=float, default=.12)
+    parser.add_argument('--anomaly-reset-limit', type=int, default=2)
+    args = parser.parse_args()
+
+    samples = traffic(args.beacons, args.samples, args.noise, args.spikes)
+    config = {'BtleRssiErrorVariance': args.error_variance, 'BtleAnomalyResetLimit': args.anomaly_reset_limit,
+        'BtleRssiKalmanProcessNoise': 1, 'BtleRssiKalmanMeasurementNoise': 16}
+    print("%8s %5s %10s %13s %8s %12s" % ('filter', 'size', 'ns/sample', 'bytes/beacon', 'rms dB', 'spikes kept'))
+    for kind in RSSI_FILTERS:
+        for size in ([1] if kind == 'kalman' else args.sizes):
+            config.update(BtleRssiFilter=kind, BtleRssiMaxSampleSize=size)
+            perSample, perBeacon, rms, kept = run(config, args.beacons, samples)
+            print("%8s %5s %10.0f %13.0f %8.2f %11.1f%%" % (kind, '-' if kind == 'kalman' else size, perSample, perBeacon, rms, 100*kept))
+
+if __name__ == '__main__':
+    main()
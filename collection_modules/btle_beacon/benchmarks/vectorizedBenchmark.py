@@ -0,0 +1,88 @@
+"""
+EventManager.registerClients one advert at a time against btle_vectorized_batches.
+
+Every batch is a DetectedClientBatch with --adverts adverts from each of
+the beacons, their rssi on a random walk across the in and out thresholds
+so clients keep coming in and going out.  Both paths get the same --batches
+batches into a fresh registry, the first batch registers every beacon:
+
+    first ms     the batch that registers the beacons
+    batch ms     median of the batches after it
+    adverts/s    all adverts over the time of all batches
+    events       clientIn and clientOut messages sent, proximity repeats the
+                 clientIn of a client in range every proximity_event_interval
+                 so the slower path sends more of them at large beacon counts
+
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.vectorizedBenchmark
+    python -m simplesensor.collection_modules.btle_beacon.benchmarks.vectorizedBenchmark --beacons 1000 10000 --adverts 3 --filters median
+"""
+
+import argparse
+import multiprocessing as mp
+import random
+import statistics
+import time
+from simplesensor.collection_modules.btle_beacon import moduleConfigLoader as configLoader
+from simplesensor.collection_modules.btle_beacon.registeredClientRegistry import RegisteredClientRegistry
+from simplesensor.collection_modules.btle_beacon.eventManager import EventManager
+from simplesensor.collection_modules.btle_beacon.detectedClient import DetectedClientBatch
+from simplesensor.collection_modules.btle_beacon.rssiFilter import EMA
+from simplesensor.collection_modules.btle_beacon.benchmarks.pipelineBenchmark import ListQueue
+from simplesensor.collection_modules.btle_beacon.benchmarks.replayBenchmark import drain
+
+
+def createBatches(config, beacons, adverts, count, seed=1):
+    rnd = random.Random(seed)
+    macs = ['%012X' % i for i in range(beacons)]
+    udids = ['%032X' % (i % 10 + 1) for i in range(beacons)]
+    rssi = [rnd.uniform(-90, -50) for _ in range(beacons)]
+    batches = []
+    for _ in range(count):
+        batch = DetectedClientBatch('btle', config['BtleAdvertisingMajor'], config['BtleAdvertisingMinor'], config['BtleDeviceId'])
+        for _ in range(adverts):
+            for i in range(beacons):
+                rssi[i] = min(-40, max(-95, rssi[i] + rnd.gauss(0, 3)))
+                batch.append(macs[i], udids[i], int(rssi[i]), -59, 0)
+        batches.append(batch)
+    return batches
+
+
+def run(config, loggingQueue, batches):
+    outQueue = ListQueue()
+    eventManager = EventManager(config, outQueue, RegisteredClientRegistry(config, loggingQueue), loggingQueue)
+    latencies = []
+    for batch in batches:
+        start = time.perf_counter()
+        eventManager.registerClients(batch)
+        latencies.append(time.perf_counter() - start)
+    return latencies, len(outQueue)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--beacons', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--adverts', type=int, default=1, help='adverts from every beacon in a batch')
+    parser.add_argument('--batches', type=int, default=10)
+    parser.add_argument('--filters', nargs='+', default=[EMA], help='btle_rssi_filter values')
+    args = parser.parse_args()
+
+    loggingQueue = mp.Queue()
+    stopDraining = drain(loggingQueue)
+    try:
+        config = configLoader.load(loggingQueue, __name__)
+        print("%8s %8s %11s %10s %10s %11s %8s" % ('filter', 'beacons', 'path', 'first ms', 'batch ms', 'adverts/s', 'events'))
+        for kind in args.filters:
+            config['BtleRssiFilter'] = kind
+            for beacons in args.beacons:
+                batches = createBatches(config, beacons, args.adverts, args.batches)
+                adverts = sum(len(batch) for batch in batches)
+                for vectorized in (False, True):
+                    config['BtleVectorizedBatches'] = vectorized
+                    latencies, events = run(config, loggingQueue, batches)
+                    print("%8s %8d %11s %10.2f %10.2f %11.0f %8d" % (kind, beacons, 'vectorized' if vectorized else 'per advert',
+                        latencies[0]*1e3, statistics.median(latencies[1:] or latencies)*1e3, adverts/sum(latencies), events))
+    finally:
+        stopDraining()
+
+if __name__ == '__main__':
+    main()
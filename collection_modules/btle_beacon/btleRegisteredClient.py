@@ -4,6 +4,9 @@
 from simplesensor.shared import ThreadsafeLogger
 from .detectedClient import DetectedClient
 from .uidMap import UIDMap as UIDMap
+from .rssiFilter import createRssiFilter
+from .pathLoss import estimateDistance
+from .gatewayPolicy import compileGatewayPolicy
 import logging
 import logging.config
 import os
@@ -11,136 +14,133 @@ import sys
 import time
 import math
  
-class BtleRegisteredClient(object):
-    def __init__(self, detectedClient, collectionPointConfig, loggingQueue):
+class BtleClientSettings(object):
+    """What every registered client of a collection point shares: the logger, the
+    uid map and the thresholds, worked out from the config once"""
+    __slots__ = ('collectionPointConfig', 'loggingQueue', 'logger', 'uidMap', 'gatewayType', 'policy',
+        'distanceThreshold', 'clientInThreshold', 'clientOutThresholdMin', 'distanceOutThresholdMin', 'neededSamples',
+        'clientInRangeTriggerCount', 'clientOutCountThreshold', 'proximityEventInterval', 'leaveTime',
+        'pathLossModel', 'pathLossExponent')
+
+    def __init__(self, collectionPointConfig, loggingQueue):
+        self.collectionPointConfig = collectionPointConfig
         self.loggingQueue = loggingQueue
         self.logger = ThreadsafeLogger(loggingQueue, __name__)
-        
+        self.uidMap = UIDMap()
+        self.gatewayType = collectionPointConfig['GatewayType']
+        self.distanceThreshold = collectionPointConfig['BtleRssiClientInThresholdType'] == 'distance'
+        self.clientInThreshold = collectionPointConfig['BtleRssiClientInThreshold']
+        errorVariance = collectionPointConfig['BtleRssiErrorVariance']
+        self.clientOutThresholdMin = int(self.clientInThreshold + (self.clientInThreshold * errorVariance))
+        # with the distance threshold type the threshold is in metres, out is the same variance further away
+        self.distanceOutThresholdMin = self.clientInThreshold * (1 + errorVariance)
+        self.neededSamples = collectionPointConfig['BtleRssiNeededSampleSize']
+        self.clientInRangeTriggerCount = 2
+        self.clientOutCountThreshold = collectionPointConfig['BtleClientOutCountThreshold']
+        # we compare on seconds
+        self.proximityEventInterval = collectionPointConfig['ProximityEventInterval']/1000
+        self.leaveTime = collectionPointConfig['LeaveTime']/1000
+        self.pathLossModel = collectionPointConfig['BtlePathLossModel']
+        self.pathLossExponent = collectionPointConfig['BtlePathLossExponent']
+        # in/out decisions for the gateway type, compiled once
+        self.policy = compileGatewayPolicy(self)
+
+    def createRssiFilter(self):
+        return createRssiFilter(self.collectionPointConfig)
+
+
+class BtleRegisteredClient(object):
+    __slots__ = ('settings', 'detectedClient', 'rssiFilter', 'distance', 'txPower', 'beaconId',
+        'firstRegisteredTime', 'lastRegisteredTime', 'prevClientInMsgTime', 'prevClientOutMsgTime',
+        'numClientInRange', 'numClientOutRange', 'timeInCollectionPointInMilliseconds', 'gatewayState')
+
+    def __init__(self, detectedClient, settings, handleEvent=True):
+        # logger, uid map and thresholds are shared by every client, see BtleClientSettings
+        self.settings = settings
+
         # Counters and variables
-        self.clientInRangeTrigerCount = 2
         self.prevClientInMsgTime = -1
         self.prevClientOutMsgTime = -1
         self.numClientInRange=0
         self.numClientOutRange=0
+        self.gatewayState = 0 # where the gateway policy has this client, see gatewayPolicy
         self.timeInCollectionPointInMilliseconds = 0
         self.firstRegisteredTime = time.time()
-        self.collectionPointConfig = collectionPointConfig
-        try:
-            self.uidMap = UIDMap()
-        except Exception as e:
-            print('cant instantiate uid map: %s '%e)
-        # Constants
-        self._rssiClientInThresh = self.collectionPointConfig['BtleRssiClientInThreshold']
-        self._rssiErrorVar = self.collectionPointConfig['BtleRssiErrorVariance']
-        self.__clientOutThresholdMin = int(self._rssiClientInThresh + (self._rssiClientInThresh * self._rssiErrorVar))
-
-        # Initiate event when client is detected
-        self.handleNewDetectedClientEvent(detectedClient)
+        self.lastRegisteredTime = self.firstRegisteredTime
+        self.distance = None
+
+        # smoothed rssi, spikes are dropped before they count towards in or out
+        self.rssiFilter = settings.createRssiFilter()
+
+        # Initiate event when client is detected, EventManager's batch path does it itself
+        self.detectedClient = detectedClient
+        self.txPower = detectedClient.extraData['tx']
+        self.beaconId = detectedClient.extraData['udid']
+        if handleEvent:
+            self.handleNewDetectedClientEvent(detectedClient)
 
     # part of interface for Registered Client
-    def updateWithNewDetectedClientData(self, detectedClient):
+    def updateWithNewDetectedClientData(self, detectedClient, accepted=None, distance=None):
         self.timeInCollectionPointInMilliseconds = time.time() - self.firstRegisteredTime
-        self.handleNewDetectedClientEvent(detectedClient)  #standard shared methods when we see a detected client
+        self.handleNewDetectedClientEvent(detectedClient, accepted, distance)  #standard shared methods when we see a detected client
 
     # Common methods are handled here for updateWithNewDetectedClientData and init
-    def handleNewDetectedClientEvent(self, detectedClient):
-        self.lastRegisteredTime = time.time()
+    # accepted and distance are passed in when the sample already went through the rssi filter, see EventManager
+    def handleNewDetectedClientEvent(self, detectedClient, accepted=None, distance=None):
+        now = time.time()
+        self.settings.policy.seen(self, now)
+        self.lastRegisteredTime = now
         self.detectedClient = detectedClient
         self.txPower = detectedClient.extraData['tx']
         self.beaconId = detectedClient.extraData['udid']
-        self.incrementInternalClientEventCounts(detectedClient)
-
-    def incrementInternalClientEventCounts(self, detectedClient):
-        if self.collectionPointConfig['GatewayType'] == 'proximity':
-            if self.collectionPointConfig['BtleRssiClientInThresholdType'] == 'rssi':
-                # Are they in or are they out of range 
-                # Increment internal count, used to normalize events.
-                if self.detectedClient.extraData['rssi'] >= self.collectionPointConfig['BtleRssiClientInThreshold']:
-                    self.numClientInRange = self.numClientInRange + 1
-                    self.numClientOutRange = 0
-                    self.logger.debug("CLIENT IN RANGE>>>>>>>>>>>")
-
-                elif self.detectedClient.extraData['rssi'] < self.__clientOutThresholdMin:
-                        self.numClientOutRange = self.numClientOutRange + 1
-                        #self.numClientInRange = 0
-                        self.logger.debug("CLIENT OUT OF RANGE<<<<<<<<<<<")
+        if accepted is None:
+            accepted = self.rssiFilter.add(detectedClient.extraData['rssi'])
+        if accepted:
+            self.incrementInternalClientEventCounts(detectedClient, distance)
+
+    def incrementInternalClientEventCounts(self, detectedClient, distance=None):
+        # not enough samples yet to decide anything
+        settings = self.settings
+        if not self.rssiFilter.ready(settings.neededSamples):
+            return
+        if not settings.distanceThreshold:
+            # Are they in or are they out of range 
+            # Increment internal count, used to normalize events.
+            if self.rssiFilter.estimate >= settings.clientInThreshold:
+                self.numClientInRange = self.numClientInRange + 1
+                self.numClientOutRange = 0
+                settings.logger.debug("CLIENT IN RANGE>>>>>>>>>>>")
+
+            elif self.rssiFilter.estimate < settings.clientOutThresholdMin:
+                    self.numClientOutRange = self.numClientOutRange + 1
+                    #self.numClientInRange = 0
+                    settings.logger.debug("CLIENT OUT OF RANGE<<<<<<<<<<<")
+
+        else:
+            if distance is None:
+                distance = estimateDistance(self.rssiFilter.estimate, self.txPower,
+                    settings.pathLossModel, settings.pathLossExponent)
+            self.distance = distance
+            if distance <= settings.clientInThreshold:
+                self.numClientInRange = self.numClientInRange + 1
+                self.numClientOutRange = 0
+                settings.logger.debug("CLIENT IN RANGE>>>>>>>>>>>")
+
+            elif distance > settings.distanceOutThresholdMin:
+                self.numClientOutRange = self.numClientOutRange + 1
+                settings.logger.debug("CLIENT OUT OF RANGE<<<<<<<<<<<")
 
     #part of interface for Registered Client
     def shouldSendClientInEvent(self):
-        if self.collectionPointConfig['GatewayType'] == 'proximity':
-            #e compare on seconds so we need to adjust this to seconds
-            proximityEventIntervalInSeconds = (self.collectionPointConfig['ProximityEventInterval']/1000)
-
-            timeDiff = math.trunc(time.time() - self.prevClientInMsgTime)
-            # self.logger.debug("shouldSendClientInEvent timeDiff %f > %s" %(timeDiff,proximityEventIntervalInSeconds) )
-
-            if timeDiff > proximityEventIntervalInSeconds:
-                if self.numClientInRange > self.clientInRangeTrigerCount:
-                    self.logClientEventSend("SHOULD ClientIN event to controller for")
-                    self.zeroEventRangeCounters()
-                    return True
-
-        #TODO add in other types of gateway types
-
-        return False
+        return self.settings.policy.shouldSendClientIn(self, time.time())
 
     #part of interface for Registered Client
     def shouldSendClientOutEvent(self):
-        if self.collectionPointConfig['GatewayType'] == 'proximity':
-            #we compare on seconds so we need to adjust this to seconds
-            proximityEventIntervalInSeconds = (self.collectionPointConfig['ProximityEventInterval']/1000)
-
-            #check the time to see if we need to send a message
-            #have we ever sent an IN event? if not we dont need to send an out event
-            if self.prevClientInMsgTime > 0:
-                #check timing on last event sent
-                #self.logger.debug("shouldSendClientOutEvent prevClientOutMsgTime=%f"%self.prevClientOutMsgTime)
-                timeDiff = time.time() - self.prevClientOutMsgTime
-
-                #have we sent a client out since the last client in?  if so we dont need to throw another
-                if self.prevClientOutMsgTime < self.prevClientInMsgTime:
-                    #do we have enought qualifying out events. we dont want to throw one too soon
-                    if self.numClientOutRange >= self.collectionPointConfig['BtleClientOutCountThreshold']:
-                        self.logClientEventSend("SHOULD ClientOUT event to controller for")
-                        self.zeroEventRangeCounters()
-                        return True
-
-                #lets check to see if we need to clean up the out count --- not sure this is the best idea
-                else:
-                    if self.numClientOutRange > self.collectionPointConfig['BtleClientOutCountThreshold']:
-                        # self.logger.debug("Client out count %i is past max.  Resetting." %self.numClientOutRange)
-                        self.numClientOutRange = 0
-
-            else:
-                #lets check to see if we need to clean up the out count --- not sure this is the best idea
-                if self.numClientOutRange > self.collectionPointConfig['BtleClientOutCountThreshold']:
-                    # self.logger.debug("Client out count %i is past max.  Resetting." %self.numClientOutRange)
-                    self.numClientOutRange = 0
-
-        #TODO add in other types of gateway types
-
-        return False
+        return self.settings.policy.shouldSendClientOut(self, time.time())
 
     #part of interface for Registered Client
     def sweepShouldSendClientOutEvent(self):
-        if self.collectionPointConfig['GatewayType'] == 'proximity':
-            #has an out event already been sent? if so we dont need to throw another on sweep
-            if self.prevClientOutMsgTime > 0:
-                #was there a in event sent after the last out?
-                if self.prevClientInMsgTime > self.prevClientOutMsgTime:
-                    self.logClientEventSend("Sweep case a is sending ClientOUT on")
-                    self.zeroEventRangeCounters()
-                    return True
-                else:
-                    return False
-            else:
-                self.logClientEventSend("Sweep case b is sending ClientOUT on")
-                self.zeroEventRangeCounters()
-                return True
-
-        #TODO add in other types of gateway types
-
-        return True
+        return self.settings.policy.sweepShouldSendClientOut(self)
 
     #part of interface for Registered Client
     def getUdid(self):
@@ -149,6 +149,12 @@ class BtleRegisteredClient(object):
     def getTxPower(self):
         return self.txPower
 
+    def getAverageRssi(self):
+        """Smoothed rssi, the last sample until the filter has accepted one"""
+        if self.rssiFilter.estimate is None:
+            return self.detectedClient.extraData['rssi']
+        return self.rssiFilter.estimate
+
     #zero out the BTLE event counters
     def zeroEventRangeCounters(self):
         self.numClientOutRange = 0
@@ -178,11 +184,13 @@ class BtleRegisteredClient(object):
         extraData['prevClientOutMsgTime'] = self.prevClientOutMsgTime
         extraData['timeInCollectionPointInMilliseconds'] = self.timeInCollectionPointInMilliseconds
         extraData['rssi'] = self.detectedClient.extraData['rssi']
-        extraData['averageRssi'] = self.detectedClient.extraData['rssi']
+        extraData['averageRssi'] = self.getAverageRssi()
+        extraData['distance'] = self.distance
         extraData['txPower'] = self.getTxPower()
         extraData['beaconId'] = self.beaconId
         extraData['beaconMac'] = self.detectedClient.extraData["beaconMac"]
-        extraData['industry'] = self.uidMap.get(self.beaconId)
+        extraData['deviceId'] = self.detectedClient.extraData["deviceId"]
+        extraData['industry'] = self.settings.uidMap.get(self.beaconId)
 
         return extraData
 
@@ -190,8 +198,10 @@ class BtleRegisteredClient(object):
     def setClientInMessageSentToController(self):
         self.prevClientInMsgTime = time.time()
         self.numClientInRange = 0
+        self.settings.policy.clientInSent(self)
 
     #part of interface for Registered Client
     def setClientOutMessageSentToController(self):
         self.prevClientOutMsgTime = time.time()
         self.numClientOutRange = 0
+        self.settings.policy.clientOutSent(self)
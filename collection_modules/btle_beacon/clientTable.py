@@ -0,0 +1,348 @@
+"""
+Registered client state as NumPy columns for the vectorized batch path.
+
+With btle_vectorized_batches EventManager gives every beacon a dense slot
+in a ClientTable.  The counters, times, gateway state, last rssi and tx
+and the rssi filter state of all beacons are columns indexed by slot, and
+a batch of adverts is worked through with array operations:
+
+    1. the batch's MACs are looked up once each and mapped to slots, new
+       beacons get a free slot and a SlotRegisteredClient
+    2. the rows are split into rounds, a beacon heard three times in the
+       batch is in the first three rounds, so no round touches a slot twice
+       and every beacon still sees its adverts in order
+    3. per round the gateway policy's seenBatch, the rssi filters, the in
+       and out range counts and the policy's evaluateBatch run on the
+       columns of the round's slots
+
+Only the clients that have an event to send come back as Python objects.
+SlotRegisteredClient is the registry's view of a slot, its attributes read
+and write the columns, so the sweep, the messages and the gateway policy
+work on it like on any BtleRegisteredClient.  The registry still holds
+one per beacon.  A client the sweep removes gives its slot back.
+
+Needs numpy, HAVE_NUMPY says whether it is there.
+"""
+
+import threading
+from .btleRegisteredClient import BtleRegisteredClient
+from .detectedClient import DetectedClient, DetectedClientBatch
+from .pathLoss import estimateDistances
+from .rssiFilter import AVERAGE, EMA, MEDIAN, KALMAN, RSSI_FILTERS
+
+try:
+    import numpy
+    HAVE_NUMPY = True
+except ImportError:
+    numpy = None
+    HAVE_NUMPY = False
+
+# column name -> dtype, one row per slot
+COLUMNS = {
+    'firstRegisteredTime': 'float64',
+    'lastRegisteredTime': 'float64',
+    'prevClientInMsgTime': 'float64',
+    'prevClientOutMsgTime': 'float64',
+    'numClientInRange': 'int32',
+    'numClientOutRange': 'int32',
+    'gatewayState': 'int8',
+    'rssi': 'int8',
+    'tx': 'int8',
+    'distance': 'float64', # nan until the distance threshold type works one out
+    # rssi filter, see rssiFilter.py
+    'estimate': 'float64', # nan until the filter has a sample
+    'samples': 'int32',
+    'anomalies': 'int32',
+    'index': 'int32',
+    'total': 'int32',
+    'covariance': 'float64',
+}
+
+
+class ClientTable(object):
+
+    def __init__(self, settings, capacity=1024):
+        config = settings.collectionPointConfig
+        self.settings = settings
+        self.filterKind = config['BtleRssiFilter']
+        if self.filterKind not in RSSI_FILTERS:
+            raise ValueError("rssi filter must be one of %s, not %s" % (', '.join(RSSI_FILTERS), self.filterKind))
+        self.windowSize = max(config['BtleRssiMaxSampleSize'], 1)
+        self.alpha = 2/(self.windowSize + 1)
+        self.errorVariance = config['BtleRssiErrorVariance']
+        self.anomalyResetLimit = config['BtleAnomalyResetLimit']
+        self.processNoise = config['BtleRssiKalmanProcessNoise']
+        self.measurementNoise = config['BtleRssiKalmanMeasurementNoise']
+        # the batch path holds it for a whole batch, the sweep to give slots back
+        self.lock = threading.RLock()
+
+        self.capacity = capacity
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, numpy.zeros(capacity, dtype=dtype))
+        # the last samples of every slot for the average and median filters, nan is an empty place
+        self.ring = numpy.full((capacity, self.windowSize), numpy.nan)
+        self.slots = {} # mac -> slot
+        self.macs = [None]*capacity
+        self.udids = [None]*capacity
+        self.deviceIds = [None]*capacity
+        self.clients = [None]*capacity # slot -> SlotRegisteredClient
+        self.free = list(range(capacity - 1, -1, -1))
+        self.majorNumber = 0
+        self.minorNumber = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def grow(self):
+        extra = self.capacity
+        for name in COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, numpy.concatenate((column, numpy.zeros(extra, dtype=column.dtype))))
+        self.ring = numpy.concatenate((self.ring, numpy.full((extra, self.windowSize), numpy.nan)))
+        for perSlot in (self.macs, self.udids, self.deviceIds, self.clients):
+            perSlot.extend([None]*extra)
+        self.free.extend(range(self.capacity + extra - 1, self.capacity - 1, -1))
+        self.capacity += extra
+
+    def allocate(self, mac, udid, deviceId, now):
+        """A slot for a new beacon, its client starts out like a new BtleRegisteredClient"""
+        if not self.free:
+            self.grow()
+        slot = self.free.pop()
+        self.slots[mac] = slot
+        self.macs[slot] = mac
+        self.udids[slot] = udid
+        self.deviceIds[slot] = deviceId
+        self.firstRegisteredTime[slot] = now
+        self.lastRegisteredTime[slot] = now
+        self.prevClientInMsgTime[slot] = -1
+        self.prevClientOutMsgTime[slot] = -1
+        self.numClientInRange[slot] = 0
+        self.numClientOutRange[slot] = 0
+        self.gatewayState[slot] = 0
+        self.distance[slot] = numpy.nan
+        self.resetFilters(slot)
+        client = self.clients[slot] = SlotRegisteredClient(self, slot)
+        return client
+
+    def release(self, client):
+        """Give the slot of a client that left the registry back"""
+        with self.lock:
+            slot = client.slot
+            if self.clients[slot] is not client:
+                return
+            del self.slots[self.macs[slot]]
+            self.clients[slot] = self.macs[slot] = self.udids[slot] = self.deviceIds[slot] = None
+            self.free.append(slot)
+
+    def prepare(self, detectedClients, now):
+        """Slots of every row of the batch, allocating new beacons.  Returns the row slots,
+        rssi and tx columns and the clients of the new beacons"""
+        if isinstance(detectedClients, DetectedClientBatch):
+            columns = detectedClients.toNumpy()
+            macs = detectedClients.macs
+            macIndex = columns['macIndex']
+            rssi, tx = columns['rssi'], columns['tx']
+            # the last row of every mac has the udid its client ends the batch with
+            _, fromEnd = numpy.unique(macIndex[::-1], return_index=True)
+            udidIndex = detectedClients.udidIndex
+            udids = [detectedClients.udids[udidIndex[row]] for row in (len(macIndex) - 1 - fromEnd).tolist()]
+            deviceIds = [detectedClients.deviceId]*len(macs)
+            self.majorNumber, self.minorNumber = detectedClients.majorNumber, detectedClients.minorNumber
+        else:
+            macs, udids, deviceIds, macIndexes = [], [], [], {}
+            macIndex, rssi, tx = [], [], []
+            for detectedClient in detectedClients:
+                extraData = detectedClient.extraData
+                mac = extraData['beaconMac']
+                index = macIndexes.get(mac)
+                if index is None:
+                    index = macIndexes[mac] = len(macs)
+                    macs.append(mac)
+                    udids.append(None)
+                    deviceIds.append(None)
+                udids[index] = extraData['udid']
+                deviceIds[index] = extraData['deviceId']
+                macIndex.append(index)
+                rssi.append(extraData['rssi'])
+                tx.append(extraData['tx'])
+                self.majorNumber, self.minorNumber = extraData['majorNumber'], extraData['minorNumber']
+            macIndex = numpy.array(macIndex, dtype=numpy.intp)
+            rssi = numpy.array(rssi, dtype=numpy.int8)
+            tx = numpy.array(tx, dtype=numpy.int8)
+
+        newClients = []
+        macSlots = numpy.empty(len(macs), dtype=numpy.intp)
+        slots = self.slots
+        for index, mac in enumerate(macs):
+            slot = slots.get(mac)
+            if slot is None:
+                newClients.append(self.allocate(mac, udids[index], deviceIds[index], now))
+                slot = newClients[-1].slot
+            else:
+                self.udids[slot] = udids[index]
+                self.deviceIds[slot] = deviceIds[index]
+            macSlots[index] = slot
+        return macSlots[macIndex], rssi, tx, newClients
+
+    def positions(self, slots, clients):
+        """Indexes of the clients' slots in slots, last first so they pop off in order"""
+        if not clients:
+            return []
+        return numpy.flatnonzero(numpy.isin(slots, [client.slot for client in clients]))[::-1].tolist()
+
+    def rounds(self, rowSlots):
+        """(rows, slots) of every round, the nth round has the nth advert of every beacon heard n times"""
+        count = len(rowSlots)
+        if not count:
+            return
+        order = numpy.argsort(rowSlots, kind='stable')
+        ordered = rowSlots[order]
+        starts = numpy.ones(count, dtype=bool)
+        starts[1:] = ordered[1:] != ordered[:-1]
+        if starts.all():
+            yield numpy.arange(count), rowSlots
+            return
+        positions = numpy.arange(count)
+        groupStarts = numpy.maximum.accumulate(numpy.where(starts, positions, 0))
+        rank = numpy.empty(count, dtype=numpy.intp)
+        rank[order] = positions - groupStarts
+        for n in range(rank.max() + 1):
+            rows = numpy.flatnonzero(rank == n)
+            yield rows, rowSlots[rows]
+
+    def advance(self, slots, rssi, tx, now):
+        """One advert for each of slots, which must not repeat.  Returns (slot index, event type)
+        for every client with a clientIn or clientOut to send, in the order of slots"""
+        settings = self.settings
+        policy = settings.policy
+        policy.seenBatch(self, slots, now)
+        self.lastRegisteredTime[slots] = now
+        self.rssi[slots] = rssi
+        self.tx[slots] = tx
+
+        accepted = self.addSamples(slots, rssi.astype(numpy.float64))
+        counted = slots[accepted & (self.samples[slots] >= settings.neededSamples)]
+        if len(counted):
+            estimate = self.estimate[counted]
+            if settings.distanceThreshold:
+                distance = estimateDistances(estimate, self.tx[counted], settings.pathLossModel, settings.pathLossExponent)
+                self.distance[counted] = distance
+                inRange = distance <= settings.clientInThreshold
+                outRange = ~inRange & (distance > settings.distanceOutThresholdMin)
+            else:
+                inRange = estimate >= settings.clientInThreshold
+                outRange = ~inRange & (estimate < settings.clientOutThresholdMin)
+            self.numClientInRange[counted] += inRange
+            self.numClientOutRange[counted] = numpy.where(inRange, 0, self.numClientOutRange[counted] + outRange)
+
+        sendIn, sendOut = policy.evaluateBatch(self, slots, now)
+        events = [(index, 'clientIn') for index in numpy.flatnonzero(sendIn).tolist()]
+        events.extend((index, 'clientOut') for index in numpy.flatnonzero(sendOut).tolist())
+        events.sort()
+        return events
+
+    def resetFilters(self, slots):
+        self.estimate[slots] = numpy.nan
+        self.samples[slots] = 0
+        self.anomalies[slots] = 0
+        self.index[slots] = 0
+        self.total[slots] = 0
+        self.covariance[slots] = 0
+        self.ring[slots] = numpy.nan
+
+    def addSamples(self, slots, rssi):
+        """RssiFilter.add for every slot, returns which samples were accepted"""
+        estimate = self.estimate[slots]
+        with numpy.errstate(invalid='ignore'):
+            anomaly = numpy.abs(rssi - estimate) > numpy.abs(estimate)*self.errorVariance
+        anomalies = self.anomalies[slots] + anomaly
+        rejected = anomaly & (anomalies < self.anomalyResetLimit)
+        self.anomalies[slots] = numpy.where(rejected, anomalies, 0)
+        restart = anomaly & ~rejected
+        if restart.any():
+            # the beacon really moved, start over from this sample
+            self.resetFilters(slots[restart])
+        accepted = ~rejected
+        slots = slots[accepted]
+        rssi = rssi[accepted]
+        self.samples[slots] += 1
+
+        estimate = self.estimate[slots]
+        first = numpy.isnan(estimate)
+        if self.filterKind == EMA:
+            self.estimate[slots] = numpy.where(first, rssi, estimate + self.alpha*(rssi - estimate))
+        elif self.filterKind == KALMAN:
+            covariance = self.covariance[slots] + self.processNoise
+            gain = covariance/(covariance + self.measurementNoise)
+            self.estimate[slots] = numpy.where(first, rssi, estimate + gain*(rssi - estimate))
+            self.covariance[slots] = numpy.where(first, self.measurementNoise, (1 - gain)*covariance)
+        else:
+            index = self.index[slots]
+            if self.filterKind == AVERAGE:
+                old = self.ring[slots, index]
+                total = self.total[slots] - numpy.where(self.samples[slots] > self.windowSize, old, 0).astype(numpy.int32)
+                total += rssi.astype(numpy.int32)
+                self.total[slots] = total
+                self.ring[slots, index] = rssi
+                self.estimate[slots] = total/numpy.minimum(self.samples[slots], self.windowSize)
+            elif self.filterKind == MEDIAN:
+                self.ring[slots, index] = rssi
+                self.estimate[slots] = numpy.nanmedian(self.ring[slots], axis=1)
+            self.index[slots] = (index + 1) % self.windowSize
+        return accepted
+
+
+def _column(name):
+    def get(self):
+        return getattr(self.table, name)[self.slot].item()
+    def set(self, value):
+        getattr(self.table, name)[self.slot] = value
+    return property(get, set)
+
+
+class SlotRegisteredClient(BtleRegisteredClient):
+    """A BtleRegisteredClient whose state lives in a ClientTable slot"""
+    __slots__ = ('table', 'slot')
+
+    def __init__(self, table, slot):
+        self.table = table
+        self.slot = slot
+        self.settings = table.settings
+
+    firstRegisteredTime = _column('firstRegisteredTime')
+    lastRegisteredTime = _column('lastRegisteredTime')
+    prevClientInMsgTime = _column('prevClientInMsgTime')
+    prevClientOutMsgTime = _column('prevClientOutMsgTime')
+    numClientInRange = _column('numClientInRange')
+    numClientOutRange = _column('numClientOutRange')
+    gatewayState = _column('gatewayState')
+    txPower = _column('tx')
+
+    @property
+    def beaconId(self):
+        return self.table.udids[self.slot]
+
+    @property
+    def distance(self):
+        distance = self.table.distance[self.slot].item()
+        return None if distance != distance else distance
+
+    @property
+    def timeInCollectionPointInMilliseconds(self):
+        return self.lastRegisteredTime - self.firstRegisteredTime
+
+    @property
+    def detectedClient(self):
+        table, slot = self.table, self.slot
+        return DetectedClient('btle', udid=table.udids[slot], beaconMac=table.macs[slot], majorNumber=table.majorNumber,
+            minorNumber=table.minorNumber, tx=table.tx[slot].item(), rssi=table.rssi[slot].item(), deviceId=table.deviceIds[slot])
+
+    def getUdid(self):
+        return self.table.macs[self.slot]
+
+    def getAverageRssi(self):
+        estimate = self.table.estimate[self.slot].item()
+        if estimate != estimate:
+            return self.table.rssi[self.slot].item()
+        return estimate
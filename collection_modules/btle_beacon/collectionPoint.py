@@ -12,11 +12,15 @@ sys.path.append('./collection_modules/btleCollectionPoint/libs')
 from simplesensor.collection_modules.btle_beacon import moduleConfigLoader as configLoader
 from devices.bluegiga.btleThread import BlueGigaBtleCollectionPointThread
 from .registeredClientRegistry import RegisteredClientRegistry
-from simplesensor.shared import ThreadsafeLogger, ModuleProcess
+from simplesensor.shared import ThreadsafeLogger, ModuleProcess, Message
 from .repeatedTimer import RepeatedTimer
 from .eventManager import EventManager
+from .advertDeduplicator import AdvertDeduplicator
+from .advertChannel import AdvertChannel, SHUTDOWN
+from .beaconWhitelist import BeaconWhitelist, OFF
 from threading import Thread
-import multiprocessing as mp
+import asyncio
+import queue
 import time
 
 class BtleCollectionPoint(ModuleProcess):
@@ -32,22 +36,43 @@ class BtleCollectionPoint(ModuleProcess):
          # Queues
         self.outQueue = pOutBoundQueue # Messages from this thread to the main process
         self.inQueue = pInBoundQueue
-        self.queueBLE = mp.Queue()
 
         # Configs
-        self.moduleConfig = configLoader.load(self.loggingQueue)
+        self.moduleConfig = configLoader.load(self.loggingQueue, __name__)
         self.config = baseConfig
 
+        # the readers are threads in this process, batches of detected clients reach run() through a ring buffer
+        self.queueBLE = AdvertChannel(self.moduleConfig['BtleQueueSize'], self.moduleConfig['BtleQueueOverflow'])
+
         # Variables and objects
         self.registeredClientRegistry = RegisteredClientRegistry(self.moduleConfig, self.loggingQueue)
         self.eventManager = EventManager(self.moduleConfig, pOutBoundQueue, self.registeredClientRegistry, self.loggingQueue)
+        self.beaconWhitelist = BeaconWhitelist(self.moduleConfig['BtleWhitelistMode'], self.moduleConfig['BtleWhitelist'], self.moduleConfig['BtleWhitelistFile'])
+        if self.beaconWhitelist.mode != OFF:
+            self.registeredClientRegistry.eventRegisteredClientAdded += self.__newClientWhitelisted
         self.alive = True
-        self.btleThread = None
-        self.BLEThread = None
+        self.btleThreads = []
+        self.BLEThreads = []
         self.repeatTimerSweepClients = None
+        self.repeatTimerReportStats = None
+        self.repeatTimerAdaptScan = None
+        self.lastQueueDropped = 0
+        self.advertDeduplicator = None
+        if len(self.moduleConfig['BtleDeviceIds']) > 1:
+            # several devices hear the same beacons, merge their adverts before the event manager sees them
+            self.advertDeduplicator = AdvertDeduplicator(self.moduleConfig['BtleDedupWindow'])
+
+        # Consumer loop stats
+        self.consumerStart = time.time()
+        self.consumerIdleTime = 0
+        self.consumerWakeups = 0
+        self.consumerBatches = 0
 
         # Constants
         self._cleanupInterval = self.moduleConfig['AbandonedClientCleanupInterval']
+        self._statsInterval = self.moduleConfig['BtleStatsInterval']
+        # longest the consumer sleeps with nothing to do before it rechecks alive
+        self._idleTimeout = 1
 
     def run(self):
         ###Pausing Startup to wait for things to start after a system restart
@@ -55,24 +80,99 @@ class BtleCollectionPoint(ModuleProcess):
         time.sleep(15)
         self.logger.info("Done with our nap.  Time to start looking for clients")
 
-        self.btleThread = BlueGigaBtleCollectionPointThread(self.queueBLE, self.moduleConfig, self.loggingQueue)
-        self.BLEThread = Thread(target=self.btleThread.bleDetect, args=(__name__,10))
-        self.BLEThread.daemon = True
-        self.BLEThread.start()
+        self.startReaders()
 
         # Setup repeat task to run the sweep every X interval
         self.repeatTimerSweepClients = RepeatedTimer((self._cleanupInterval/1000), self.registeredClientRegistry.sweepOldClients)
+        self.repeatTimerReportStats = RepeatedTimer((self._statsInterval/1000), self.reportStats)
+        if self.moduleConfig['BtleAdaptiveScan']:
+            self.repeatTimerAdaptScan = RepeatedTimer((self.moduleConfig['BtleAdaptiveScanPeriod']/1000), self.adaptScan)
 
         # Process queue from main thread for shutdown messages
         self.threadProcessQueue = Thread(target=self.processQueue)
         self.threadProcessQueue.setDaemon(True)
         self.threadProcessQueue.start()
 
-        #read the queue
+        self.consumeDetectedClients()
+
+    def startReaders(self):
+        """A reader per device, each on its own thread or all on one event loop thread in asyncio mode"""
+        for deviceId in self.moduleConfig['BtleDeviceIds']:
+            self.btleThreads.append(BlueGigaBtleCollectionPointThread(self.queueBLE, self.moduleConfig, self.loggingQueue, deviceId=deviceId,
+                whitelist=self.beaconWhitelist.macs))
+        if self.beaconWhitelist.enforced() and not len(self.beaconWhitelist):
+            self.logger.warn("Btle whitelist is enforced but empty, every advertiser is reported.  Run in learn mode first to collect the beacons")
+
+        if self.moduleConfig['BtleReaderMode'] == 'asyncio':
+            # one event loop thread serves every device
+            self.BLEThreads.append(Thread(target=self.bleDetectAsync))
+        else:
+            for btleThread in self.btleThreads:
+                self.BLEThreads.append(Thread(target=btleThread.bleDetect, args=(__name__,10)))
+        for BLEThread in self.BLEThreads:
+            BLEThread.daemon = True
+            BLEThread.start()
+
+    def consumeDetectedClients(self):
+        """Block on queueBLE and hand each batch to the event manager until shutdown.
+        The wait never runs past the end of a dedup window, so merged adverts go out on time."""
+        self.consumerStart = time.time()
         while self.alive:
-            if not self.queueBLE.empty():
-                result = self.queueBLE.get(block=False, timeout=1)
+            timeout = self._idleTimeout
+            if self.advertDeduplicator is not None:
+                untilFlush = self.advertDeduplicator.timeUntilFlush()
+                if untilFlush is not None:
+                    timeout = min(timeout, untilFlush)
+
+            waitStart = time.time()
+            try:
+                result = self.queueBLE.get(timeout=timeout)
+            except queue.Empty:
+                result = None
+            self.consumerIdleTime += time.time() - waitStart
+            self.consumerWakeups += 1
+
+            if result is SHUTDOWN:
+                break
+            if result is not None:
+                self.consumerBatches += 1
                 self.__handleBtleClientEvents(result)
+            if self.advertDeduplicator is not None and self.advertDeduplicator.flushDue():
+                self.__registerDetectedClients(self.advertDeduplicator.flush())
+
+    def getConsumerStats(self):
+        """How much of its time the consumer loop spent waiting for batches, and how often it woke up"""
+        elapsed = max(time.time() - self.consumerStart, 1e-6)
+        return {'IdlePercent': 100*self.consumerIdleTime/elapsed, 'WakeupsPerSecond': self.consumerWakeups/elapsed,
+            'BatchesPerSecond': self.consumerBatches/elapsed}
+
+    def reportStats(self):
+        self.logger.info("BTLE consumer stats: %s" % self.getConsumerStats())
+        self.logger.info("BTLE queue stats: %s" % self.queueBLE.getStats())
+        for btleThread in self.btleThreads:
+            self.logger.info("BTLE reader %s stats: %s" % (btleThread.deviceId, btleThread.getReaderStats()))
+
+    def adaptScan(self):
+        """Let every reader adapt its scan to its own load and the queue, each change goes out as a scanParameters message"""
+        queueStats = self.queueBLE.getStats()
+        queueFill = queueStats['Depth']/queueStats['MaxSize']
+        dropped = queueStats['TotalDropped'] > self.lastQueueDropped
+        self.lastQueueDropped = queueStats['TotalDropped']
+        for btleThread in self.btleThreads:
+            change = btleThread.adaptScan(queueFill, dropped)
+            if change is not None:
+                self.logger.info("BTLE reader %s scan parameters changed: %s" % (btleThread.deviceId, change))
+                self.outQueue.put(Message(
+                    topic='scanParameters',
+                    sender_id=self.moduleConfig['CollectionPointId'],
+                    sender_type=self.moduleConfig['GatewayType'],
+                    extended_data=change,
+                    timestamp=time.time()))
+
+    def bleDetectAsync(self):
+        async def detectAll():
+            await asyncio.gather(*[btleThread.bleDetectAsync() for btleThread in self.btleThreads])
+        asyncio.run(detectAll())
 
     def processQueue(self):
         self.logger.info("Starting to watch collection point inbound message queue")
@@ -95,11 +195,22 @@ class BtleCollectionPoint(ModuleProcess):
                 time.sleep(.25)
 
     def __handleBtleClientEvents(self, detectedClients):
-        for client in detectedClients:
-            self.logger.debug("--- Found client ---")
-            self.logger.debug(vars(client))
-            self.logger.debug("--- Found client end ---")
-            self.eventManager.registerDetectedClient(client)
+        if self.advertDeduplicator is not None:
+            for client in detectedClients:
+                self.advertDeduplicator.add(client)
+        else:
+            self.__registerDetectedClients(detectedClients)
+
+    def __registerDetectedClients(self, detectedClients):
+        self.logger.debug("--- Found %s clients ---" % len(detectedClients))
+        self.eventManager.registerClients(detectedClients)
+
+    def __newClientWhitelisted(self, sender, registeredClient):
+        # keep the whitelist file and every device in step with the beacons that register
+        mac = self.beaconWhitelist.add(registeredClient.getUdid())
+        if mac is not None and self.beaconWhitelist.enforced():
+            for btleThread in self.btleThreads:
+                btleThread.whitelistBeacon(mac)
 
     def handleMessage(self, msg):
         # Handle incoming messages, eg. from other collection points
@@ -108,7 +219,13 @@ class BtleCollectionPoint(ModuleProcess):
     def shutdown(self):
         self.logger.info("Shutting down")
         self.repeatTimerSweepClients.stop()
-        self.btleThread.stop()
+        self.repeatTimerReportStats.stop()
+        if self.repeatTimerAdaptScan is not None:
+            self.repeatTimerAdaptScan.stop()
+        for btleThread in self.btleThreads:
+            btleThread.stop()
+        self.reportStats()
         self.alive = False
+        self.queueBLE.shutdown()
         time.sleep(1)
         self.exit = True
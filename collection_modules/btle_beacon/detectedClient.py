@@ -1,20 +1,129 @@
 """
 Detected client is the raw event from the device interface.
+
+DetectedClient is slotted, one small object per advert and no dicts.  The
+fields used to live in an extraData dict, extraData now returns the client
+itself, which reads and writes its fields through the same dict style
+lookups, so detectedClient.extraData['rssi'] keeps working.
+
+DetectedClientBatch holds a whole batch of adverts from one reader as
+parallel columns (MAC index, udid index, rssi, tx and timestamp in arrays)
+and hands out DetectedClients when iterated, so code written for a list of
+detected clients takes a batch as is.
 """
-import time 
-class DetectedClient:
-    def __init__(self,type,**kwargs):
-        self.type=type
-        if self.type == 'btle':
-            self.udid=kwargs.get('udid','undefined')
-            self.createTime = time.time()
-            self.extraData = {}
-            self.extraData['beaconMac'] = kwargs.get('beaconMac','undefined')
-            self.extraData['majorNumber'] = kwargs.get('majorNumber',0)
-            self.extraData['minorNumber'] = kwargs.get('minorNumber',0)
-            self.extraData['udid'] = self.udid
-            self.extraData['tx'] = kwargs.get('tx',0)
-            self.extraData['rssi'] = kwargs.get('rssi',0)
+from array import array
+import time
+
+class DetectedClient(object):
+    __slots__ = ('type', 'udid', 'createTime', 'beaconMac', 'majorNumber', 'minorNumber', 'tx', 'rssi', 'deviceId')
+    _extraDataKeys = ('beaconMac', 'majorNumber', 'minorNumber', 'udid', 'tx', 'rssi', 'deviceId')
+
+    def __init__(self, type, udid='undefined', beaconMac='undefined', majorNumber=0, minorNumber=0, tx=0, rssi=0,
+            deviceId='undefined', createTime=None):
+        self.type = type
+        self.udid = udid
+        self.createTime = time.time() if createTime is None else createTime
+        self.beaconMac = beaconMac
+        self.majorNumber = majorNumber
+        self.minorNumber = minorNumber
+        self.tx = tx
+        self.rssi = rssi
+        self.deviceId = deviceId
+
+    @property
+    def extraData(self):
+        return self
+
+    # dict style access for code written against extraData
+    def __getitem__(self, key):
+        if key not in self._extraDataKeys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self._extraDataKeys:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._extraDataKeys
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._extraDataKeys else default
+
+    def keys(self):
+        return self._extraDataKeys
+
+    def values(self):
+        return [getattr(self, key) for key in self._extraDataKeys]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self._extraDataKeys]
+
+    def __repr__(self):
+        return "DetectedClient(%r, %s, createTime=%r)" % (self.type,
+            ', '.join('%s=%r' % item for item in self.items()), self.createTime)
 
     def __str__(self):
-        return "udid: {1} \n createTime: {2}".format(self.udid, self.createTime)
\ No newline at end of file
+        return "udid: {0} \n createTime: {1}".format(self.udid, self.createTime)
+
+
+class DetectedClientBatch(object):
+    """Adverts from one reader as parallel columns.
+
+    Every row shares type, major, minor and deviceId.  MACs and udids are
+    stored once per batch and referenced by index.
+    """
+    __slots__ = ('type', 'majorNumber', 'minorNumber', 'deviceId', 'macs', 'udids', '_macIndexes', '_udidIndexes',
+        'macIndex', 'udidIndex', 'rssi', 'tx', 'timestamp')
+
+    def __init__(self, type, majorNumber=0, minorNumber=0, deviceId='undefined'):
+        self.type = type
+        self.majorNumber = majorNumber
+        self.minorNumber = minorNumber
+        self.deviceId = deviceId
+        self.macs = []
+        self.udids = []
+        self._macIndexes = {}
+        self._udidIndexes = {}
+        self.macIndex = array('I')
+        self.udidIndex = array('I')
+        self.rssi = array('b')
+        self.tx = array('b')
+        self.timestamp = array('d')
+
+    def append(self, beaconMac, udid, rssi, tx, timestamp):
+        macIndex = self._macIndexes.get(beaconMac)
+        if macIndex is None:
+            macIndex = self._macIndexes[beaconMac] = len(self.macs)
+            self.macs.append(beaconMac)
+        udidIndex = self._udidIndexes.get(udid)
+        if udidIndex is None:
+            udidIndex = self._udidIndexes[udid] = len(self.udids)
+            self.udids.append(udid)
+        self.macIndex.append(macIndex)
+        self.udidIndex.append(udidIndex)
+        self.rssi.append(rssi)
+        self.tx.append(tx)
+        self.timestamp.append(timestamp)
+
+    def __len__(self):
+        return len(self.rssi)
+
+    def __getitem__(self, row):
+        return DetectedClient(self.type, udid=self.udids[self.udidIndex[row]], beaconMac=self.macs[self.macIndex[row]],
+            majorNumber=self.majorNumber, minorNumber=self.minorNumber, tx=self.tx[row], rssi=self.rssi[row],
+            deviceId=self.deviceId, createTime=self.timestamp[row])
+
+    def __iter__(self):
+        for row in range(len(self.rssi)):
+            yield self[row]
+
+    def toNumpy(self):
+        """The columns as NumPy arrays sharing memory with the batch, needs numpy"""
+        import numpy
+        return {'macIndex': numpy.frombuffer(self.macIndex, dtype=numpy.uint32),
+            'udidIndex': numpy.frombuffer(self.udidIndex, dtype=numpy.uint32),
+            'rssi': numpy.frombuffer(self.rssi, dtype=numpy.int8),
+            'tx': numpy.frombuffer(self.tx, dtype=numpy.int8),
+            'timestamp': numpy.frombuffer(self.timestamp, dtype=numpy.float64)}
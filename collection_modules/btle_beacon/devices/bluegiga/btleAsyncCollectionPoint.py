@@ -0,0 +1,56 @@
+"""
+asyncio flavour of BtleThreadCollectionPoint.
+
+Opens the BLED112 through the BGLib asyncio transport and sends the same
+scan setup commands, awaiting each response instead of blocking in
+check_activity.  Scan responses are dispatched from the event loop as the
+bytes arrive, so several of these can share one loop and one thread.
+"""
+
+import asyncio
+from simplesensor.collection_modules.btle_beacon.libs.bglib.aio import open_serial_connection
+from .btleThreadCollectionPoint import BtleThreadCollectionPoint
+
+class BtleAsyncCollectionPoint(BtleThreadCollectionPoint):
+
+    def __init__(self,clientEventHandler,btleConfig,loggingQueue,debugMode=False,deviceId=None):
+        super(BtleAsyncCollectionPoint, self).__init__(clientEventHandler,btleConfig,loggingQueue,debugMode,deviceId)
+        self.protocol = None
+        self.sequenceLock = None
+
+    async def start(self):
+        self.ble = self.createBGLib()
+        if self.btleConfig['BtleCaptureFile'] or self.btleConfig['BtleReplayFile']:
+            self.logger.warn("Capture and replay only work with the blocking and poll reader modes, talking to the device directly")
+        self.logger.info("Establishing asyncio serial connection to BLED112 on com port %s at baud rate %s"%(self.deviceId,self.btleConfig['BtleDeviceBaudRate']))
+        transport, self.protocol = await open_serial_connection(self.deviceId, self.btleConfig['BtleDeviceBaudRate'], self.ble)
+        transport.serial.reset_input_buffer()
+        transport.serial.reset_output_buffer()
+        self.sequenceLock = asyncio.Lock()
+        await self.setupScan()
+
+    async def setupScan(self):
+        await self.sendCommandsAsync(self.scanSetupCommands())
+
+    async def sendCommandsAsync(self, commands):
+        # one sequence at a time, so a scan restart cannot land in the middle of a whitelist update
+        async with self.sequenceLock:
+            for command in commands:
+                try:
+                    await self.protocol.send_command(command)
+                except asyncio.TimeoutError:
+                    # same as the threaded start, a missing response is logged and we carry on
+                    self.logger.error("BGAPI command timed out. Make sure the BLE device is in a known/idle state.")
+
+    def sendCommands(self, commands):
+        """Send commands in the background, has to be called from the event loop"""
+        if commands:
+            asyncio.ensure_future(self.sendCommandsAsync(commands))
+
+    async def waitClosed(self):
+        """Wait until the serial connection is lost, returns the exception that closed it if any"""
+        return await self.protocol.closed
+
+    def stop(self):
+        if self.protocol is not None:
+            self.protocol.close()
@@ -6,22 +6,60 @@ import time
 import json
 import requests
 import platform
+import asyncio
 from threading import Thread
+from collections import deque
 from .btleThreadCollectionPoint import BtleThreadCollectionPoint
-from simplesensor.collection_modules.btle_beacon.detectedClient import DetectedClient
-from threadsafeLogger import ThreadsafeLogger
+from .btleAsyncCollectionPoint import BtleAsyncCollectionPoint
+from simplesensor.collection_modules.btle_beacon.detectedClient import DetectedClientBatch
+from simplesensor.collection_modules.btle_beacon.iBeaconDecoder import IBeaconDecoder
+from simplesensor.collection_modules.btle_beacon.adaptiveScanController import AdaptiveScanController, toScanUnits
+from simplesensor.shared import ThreadsafeLogger
 
 class BlueGigaBtleCollectionPointThread(Thread):
 
-    def __init__(self, queue, btleConfig, loggingQueue, debugMode=False):
+    def __init__(self, queue, btleConfig, loggingQueue, debugMode=False, deviceId=None, whitelist=None):
         Thread.__init__(self)
         # Logger
         self.loggingQueue = loggingQueue
         self.logger = ThreadsafeLogger(loggingQueue, __name__)
         self.alive = True
+        self.debugMode = debugMode
         self.btleConfig = btleConfig
         self.queue = queue
-        self.btleCollectionPoint = BtleThreadCollectionPoint(self.eventScanResponse,self.btleConfig,self.loggingQueue)
+        self.deviceId = deviceId if deviceId is not None else self.btleConfig['BtleDeviceId']
+        self.loop = None
+        self.readerMode = self.btleConfig['BtleReaderMode']
+        self.readerTimeout = self.btleConfig['BtleReaderTimeout']/1000
+        self.batchSize = self.btleConfig['BtleBatchSize']
+        self.batchTimeout = self.btleConfig['BtleBatchTimeout']/1000
+        self.batchDeadline = None
+        self.batches = 0
+        self.wakeups = 0
+        self.adverts = 0
+        self.scanResponses = 0 # every advert the device reported, ours or not
+        self.startTime = time.time()
+        self.beaconDecoder = IBeaconDecoder(self.btleConfig['BtleAdvertisingMajor'], self.btleConfig['BtleAdvertisingMinor'])
+        self.detectedClients = self.newBatch() # the batch being filled
+        if self.readerMode == 'asyncio':
+            self.btleCollectionPoint = BtleAsyncCollectionPoint(self.eventScanResponse,self.btleConfig,self.loggingQueue,deviceId=self.deviceId)
+        else:
+            self.btleCollectionPoint = BtleThreadCollectionPoint(self.eventScanResponse,self.btleConfig,self.loggingQueue,deviceId=self.deviceId)
+        self.btleCollectionPoint.whitelist = list(whitelist) if whitelist else []
+        # beacons registered since the last loop, added to the device whitelist from the reader's own thread
+        self.pendingWhitelist = deque()
+        # duplicate filtering only reports a beacon once per scan, restarting the scan reports it again
+        self.scanRestartInterval = self.btleConfig['BtleScanRestartInterval']/1000
+        self.scanRestartDeadline = None
+        self.scanRestarts = 0
+        # scan settings picked by the adaptive scan, applied from the reader's own thread
+        self.scanController = None
+        if self.btleConfig['BtleAdaptiveScan']:
+            self.scanController = AdaptiveScanController(self.btleCollectionPoint.scanSettings,
+                toScanUnits(self.btleConfig['BtleAdaptiveScanMinWindow']), self.btleConfig['BtleAdaptiveScanMaxRate'])
+        self.pendingScanSettings = None
+        self.lastAdaptTime = self.startTime
+        self.lastAdaptScanResponses = 0
 
     def bleDetect(self,__name__,repeatcount=10):
         try:
@@ -31,67 +69,166 @@ class BlueGigaBtleCollectionPointThread(Thread):
             self.sendFailureNotice("Unable to connect to BTLE device")
             quit()
 
+        self.startTime = self.lastAdaptTime = time.time()
+        self.scheduleScanRestart()
         while self.alive:
+            self.wakeups += 1
             try:
-                self.btleCollectionPoint.scan()
+                if self.readerMode == 'blocking':
+                    # sleeps in the serial read until bytes arrive, but not past the
+                    # batch timeout while a batch is waiting to go out
+                    self.btleCollectionPoint.waitForScan(self.batchTimeout if self.detectedClients else self.readerTimeout)
+                else:
+                    self.btleCollectionPoint.scan()
             except Exception as e:
                 self.logger.error("[btleThread] Unable to scan BTLE device: %s"%e)
                 self.sendFailureNotice("Unable to connect to BTLE device to perform a scan")
                 quit()
 
-            # don't burden the CPU
-            time.sleep(0.01)
+            self.flushDueDetectedClients()
+            self.maintainScan()
+            if self.readerMode != 'blocking':
+                # don't burden the CPU
+                time.sleep(0.01)
+        self.flushDetectedClients()
 
-    # handler to print scan responses with a timestamp
+    async def bleDetectAsync(self):
+        """asyncio version of bleDetect, scan responses are handled on the running loop until the device goes away"""
+        self.loop = asyncio.get_event_loop()
+        try:
+            await self.btleCollectionPoint.start()
+        except Exception as e:
+            self.logger.error("[btleThread] Unable to connect to BTLE device %s: %s"%(self.deviceId,e))
+            self.sendFailureNotice("Unable to connect to BTLE device %s"%self.deviceId)
+            return
+
+        self.startTime = self.lastAdaptTime = time.time()
+        if self.scanRestartInterval:
+            self.loop.call_later(self.scanRestartInterval, self.restartScanAsync)
+        error = await self.btleCollectionPoint.waitClosed()
+        self.flushDetectedClients()
+        if self.alive:
+            self.logger.error("[btleThread] Lost connection to BTLE device %s: %s"%(self.deviceId,error))
+            self.sendFailureNotice("Lost connection to BTLE device %s"%self.deviceId)
+
+    # handler for scan responses, passes the beacons we care about on to the event manager
     def eventScanResponse(self,sender,args):
-
-        #check to make sure there is enough data to be a beacon
-        if len(args["data"]) > 15:
-            # self.logger.debug("=============================== eventScanResponse START ===============================")
-            try:
-                majorNumber = args["data"][26] | (args["data"][25] << 8)
-                # self.logger.debug("majorNumber=%i"%majorNumber)
-            except:
-                majorNumber = 0
-
-            try:
-                minorNumber = args["data"][28] | (args["data"][27] << 8)
-                # self.logger.debug("minorNumber=%i"%minorNumber)
-            except:
-                minorNumber = 0
-
-            if self.btleConfig['BtleAdvertisingMajor'] == majorNumber and self.btleConfig['BtleAdvertisingMinor'] == minorNumber:
-                self.logger.debug("self.btleConfig['BtleAdvertisingMinor'] == %i and self.btleConfig['BtleAdvertisingMinor'] == %i "%(majorNumber,minorNumber))
-                self.logger.debug("yep, we care about this major and minor so lets create a detected client and pass it to the event manager")
-
-                udid = "%s" % ''.join(['%02X' % b for b in args["data"][9:25]])
-                self.logger.debug("UDID=%s"%udid)
-                rssi = args["rssi"]
-                self.logger.debug("rssi=%s"%rssi)
-
-                beaconMac = "%s" % ''.join(['%02X' % b for b in args["sender"][::-1]])
-                self.logger.debug("beaconMac=%s"%beaconMac)
-                rawTxPower = args["data"][29]
-                self.logger.debug("rawTxPower=%i"%rawTxPower)
-
-                if rawTxPower <= 127:
-                    txPower = rawTxPower
-                else:
-                    txPower = rawTxPower - 256
-                self.logger.debug("txPower=%i"%txPower)
-
-                arrayDetectedClients = [] #we send an array to the event queue, we used to process bacthes of responses
-
-                #package it up for sending to the queue
-                detectedClient = DetectedClient('btle',udid=udid,beaconMac=beaconMac,majorNumber=majorNumber,minorNumber=minorNumber,tx=txPower,rssi=rssi)
-                arrayDetectedClients.append(detectedClient)
-
-                #put it on the queue for the event manager to pick up
-                self.queue.put(arrayDetectedClients)
-                self.logger.debug("================================= eventScanResponse END =================================")
+        self.scanResponses += 1
+        beacon = self.beaconDecoder.decode(args["data"], args["sender"])
+        if beacon is None:
+            return
+
+        udid, beaconMac, txPower = beacon
+        self.adverts += 1
+        if self.debugMode:
+            self.logger.debug("beacon %s udid %s rssi %s tx %s" % (beaconMac, udid, args["rssi"], txPower))
+
+        if not self.detectedClients:
+            self.batchDeadline = time.time() + self.batchTimeout
+            if self.loop is not None:
+                self.loop.call_later(self.batchTimeout, self.flushDueDetectedClients)
+
+        #batch it up for the event manager, stamped with the time the serial chunk carrying it was read
+        createTime = getattr(sender, 'rx_time', None) or time.time()
+        self.detectedClients.append(beaconMac, udid, args["rssi"], txPower, createTime)
+        if len(self.detectedClients) >= self.batchSize:
+            self.flushDetectedClients()
+
+    def newBatch(self):
+        return DetectedClientBatch('btle', majorNumber=self.beaconDecoder.major, minorNumber=self.beaconDecoder.minor, deviceId=self.deviceId)
+
+    def flushDueDetectedClients(self):
+        """Send the current batch if it has waited the batch timeout"""
+        if self.batchDeadline is not None and time.time() >= self.batchDeadline:
+            self.flushDetectedClients()
+
+    def flushDetectedClients(self):
+        """Put the current batch on the queue for the event manager to pick up, one put per batch"""
+        if self.detectedClients:
+            self.queue.put(self.detectedClients)
+            self.detectedClients = self.newBatch()
+            self.batchDeadline = None
+            self.batches += 1
+
+    def whitelistBeacon(self, mac):
+        """Add a beacon to the device whitelist, safe to call from any thread"""
+        self.pendingWhitelist.append(mac)
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.applyWhitelist)
+
+    def applyWhitelist(self):
+        macs = []
+        while self.pendingWhitelist:
+            macs.append(self.pendingWhitelist.popleft())
+        self.btleCollectionPoint.sendCommands(self.btleCollectionPoint.updateWhitelistCommands(macs))
+
+    def scheduleScanRestart(self):
+        if self.scanRestartInterval and self.btleCollectionPoint.scanSettings.duplicateFiltering:
+            self.scanRestartDeadline = time.time() + self.scanRestartInterval
+        else:
+            self.scanRestartDeadline = None
+
+    def restartScan(self):
+        self.btleCollectionPoint.sendCommands(self.btleCollectionPoint.restartScanCommands())
+        self.scanRestarts += 1
+        self.scheduleScanRestart()
+
+    def restartScanAsync(self):
+        if self.alive:
+            if self.btleCollectionPoint.scanSettings.duplicateFiltering:
+                self.restartScan()
+            self.loop.call_later(self.scanRestartInterval, self.restartScanAsync)
+
+    def adaptScan(self, queueFill, dropped):
+        """Let the adaptive scan look at the scan responses per second since the last call and the
+        queue, called from the collection point every adaptive scan period.  Returns the new scan
+        settings with the reason and the load behind them, or None when nothing changes"""
+        if self.scanController is None:
+            return None
+        now = time.time()
+        rate = (self.scanResponses - self.lastAdaptScanResponses)/max(now - self.lastAdaptTime, 1e-6)
+        self.lastAdaptTime = now
+        self.lastAdaptScanResponses = self.scanResponses
+        change = self.scanController.update(rate, queueFill, dropped)
+        if change is None:
+            return None
+        scanSettings, reason = change
+        self.pendingScanSettings = scanSettings
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.applyScanSettings)
+        metric = scanSettings.asDict()
+        metric.update({'DeviceId': self.deviceId, 'Reason': reason, 'ScanResponsesPerSecond': rate, 'QueueFill': queueFill})
+        return metric
+
+    def applyScanSettings(self):
+        scanSettings, self.pendingScanSettings = self.pendingScanSettings, None
+        if scanSettings is not None:
+            self.btleCollectionPoint.sendCommands(self.btleCollectionPoint.scanSettingsCommands(scanSettings))
+            self.scheduleScanRestart()
+
+    def maintainScan(self):
+        """Device housekeeping between reads: scan settings, whitelist updates and duplicate filtering restarts"""
+        if self.pendingScanSettings is not None:
+            self.applyScanSettings()
+        if self.pendingWhitelist:
+            self.applyWhitelist()
+        if self.scanRestartDeadline is not None and time.time() >= self.scanRestartDeadline:
+            self.restartScan()
 
     def stop(self):
         self.alive = False
+        if self.loop is not None:
+            # the asyncio transport has to be closed from its own loop
+            self.loop.call_soon_threadsafe(self.btleCollectionPoint.stop)
+
+    def getReaderStats(self):
+        """Wakeups and accepted adverts per second since the reader started"""
+        elapsed = max(time.time() - self.startTime, 1e-6)
+        return {'ReaderMode': self.readerMode, 'WakeupsPerSecond': self.wakeups/elapsed, 'AdvertsPerSecond': self.adverts/elapsed,
+            'AdvertsPerBatch': self.adverts/max(self.batches, 1), 'ScanRestarts': self.scanRestarts,
+            'WhitelistSize': len(self.btleCollectionPoint.whitelist) if self.btleCollectionPoint.whitelistEnforced() else 0,
+            'ScanResponsesPerSecond': self.scanResponses/elapsed, 'ScanSettings': self.btleCollectionPoint.scanSettings.asDict(),
+            'ScanSettingsChanges': self.scanController.changes if self.scanController is not None else 0}
 
     def sendFailureNotice(self,msg):
         if len(self.btleConfig['SlackChannelWebhookUrl']) > 10:
@@ -4,71 +4,120 @@
 #
 from simplesensor.collection_modules.btle_beacon.libs import BGLib
 from simplesensor.shared import ThreadsafeLogger
+from simplesensor.collection_modules.btle_beacon.beaconWhitelist import macToAddress
+from simplesensor.collection_modules.btle_beacon.adaptiveScanController import ScanSettings, toScanUnits
+from .serialCapture import CaptureSerial, ReplaySerial
 from pprint import pprint
 from serial import Serial
+import functools
 import optparse
+import re
 
 class BtleThreadCollectionPoint(object):
 
-    def __init__(self,clientEventHandler,btleConfig,loggingQueue,debugMode=False):
+    def __init__(self,clientEventHandler,btleConfig,loggingQueue,debugMode=False,deviceId=None,serialFactory=None):
         # Logger
         self.loggingQueue = loggingQueue
         self.logger = ThreadsafeLogger(loggingQueue, __name__)
 
         self.btleConfig = btleConfig
+        self.deviceId = deviceId if deviceId is not None else self.btleConfig['BtleDeviceId']
         self.clientEventHandler = clientEventHandler
         self.debug = debugMode
+        # called like serial.Serial(port=, baudrate=, timeout=), lets a capture stand in for the device
+        self.serialFactory = serialFactory
+        if self.serialFactory is None:
+            self.serialFactory = Serial
+            if self.btleConfig['BtleReplayFile']:
+                self.serialFactory = functools.partial(ReplaySerial, self.capturePath(self.btleConfig['BtleReplayFile']), speed=self.btleConfig['BtleReplaySpeed'])
+        # beacon MACs loaded into the device whitelist, only used when the whitelist is enforced
+        self.whitelist = []
+        self.enforceWhitelist = self.btleConfig['BtleWhitelistMode'] == 'enforce'
+        # scan interval and window in 0.625ms units, changed at runtime by the adaptive scan
+        self.scanSettings = ScanSettings(toScanUnits(self.btleConfig['BtleScanInterval']),
+            min(toScanUnits(self.btleConfig['BtleScanWindow']), toScanUnits(self.btleConfig['BtleScanInterval'])),
+            self.btleConfig['BtleScanDuplicateFiltering'])
         # define basic BGAPI parser
         self.bgapi_rx_buffer = []
         self.bgapi_rx_expected_length = 0
 
     def start(self):
-        packet_mode = False
-
-        # create BGLib object
-        self.ble = BGLib()
-        self.ble.packet_mode = packet_mode
-        self.ble.debug = self.debug
+        self.ble = self.createBGLib()
 
         # add handler for BGAPI timeout condition (hopefully won't happen)
         self.ble.on_timeout += self.my_timeout
 
-        # on busy hander
-        self.ble.on_busy = self.on_busy
-
-        # add handler for the gap_scan_response event
-        self.ble.ble_evt_gap_scan_response += self.clientEventHandler
-
         # create serial port object and flush buffers
-        self.logger.info("Establishing serial connection to BLED112 on com port %s at baud rate %s"%(self.btleConfig['BtleDeviceId'],self.btleConfig['BtleDeviceBaudRate']))
-        self.serial = Serial(port=self.btleConfig['BtleDeviceId'], baudrate=self.btleConfig['BtleDeviceBaudRate'], timeout=1)
+        self.logger.info("Establishing serial connection to BLED112 on com port %s at baud rate %s"%(self.deviceId,self.btleConfig['BtleDeviceBaudRate']))
+        self.serial = self.serialFactory(port=self.deviceId, baudrate=self.btleConfig['BtleDeviceBaudRate'], timeout=1)
+        if self.btleConfig['BtleCaptureFile']:
+            self.logger.info("Recording serial traffic from %s to %s"%(self.deviceId,self.capturePath(self.btleConfig['BtleCaptureFile'])))
+            self.serial = CaptureSerial(self.serial, self.capturePath(self.btleConfig['BtleCaptureFile']))
         self.serial.flushInput()
         self.serial.flushOutput()
 
+        self.sendCommands(self.scanSetupCommands())
+
+    def sendCommands(self, commands):
+        for command in commands:
+            self.ble.send_command(self.serial, command)
+            self.ble.check_activity(self.serial, 1)
+
+    def capturePath(self, path):
+        """With several devices each one gets its own capture file, suffixed with its device id"""
+        if len(self.btleConfig['BtleDeviceIds']) > 1:
+            path = "%s.%s"%(path, re.sub(r'[^A-Za-z0-9]+', '_', self.deviceId).strip('_'))
+        return path
+
+    def createBGLib(self):
+        packet_mode = False
+
+        # create BGLib object
+        ble = BGLib()
+        ble.packet_mode = packet_mode
+        # read whatever is waiting on the port in one go and frame whole packets
+        ble.chunked_mode = True
+        ble.debug = self.debug
+
+        # add handler for the gap_scan_response event
+        ble.ble_evt_gap_scan_response += self.clientEventHandler
+
+        # the whitelist can fill up, say so instead of silently missing beacons
+        ble.ble_rsp_system_whitelist_append += self.on_whitelist_append
+        ble.ble_rsp_gap_set_filtering += self.on_set_filtering
+        ble.ble_rsp_gap_set_scan_parameters += self.on_set_scan_parameters
+        return ble
+
+    def scanSetupCommands(self):
+        """BGAPI commands that put the BLED112 into passive scanning, in the order they are sent"""
+        commands = []
+
         # disconnect if we are connected already
-        self.ble.send_command(self.serial, self.ble.ble_cmd_connection_disconnect(0))
-        self.ble.check_activity(self.serial, 1)
+        commands.append(self.ble.ble_cmd_connection_disconnect(0))
 
         # stop advertising if we are advertising already
-        self.ble.send_command(self.serial, self.ble.ble_cmd_gap_set_mode(0, 0))
-        self.ble.check_activity(self.serial, 1)
+        commands.append(self.ble.ble_cmd_gap_set_mode(0, 0))
 
         # stop scanning if we are scanning already
-        self.ble.send_command(self.serial, self.ble.ble_cmd_gap_end_procedure())
-        self.ble.check_activity(self.serial, 1)
+        commands.append(self.ble.ble_cmd_gap_end_procedure())
 
         # set the TX
         # range 0 to 15 (real TX power from -23 to +3dBm)
-        #self.ble.send_command(self.serial, self.ble.ble_cmd_hardware_set_txpower(self.btleConfig['btleDeviceTxPower']))
-        #self.ble.check_activity(self.serial,1)
+        #commands.append(self.ble.ble_cmd_hardware_set_txpower(self.btleConfig['btleDeviceTxPower']))
 
         #ble_cmd_connection_update connection: 0 (0x00) interval_min: 30 (0x001e) interval_max: 46 (0x002e) latency: 0 (0x0000) timeout: 100 (0x0064)
         #interval_min 6-3200
         #interval_man 6-3200
         #latency 0-500
         #timeout 10-3200
-        self.ble.send_command(self.serial, self.ble.ble_cmd_connection_update(0x00,0x001e,0x002e,0x0000,0x0064))
-        self.ble.check_activity(self.serial, 1)
+        commands.append(self.ble.ble_cmd_connection_update(0x00,0x001e,0x002e,0x0000,0x0064))
+
+        # hardware filtering, has to be set while the device is not scanning
+        #scan_policy 0=report all advertisers 1=only advertisers in the whitelist
+        #adv_policy 0=all, only matters when advertising
+        #scan_duplicate_filtering 0=report every advert 1=report each advertiser once per scan procedure
+        commands.extend(self.whitelistCommands(self.whitelist, clear=True))
+        commands.append(self.setFilteringCommand())
 
         # set scan parameters
         #scan_interval 0x4 - 0x4000
@@ -97,13 +146,69 @@ class BtleThreadCollectionPoint(object):
         # Bluetooth stack will send a scan request packet to the advertiser to try and
         # read the scan response data.
         # 0: Passive scanning is used. No scan request is made.
-        #self.ble.send_command(self.serial, self.ble.ble_cmd_gap_set_scan_parameters(0x4B,0x32,1))
-        self.ble.send_command(self.serial, self.ble.ble_cmd_gap_set_scan_parameters(0xC8,0xC8,0))
-        self.ble.check_activity(self.serial, 1)
+        #commands.append(self.ble.ble_cmd_gap_set_scan_parameters(0x4B,0x32,1))
+        commands.append(self.ble.ble_cmd_gap_set_scan_parameters(self.scanSettings.interval,self.scanSettings.window,0))
 
         # start scanning now
-        self.ble.send_command(self.serial, self.ble.ble_cmd_gap_discover(1))
-        self.ble.check_activity(self.serial, 1)
+        commands.append(self.ble.ble_cmd_gap_discover(1))
+        return commands
+
+    def whitelistEnforced(self):
+        # an empty whitelist would hide every beacon, so without known beacons at start we scan everything
+        return self.enforceWhitelist and len(self.whitelist) > 0
+
+    def whitelistCommands(self, macs, clear=False):
+        """Commands that load macs into the device whitelist.  Each MAC goes in as both a public
+        and a random address, the detected client does not keep the address type"""
+        commands = []
+        if not self.whitelistEnforced():
+            return commands
+        if clear:
+            commands.append(self.ble.ble_cmd_system_whitelist_clear())
+        for mac in macs:
+            address = macToAddress(mac)
+            commands.append(self.ble.ble_cmd_system_whitelist_append(address, 0))
+            commands.append(self.ble.ble_cmd_system_whitelist_append(address, 1))
+        return commands
+
+    def updateWhitelistCommands(self, macs):
+        """Commands that add macs to the whitelist of a scanning device.  The whitelist cannot change
+        while the scan uses it, so the scan is stopped around the appends."""
+        macs = [mac for mac in macs if mac not in self.whitelist]
+        if not macs or not self.whitelistEnforced():
+            return []
+        self.whitelist.extend(macs)
+        commands = [self.ble.ble_cmd_gap_end_procedure()]
+        commands.extend(self.whitelistCommands(macs))
+        commands.append(self.ble.ble_cmd_gap_discover(1))
+        return commands
+
+    def setFilteringCommand(self):
+        return self.ble.ble_cmd_gap_set_filtering(1 if self.whitelistEnforced() else 0, 0, 1 if self.scanSettings.duplicateFiltering else 0)
+
+    def scanSettingsCommands(self, scanSettings):
+        """Commands that reprogram the scan of a scanning device, filtering and scan parameters
+        only take effect when the scan is started again"""
+        self.scanSettings = scanSettings
+        return [self.ble.ble_cmd_gap_end_procedure(), self.setFilteringCommand(),
+            self.ble.ble_cmd_gap_set_scan_parameters(scanSettings.interval, scanSettings.window, 0),
+            self.ble.ble_cmd_gap_discover(1)]
+
+    def restartScanCommands(self):
+        """Stopping and starting the scan resets duplicate filtering, so every beacon is reported again"""
+        return [self.ble.ble_cmd_gap_end_procedure(), self.ble.ble_cmd_gap_discover(1)]
+
+    def on_whitelist_append(self, sender, args):
+        if args['result'] != 0:
+            self.logger.error("BLED112 %s could not add to its whitelist, error 0x%04x. It may be full, beacons missing from it are not reported"%(self.deviceId,args['result']))
+
+    def on_set_filtering(self, sender, args):
+        if args['result'] != 0:
+            self.logger.error("BLED112 %s rejected the scan filtering settings, error 0x%04x"%(self.deviceId,args['result']))
+
+    def on_set_scan_parameters(self, sender, args):
+        if args['result'] != 0:
+            self.logger.error("BLED112 %s rejected the scan parameters %s, error 0x%04x"%(self.deviceId,self.scanSettings.asDict(),args['result']))
 
     # handler to notify of an API parser timeout condition
     def my_timeout(self,sender, args):
@@ -115,9 +220,6 @@ class BtleThreadCollectionPoint(object):
         self.ble.send_command(self.serial, self.ble.ble_cmd_gap_discover(1))
         self.ble.check_activity(self.serial, 1)
 
-    def on_busy(self,sender, args):
-        self.logger.warn( "BGAPI device is busy." )
-
     def scan(self):
         # check for all incoming data (no timeout, non-blocking)
         self.ble.check_activity(self.serial)
@@ -125,5 +227,10 @@ class BtleThreadCollectionPoint(object):
         # check for all incoming data (with timeout)
         # self.ble.check_activity(self.serial,timeout=1)
 
+    def waitForScan(self, timeout):
+        # block until the device sends something or timeout seconds pass,
+        # returns the number of bytes handled
+        return self.ble.wait_activity(self.serial, timeout)
+
 
 
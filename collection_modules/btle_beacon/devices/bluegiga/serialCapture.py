@@ -0,0 +1,184 @@
+"""
+Capture and replay of the raw BLED112 serial byte stream.
+
+CaptureSerial wraps an open serial.Serial and writes every chunk it reads to a
+capture file along with its arrival time.  ReplaySerial stands in for
+serial.Serial and plays a capture file back to BGLib, either at the recorded
+pace or as fast as the reader can take it, so the whole scanner pipeline can
+be exercised without a BLED112 or a room full of beacons.
+
+Capture file layout, all little endian:
+
+    header  b'BGCAP' version(B) startTime(d, unix epoch)
+    record  delta(I, microseconds since the previous record) length(H) data
+"""
+
+import struct
+import time
+
+MAGIC = b'BGCAP'
+VERSION = 1
+_header = struct.Struct('<5sBd')
+_record = struct.Struct('<IH')
+_maxDelta = 0xFFFFFFFF
+_maxLength = 0xFFFF
+
+class CaptureWriter(object):
+    """Appends timestamped chunks to a capture file"""
+
+    def __init__(self, path, startTime=None):
+        self.startTime = time.time() if startTime is None else startTime
+        self.lastTime = self.startTime
+        self.file = open(path, 'wb')
+        self.file.write(_header.pack(MAGIC, VERSION, self.startTime))
+
+    def write(self, data, now=None):
+        now = time.time() if now is None else now
+        delta = min(_maxDelta, max(0, int(round((now - self.lastTime)*1000000))))
+        self.lastTime = now
+        for start in range(0, len(data), _maxLength):
+            chunk = data[start:start+_maxLength]
+            self.file.write(_record.pack(delta, len(chunk)))
+            self.file.write(chunk)
+            delta = 0
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def readCapture(path):
+    """Returns (startTime, [(secondsSinceStart, data), ...]) for a capture file"""
+    with open(path, 'rb') as f:
+        blob = f.read()
+    if len(blob) < _header.size:
+        raise ValueError("%s is not a BGAPI capture file" % path)
+    magic, version, startTime = _header.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("%s is not a BGAPI capture file" % path)
+
+    chunks = []
+    offset = _header.size
+    elapsed = 0
+    while offset + _record.size <= len(blob):
+        delta, length = _record.unpack_from(blob, offset)
+        offset += _record.size
+        elapsed += delta
+        chunks.append((elapsed/1000000, blob[offset:offset+length]))
+        offset += length
+    return startTime, chunks
+
+
+class CaptureSerial(object):
+    """Passes everything through to the wrapped port and records what it reads"""
+
+    def __init__(self, serial, path):
+        self.serial = serial
+        self.writer = CaptureWriter(path)
+
+    def read(self, size=1):
+        data = self.serial.read(size)
+        if data:
+            self.writer.write(data)
+        return data
+
+    def close(self):
+        self.writer.close()
+        self.serial.close()
+
+    @property
+    def timeout(self):
+        return self.serial.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self.serial.timeout = value
+
+    def __getattr__(self, name):
+        # write, in_waiting, flushInput and the rest go straight to the port
+        return getattr(self.serial, name)
+
+
+class ReplaySerial(object):
+    """Read side of serial.Serial backed by a capture file.
+
+    speed 1 plays the capture at the recorded pace, 2 twice as fast and so on.
+    speed 0 hands over each recorded chunk as soon as it is asked for.  Writes
+    are counted and dropped, the device answers come from the capture.
+    """
+
+    def __init__(self, path, speed=1, timeout=None, **kwargs):
+        self.path = path
+        self.speed = speed
+        self.timeout = timeout
+        self.startTime, self.chunks = readCapture(path)
+        self.bytesTotal = sum(len(data) for _, data in self.chunks)
+        self.bytesRead = 0
+        self.bytesWritten = 0
+        self.index = 0
+        self.pending = b''
+        self.playStart = None
+        self.finishedAt = None # perf_counter time the last byte was read
+
+    @property
+    def finished(self):
+        return not self.pending and self.index >= len(self.chunks)
+
+    def __due(self):
+        # move every chunk whose time has come into pending
+        if self.playStart is None:
+            self.playStart = time.perf_counter()
+        if self.speed:
+            elapsed = (time.perf_counter() - self.playStart)*self.speed
+            while self.index < len(self.chunks) and self.chunks[self.index][0] <= elapsed:
+                self.pending += self.chunks[self.index][1]
+                self.index += 1
+        elif not self.pending and self.index < len(self.chunks):
+            self.pending = self.chunks[self.index][1]
+            self.index += 1
+
+    def __secondsUntilNext(self):
+        return max(0, self.chunks[self.index][0]/self.speed - (time.perf_counter() - self.playStart))
+
+    @property
+    def in_waiting(self):
+        self.__due()
+        return len(self.pending)
+
+    def inWaiting(self):
+        return self.in_waiting
+
+    def read(self, size=1):
+        self.__due()
+        if not self.pending and self.speed and self.index < len(self.chunks):
+            wait = self.__secondsUntilNext()
+            if self.timeout is None or wait <= self.timeout:
+                time.sleep(wait)
+                self.__due()
+            elif self.timeout:
+                time.sleep(self.timeout)
+        elif not self.pending and self.speed and self.timeout:
+            # end of the capture looks like a quiet port
+            time.sleep(self.timeout)
+
+        data = self.pending[:size]
+        self.pending = self.pending[size:]
+        self.bytesRead += len(data)
+        if self.finishedAt is None and self.finished:
+            self.finishedAt = time.perf_counter()
+        return data
+
+    def write(self, data):
+        self.bytesWritten += len(data)
+        return len(data)
+
+    def flushInput(self):
+        pass
+
+    def flushOutput(self):
+        pass
+
+    def close(self):
+        pass
@@ -2,9 +2,12 @@
 
 """
 import os.path
+import time
 import logging 
 from simplesensor.shared import Message, ThreadsafeLogger
-from .btleRegisteredClient import BtleRegisteredClient
+from .btleRegisteredClient import BtleRegisteredClient, BtleClientSettings
+from .pathLoss import estimateDistances, HAVE_NUMPY
+from .clientTable import ClientTable
 
 class EventManager(object):
     def __init__(self, collectionPointConfig, pOutBoundQueue, registeredClientRegistry, loggingQueue):
@@ -18,9 +21,26 @@ class EventManager(object):
         self.registeredClientRegistry.eventRegisteredClientRemoved += self.__removedRegisteredClient
         self.collectionPointConfig = collectionPointConfig
         self.outBoundEventQueue = pOutBoundQueue
+        # one logger, uid map and set of thresholds for all the registered clients
+        self.clientSettings = BtleClientSettings(self.collectionPointConfig, self.loggingQueue)
+        # in distance mode a batch gets all its distances from one NumPy call
+        self.distanceBatches = self.collectionPointConfig['BtleRssiClientInThresholdType'] == 'distance' and self.collectionPointConfig['InterfaceType'] == 'btle'
+        if self.distanceBatches and not HAVE_NUMPY:
+            self.logger.info("numpy is not installed, distances are worked out one advert at a time")
+            self.distanceBatches = False
+        # or every registered client is a slot in a table of NumPy columns and batches are worked through in array operations
+        self.clientTable = None
+        if self.collectionPointConfig['BtleVectorizedBatches'] and self.collectionPointConfig['InterfaceType'] == 'btle':
+            if HAVE_NUMPY:
+                self.clientTable = ClientTable(self.clientSettings)
+            else:
+                self.logger.info("numpy is not installed, batches are registered one advert at a time")
 
 
     def registerDetectedClient(self, detectedClient):
+        if self.clientTable is not None:
+            self.__registerClientsVectorized((detectedClient,))
+            return
         self.logger.debug("Registering detected client %s"%detectedClient.extraData["beaconMac"])
         eClient = self.registeredClientRegistry.getRegisteredClient(detectedClient.extraData["beaconMac"])
 
@@ -28,32 +48,101 @@ class EventManager(object):
         if eClient == None:
             #Newly found client
             if self.collectionPointConfig['InterfaceType'] == 'btle':
-                rClient = BtleRegisteredClient(detectedClient,self.collectionPointConfig,self.loggingQueue)
-            self.logger.debug("New client with MAC %s found."%detectedClient.extraData["beaconMac"])
-
-            if rClient.shouldSendClientInEvent():
-                self.__sendEventToController(rClient, "clientIn")
-            elif rClient.shouldSendClientOutEvent():
-                self.logger.debug("########################################## SENDING CLIENT OUT eClient ##########################################")
-                self.__sendEventToController(rClient, "clientOut")
-
-            self.registeredClientRegistry.addNewRegisteredClient(rClient)
+                rClient = BtleRegisteredClient(detectedClient,self.clientSettings)
+            self.__handleNewClient(rClient, detectedClient)
 
         else:
             eClient.updateWithNewDetectedClientData(detectedClient)
-            if eClient.shouldSendClientInEvent():
-                #self.logger.debug("########################################## SENDING CLIENT IN ##########################################")
-                self.__sendEventToController(eClient,"clientIn")
-            elif eClient.shouldSendClientOutEvent():
-                self.logger.debug("########################################## SENDING CLIENT OUT rClient ##########################################")
-                self.__sendEventToController(eClient,"clientOut")
+            self.__handleUpdatedClient(eClient)
+
+    def __handleNewClient(self, rClient, detectedClient):
+        self.logger.debug("New client with MAC %s found."%detectedClient.extraData["beaconMac"])
+
+        if rClient.shouldSendClientInEvent():
+            self.__sendEventToController(rClient, "clientIn")
+        elif rClient.shouldSendClientOutEvent():
+            self.logger.debug("########################################## SENDING CLIENT OUT eClient ##########################################")
+            self.__sendEventToController(rClient, "clientOut")
+
+        self.registeredClientRegistry.addNewRegisteredClient(rClient)
 
-            self.registeredClientRegistry.updateRegisteredClient(eClient)
+    def __handleUpdatedClient(self, eClient):
+        if eClient.shouldSendClientInEvent():
+            #self.logger.debug("########################################## SENDING CLIENT IN ##########################################")
+            self.__sendEventToController(eClient,"clientIn")
+        elif eClient.shouldSendClientOutEvent():
+            self.logger.debug("########################################## SENDING CLIENT OUT rClient ##########################################")
+            self.__sendEventToController(eClient,"clientOut")
+
+        self.registeredClientRegistry.updateRegisteredClient(eClient)
 
     def registerClients(self,detectedClients):
+        if self.clientTable is not None:
+            self.__registerClientsVectorized(detectedClients)
+            return
+        if self.distanceBatches:
+            self.__registerClientsWithDistances(detectedClients)
+            return
         for detectedClient in detectedClients:
             self.registerDetectedClient(detectedClient)
 
+    def __registerClientsWithDistances(self, detectedClients):
+        """Same as registerDetectedClient for every client in the batch, but the distances are worked out with
+        one NumPy pass per round.  The nth round has the nth advert of every beacon in the batch, so each advert
+        goes through its client's rssi filter and in or out checks before the next advert of that beacon"""
+        touched = {} # beacon mac -> [registered client, adverts so far], new ones are only added to the registry in their first round
+        rounds = []
+        for detectedClient in detectedClients:
+            mac = detectedClient.extraData["beaconMac"]
+            entry = touched.get(mac)
+            if entry is None:
+                rClient = self.registeredClientRegistry.getRegisteredClient(mac)
+                isNew = rClient is None
+                if isNew:
+                    rClient = BtleRegisteredClient(detectedClient,self.clientSettings,handleEvent=False)
+                entry = touched[mac] = [rClient, 0]
+            else:
+                isNew = False
+            rClient, seen = entry
+            if seen == len(rounds):
+                rounds.append([])
+            rounds[seen].append((detectedClient, rClient, isNew))
+            entry[1] = seen + 1
+
+        for rows in rounds:
+            accepted = [rClient.rssiFilter.add(detectedClient.extraData['rssi']) for detectedClient, rClient, isNew in rows]
+            distances = estimateDistances([rClient.rssiFilter.estimate for _, rClient, _ in rows],
+                [detectedClient.extraData['tx'] for detectedClient, _, _ in rows],
+                self.collectionPointConfig['BtlePathLossModel'], self.collectionPointConfig['BtlePathLossExponent']).tolist()
+            for (detectedClient, rClient, isNew), sampleAccepted, distance in zip(rows, accepted, distances):
+                if isNew:
+                    rClient.handleNewDetectedClientEvent(detectedClient, sampleAccepted, distance)
+                    self.__handleNewClient(rClient, detectedClient)
+                else:
+                    rClient.updateWithNewDetectedClientData(detectedClient, sampleAccepted, distance)
+                    self.__handleUpdatedClient(rClient)
+
+    def __registerClientsVectorized(self, detectedClients):
+        """Same as registerDetectedClient for every client in the batch, on the columns of the client table.
+        A beacon heard several times in the batch goes through one round per advert, the events of a round
+        are sent in the order of the batch"""
+        table = self.clientTable
+        now = time.time()
+        with table.lock:
+            rowSlots, rssi, tx, newClients = table.prepare(detectedClients, now)
+            # like __handleNewClient a new client goes into the registry right after its first events,
+            # the first round has the first advert of every beacon in batch order
+            newIndexes = None
+            for rows, slots in table.rounds(rowSlots):
+                if newIndexes is None:
+                    newIndexes = table.positions(slots, newClients)
+                for index, eventType in table.advance(slots, rssi[rows], tx[rows], now):
+                    while newIndexes and newIndexes[-1] < index:
+                        self.registeredClientRegistry.addNewRegisteredClient(table.clients[slots[newIndexes.pop()]])
+                    self.__sendEventToController(table.clients[slots[index]], eventType)
+                while newIndexes:
+                    self.registeredClientRegistry.addNewRegisteredClient(table.clients[slots[newIndexes.pop()]])
+
     def getEventAuditData(self):
         """Returns a dict with the total New and Remove events the engine has seen since startup"""
         return {'NewEvents': self.__stats_totalNewEvents, 'RemoveEvents': self.__stats_totalRemoveEvents}
@@ -68,9 +157,20 @@ class EventManager(object):
             self.__stats_totalNewEvents += 1
 
     def __removedRegisteredClient(self,sender,registeredClient):
+        if self.clientTable is None:
+            self.__handleRemovedClient(registeredClient)
+        else:
+            # the sweep runs on its own thread, a batch must not change the client's slot while it is expired
+            with self.clientTable.lock:
+                self.__handleRemovedClient(registeredClient)
+
+    def __handleRemovedClient(self, registeredClient):
         self.logger.debug("######### REGISTERED REMOVED %s #########"%registeredClient.detectedClient.extraData["beaconMac"])
         if registeredClient.sweepShouldSendClientOutEvent():
             self.__sendEventToController(registeredClient,"clientOut")
+        # sending the clientOut stores the client again, its slot is only free if it stayed out of the registry
+        if self.clientTable is not None and self.registeredClientRegistry.getRegisteredClient(registeredClient.getUdid()) is not registeredClient:
+            self.clientTable.release(registeredClient)
 
         #we dont need to count for ever and eat up all the memory
         if self.__stats_totalRemoveEvents > 1000000:
@@ -0,0 +1,209 @@
+"""
+When a registered client turns into a clientIn or clientOut event.
+
+gateway_type picks one of these state machines.  compileGatewayPolicy
+builds it once from the config, every registered client keeps only its
+state number in gatewayState and the policy advances it with tuple
+indexing and attribute reads, no config lookups per advert.
+
+    proximity  clientIn once a beacon has been in range more than twice,
+               repeated every proximity_event_interval while it stays.
+               clientOut once it has been counted out of range
+               btle_client_out_count_threshold times, and when the sweep
+               drops a client that has not had its clientOut yet
+    in         one clientIn when a beacon comes into range, nothing when
+               it leaves
+    out        one clientOut when a beacon comes into range, nothing when
+               it leaves
+    inout      clientIn the first time a beacon comes into range, clientOut
+               the next time, and so on, a door used both ways
+
+For in, out and inout a beacon has left once it is counted out of range
+btle_client_out_count_threshold times or has not been heard for leave_time.
+The next time it comes into range is a new pass through the gateway.
+
+A policy has these methods, client is a BtleRegisteredClient:
+
+    seen(client, now)                   every advert, before lastRegisteredTime
+                                        moves on to now
+    shouldSendClientIn(client, now)     True if the advert makes a clientIn,
+                                        zeroes the range counters when it does
+    shouldSendClientOut(client, now)    the same for clientOut, only asked when
+                                        there is no clientIn
+    sweepShouldSendClientOut(client)    True if the sweep sends a clientOut for
+                                        a client it drops
+    clientInSent(client)                the clientIn went out
+    clientOutSent(client)               the clientOut went out
+    seenBatch(table, slots, now)        seen for every slot of a ClientTable in
+                                        slots, a NumPy array without repeats
+    evaluateBatch(table, slots, now)    shouldSendClientIn and, where that is
+                                        False, shouldSendClientOut for every
+                                        slot, two boolean arrays lined up with
+                                        slots
+
+seenBatch and evaluateBatch work on the NumPy columns of a ClientTable,
+see clientTable.py.
+"""
+
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+PROXIMITY = 'proximity'
+IN = 'in'
+OUT = 'out'
+INOUT = 'inout'
+GATEWAY_TYPES = (PROXIMITY, IN, OUT, INOUT)
+
+class ProximityPolicy(object):
+    # nothing sent yet, clientIn sent since the last clientOut, clientOut sent since the last clientIn
+    NEW, PRESENT, ABSENT = 0, 1, 2
+    __slots__ = ('inTriggerCount', 'outCountThreshold', 'eventInterval')
+
+    def __init__(self, settings):
+        self.inTriggerCount = settings.clientInRangeTriggerCount
+        self.outCountThreshold = settings.clientOutCountThreshold
+        self.eventInterval = settings.proximityEventInterval
+
+    def seen(self, client, now):
+        # the sweep is what notices a proximity client left
+        pass
+
+    def shouldSendClientIn(self, client, now):
+        if math.trunc(now - client.prevClientInMsgTime) > self.eventInterval:
+            if client.numClientInRange > self.inTriggerCount:
+                client.logClientEventSend("SHOULD ClientIN event to controller for")
+                client.zeroEventRangeCounters()
+                return True
+        return False
+
+    def shouldSendClientOut(self, client, now):
+        if client.gatewayState == self.PRESENT:
+            #do we have enought qualifying out events. we dont want to throw one too soon
+            if client.numClientOutRange >= self.outCountThreshold:
+                client.logClientEventSend("SHOULD ClientOUT event to controller for")
+                client.zeroEventRangeCounters()
+                return True
+        elif client.numClientOutRange > self.outCountThreshold:
+            #lets check to see if we need to clean up the out count --- not sure this is the best idea
+            client.numClientOutRange = 0
+        return False
+
+    def seenBatch(self, table, slots, now):
+        pass
+
+    def evaluateBatch(self, table, slots, now):
+        numIn = table.numClientInRange[slots]
+        numOut = table.numClientOutRange[slots]
+        sendIn = (numpy.trunc(now - table.prevClientInMsgTime[slots]) > self.eventInterval) & (numIn > self.inTriggerCount)
+        present = table.gatewayState[slots] == self.PRESENT
+        sendOut = ~sendIn & present & (numOut >= self.outCountThreshold)
+        cleanUp = ~sendIn & ~present & (numOut > self.outCountThreshold)
+        sent = sendIn | sendOut
+        table.numClientInRange[slots[sent]] = 0
+        table.numClientOutRange[slots[sent | cleanUp]] = 0
+        return sendIn, sendOut
+
+    def sweepShouldSendClientOut(self, client):
+        if client.gatewayState == self.ABSENT:
+            return False
+        # present, or never sent anything at all
+        client.logClientEventSend("Sweep is sending ClientOUT on")
+        client.zeroEventRangeCounters()
+        return True
+
+    def clientInSent(self, client):
+        client.gatewayState = self.PRESENT
+
+    def clientOutSent(self, client):
+        client.gatewayState = self.ABSENT
+
+
+class PassagePolicy(object):
+    """in, out and inout.  Each state says whether a beacon coming into range
+    sends clientIn or clientOut and which state follows the event and
+    leaving again"""
+    __slots__ = ('inTriggerCount', 'outCountThreshold', 'leaveTime', 'sendsIn', 'sendsOut', 'afterIn', 'afterOut',
+        'afterLeaving', 'arrays')
+
+    def __init__(self, settings, sendsIn, sendsOut, afterIn, afterOut, afterLeaving):
+        self.inTriggerCount = settings.clientInRangeTriggerCount
+        self.outCountThreshold = settings.clientOutCountThreshold
+        self.leaveTime = settings.leaveTime
+        self.sendsIn = sendsIn
+        self.sendsOut = sendsOut
+        self.afterIn = afterIn
+        self.afterOut = afterOut
+        self.afterLeaving = afterLeaving
+        # the same tables for indexing with a whole column of states
+        self.arrays = None if numpy is None else (numpy.array(sendsIn), numpy.array(sendsOut), numpy.array(afterLeaving))
+
+    def seen(self, client, now):
+        if client.numClientOutRange >= self.outCountThreshold or now - client.lastRegisteredTime > self.leaveTime:
+            client.gatewayState = self.afterLeaving[client.gatewayState]
+            client.zeroEventRangeCounters()
+
+    def shouldSendClientIn(self, client, now):
+        if self.sendsIn[client.gatewayState] and client.numClientInRange > self.inTriggerCount:
+            client.logClientEventSend("SHOULD ClientIN event to controller for")
+            client.zeroEventRangeCounters()
+            return True
+        return False
+
+    def shouldSendClientOut(self, client, now):
+        if self.sendsOut[client.gatewayState] and client.numClientInRange > self.inTriggerCount:
+            client.logClientEventSend("SHOULD ClientOUT event to controller for")
+            client.zeroEventRangeCounters()
+            return True
+        return False
+
+    def seenBatch(self, table, slots, now):
+        left = (table.numClientOutRange[slots] >= self.outCountThreshold) | (now - table.lastRegisteredTime[slots] > self.leaveTime)
+        if left.any():
+            slots = slots[left]
+            table.gatewayState[slots] = self.arrays[2][table.gatewayState[slots]]
+            table.numClientInRange[slots] = 0
+            table.numClientOutRange[slots] = 0
+
+    def evaluateBatch(self, table, slots, now):
+        sendsIn, sendsOut, _ = self.arrays
+        state = table.gatewayState[slots]
+        ready = table.numClientInRange[slots] > self.inTriggerCount
+        sendIn = sendsIn[state] & ready
+        sendOut = ~sendIn & sendsOut[state] & ready
+        sent = slots[sendIn | sendOut]
+        table.numClientInRange[sent] = 0
+        table.numClientOutRange[sent] = 0
+        return sendIn, sendOut
+
+    def sweepShouldSendClientOut(self, client):
+        # leaving is never an event of its own at these gateways
+        return False
+
+    def clientInSent(self, client):
+        client.gatewayState = self.afterIn[client.gatewayState]
+
+    def clientOutSent(self, client):
+        client.gatewayState = self.afterOut[client.gatewayState]
+
+
+# in and out: 0 away, 1 in range and the event is sent
+# inout: 0 away and next is clientIn, 1 in range after clientIn, 2 away and next is clientOut, 3 in range after clientOut
+PASSAGES = {
+    IN: dict(sendsIn=(True, False), sendsOut=(False, False), afterIn=(1, 1), afterOut=(0, 1), afterLeaving=(0, 0)),
+    OUT: dict(sendsIn=(False, False), sendsOut=(True, False), afterIn=(0, 1), afterOut=(1, 1), afterLeaving=(0, 0)),
+    INOUT: dict(sendsIn=(True, False, False, False), sendsOut=(False, False, True, False),
+        afterIn=(1, 1, 2, 3), afterOut=(0, 1, 3, 3), afterLeaving=(0, 2, 2, 0)),
+}
+
+def compileGatewayPolicy(settings):
+    """The state machine for settings.gatewayType, see BtleClientSettings"""
+    gatewayType = settings.gatewayType.lower()
+    if gatewayType == PROXIMITY:
+        return ProximityPolicy(settings)
+    elif gatewayType in PASSAGES:
+        return PassagePolicy(settings, **PASSAGES[gatewayType])
+    raise ValueError("gateway type must be one of %s, not %s" % (', '.join(GATEWAY_TYPES), settings.gatewayType))
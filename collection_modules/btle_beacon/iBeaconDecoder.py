@@ -0,0 +1,45 @@
+"""
+iBeacon advertisement decoder
+
+Pulls the UUID, major, minor and tx power out of the advertisement data of a
+BLED112 scan response.  Frames for other majors/minors are rejected by
+comparing the raw major/minor bytes in place, so nothing is allocated for
+adverts we do not care about.
+
+iBeacon advertisement layout (offsets into the scan response data):
+    0-8     flags and manufacturer specific header
+    9-24    proximity UUID
+    25-26   major, big endian
+    27-28   minor, big endian
+    29      measured tx power at 1m, signed
+"""
+
+import struct
+
+class IBeaconDecoder(object):
+    _frame = struct.Struct('>16sHHb')
+    _frameOffset = 9
+    _majorMinorOffset = 25
+    _frameLength = 30
+
+    def __init__(self, major, minor):
+        self.major = major
+        self.minor = minor
+        self._majorMinor = struct.pack('>HH', major, minor)
+
+    def matches(self, data):
+        """True if data is long enough to be an iBeacon frame and carries our major and minor."""
+        return len(data) >= self._frameLength and data.startswith(self._majorMinor, self._majorMinorOffset)
+
+    def decode(self, data, sender):
+        """Decode a scan response into (udid, beaconMac, txPower).
+
+        data is the advertisement data and sender the little endian device
+        address, both bytes as found in ble_evt_gap_scan_response.  Returns
+        None if the frame is not for our major and minor.
+        """
+        if not self.matches(data):
+            return None
+        # unpack_from reads the frame in place, only the UUID is copied out
+        uuid, major, minor, txPower = self._frame.unpack_from(data, self._frameOffset)
+        return uuid.hex().upper(), sender[::-1].hex().upper(), txPower
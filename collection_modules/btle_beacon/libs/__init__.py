@@ -1,3 +1,3 @@
-from bglib import BGAPIEvent
-from bglib import BGAPIEventHandler
-from bglib import BGLib 
\ No newline at end of file
+from .bglib import BGAPIEvent
+from .bglib import BGAPIEventHandler
+from .bglib import BGLib
\ No newline at end of file
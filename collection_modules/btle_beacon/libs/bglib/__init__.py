@@ -0,0 +1,4 @@
+from .core import BGAPIEvent
+from .core import BGAPIEventHandler
+from .core import BGAPIPacketDecoder
+from .core import BGLib
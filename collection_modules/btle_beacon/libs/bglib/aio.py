@@ -0,0 +1,94 @@
+""" asyncio transport for BGLib
+
+BGAPIProtocol feeds the chunks an asyncio transport receives straight into
+the BGLib framer, so one event loop can drive any number of dongles without
+a reader thread per serial port.  Commands are awaitable and resolve with
+the arguments of their response.
+
+Serial ports are opened through pyserial-asyncio; any other stream transport
+(eg. a socketpair or pty stand-in) works with loop.create_connection.
+"""
+
+import asyncio
+
+from .core import BGLib
+
+
+class BGAPIProtocol(asyncio.Protocol):
+
+    def __init__(self, ble=None):
+        """Create it on the loop that runs the connection, transports call
+        the protocol factory from there"""
+        self.ble = ble if ble is not None else BGLib()
+        self.transport = None
+        loop = asyncio.get_event_loop()
+        # resolved with the transport by connection_made, with the closing exception by connection_lost
+        self.connected = loop.create_future()
+        self.closed = loop.create_future()
+        self._command_lock = asyncio.Lock()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        if not self.connected.done():
+            self.connected.set_result(transport)
+
+    def data_received(self, data):
+        self.ble.feed(data)
+
+    def connection_lost(self, exc):
+        self.transport = None
+        if not self.closed.done():
+            self.closed.set_result(exc)
+
+    async def send_command(self, packet, timeout=1):
+        """Send a BGAPI command and wait for its response.
+
+        Returns the response arguments as a dict.  Only one command is in
+        flight at a time, like the BGAPI protocol expects.  If no response
+        arrives within timeout seconds on_timeout fires and
+        asyncio.TimeoutError is raised.
+        """
+        if self.transport is None:
+            raise ConnectionError('BGAPI transport is not connected')
+        technology = 'wifi' if packet[0] & 0x08 else 'ble'
+        self.ble.load_command_set(technology)
+        decoder = self.ble.packet_decoders[(packet[0] & 0x88, packet[2], packet[3])]
+
+        async with self._command_lock:
+            response = asyncio.get_event_loop().create_future()
+
+            def on_response(sender, args):
+                if not response.done():
+                    response.set_result(args)
+
+            # subscribing also makes parse_packet decode the response
+            handler = decoder.descriptor.handler(self.ble)
+            handler.add(on_response)
+            try:
+                self.ble.send_command(self.transport, packet)
+                return await asyncio.wait_for(response, timeout)
+            except asyncio.TimeoutError:
+                self.ble.busy = False
+                self.ble.on_idle()
+                self.ble.on_timeout()
+                raise
+            finally:
+                handler.remove(on_response)
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+
+async def open_serial_connection(port, baudrate, ble=None):
+    """Open a serial port on the running loop, returns (transport, protocol)
+    once the protocol is connected."""
+    try:
+        import serial_asyncio
+    except ImportError:
+        raise ImportError('pyserial-asyncio is needed to drive serial ports from asyncio')
+    loop = asyncio.get_event_loop()
+    transport, protocol = await serial_asyncio.create_serial_connection(loop, lambda: BGAPIProtocol(ble), port, baudrate=baudrate)
+    # the serial transport only schedules connection_made, commands need it to have run
+    await protocol.connected
+    return transport, protocol
@@ -0,0 +1,318 @@
+""" BGAPI Bluetooth Smart (BLE) command set
+
+Command builders, response/event layout and idle events for BGLib.  BGLib
+imports this module the first time a ble_* attribute is used or a ble
+packet arrives, and installs everything onto the class.
+"""
+
+import struct
+
+
+# Packet layout, keyed on (message type | technology type, class ID, command
+# ID), ie. byte 0 masked with 0x88 followed by bytes 2 and 3 of the header.
+# Each entry is (event, payload struct format, field names, name of the
+# trailing uint8array or None).
+PACKETS = {
+    # responses
+    (0x00, 0, 0): ('ble_rsp_system_reset', None, (), None),
+    (0x00, 0, 1): ('ble_rsp_system_hello', None, (), None),
+    (0x00, 0, 2): ('ble_rsp_system_address_get', '<6s', ('address',), None),
+    (0x00, 0, 3): ('ble_rsp_system_reg_write', '<H', ('result',), None),
+    (0x00, 0, 4): ('ble_rsp_system_reg_read', '<HB', ('address', 'value'), None),
+    (0x00, 0, 5): ('ble_rsp_system_get_counters', '<BBBBB', ('txok', 'txretry', 'rxok', 'rxfail', 'mbuf'), None),
+    (0x00, 0, 6): ('ble_rsp_system_get_connections', '<B', ('maxconn',), None),
+    (0x00, 0, 7): ('ble_rsp_system_read_memory', '<IB', ('address',), 'data'),
+    (0x00, 0, 8): ('ble_rsp_system_get_info', '<HHHHHBB', ('major', 'minor', 'patch', 'build', 'll_version', 'protocol_version', 'hw'), None),
+    (0x00, 0, 9): ('ble_rsp_system_endpoint_tx', '<H', ('result',), None),
+    (0x00, 0, 10): ('ble_rsp_system_whitelist_append', '<H', ('result',), None),
+    (0x00, 0, 11): ('ble_rsp_system_whitelist_remove', '<H', ('result',), None),
+    (0x00, 0, 12): ('ble_rsp_system_whitelist_clear', None, (), None),
+    (0x00, 0, 13): ('ble_rsp_system_endpoint_rx', '<HB', ('result',), 'data'),
+    (0x00, 0, 14): ('ble_rsp_system_endpoint_set_watermarks', '<H', ('result',), None),
+    (0x00, 1, 0): ('ble_rsp_flash_ps_defrag', None, (), None),
+    (0x00, 1, 1): ('ble_rsp_flash_ps_dump', None, (), None),
+    (0x00, 1, 2): ('ble_rsp_flash_ps_erase_all', None, (), None),
+    (0x00, 1, 3): ('ble_rsp_flash_ps_save', '<H', ('result',), None),
+    (0x00, 1, 4): ('ble_rsp_flash_ps_load', '<HB', ('result',), 'value'),
+    (0x00, 1, 5): ('ble_rsp_flash_ps_erase', None, (), None),
+    (0x00, 1, 6): ('ble_rsp_flash_erase_page', '<H', ('result',), None),
+    (0x00, 1, 7): ('ble_rsp_flash_write_words', None, (), None),
+    (0x00, 2, 0): ('ble_rsp_attributes_write', '<H', ('result',), None),
+    (0x00, 2, 1): ('ble_rsp_attributes_read', '<HHHB', ('handle', 'offset', 'result'), 'value'),
+    (0x00, 2, 2): ('ble_rsp_attributes_read_type', '<HHB', ('handle', 'result'), 'value'),
+    (0x00, 2, 3): ('ble_rsp_attributes_user_read_response', None, (), None),
+    (0x00, 2, 4): ('ble_rsp_attributes_user_write_response', None, (), None),
+    (0x00, 3, 0): ('ble_rsp_connection_disconnect', '<BH', ('connection', 'result'), None),
+    (0x00, 3, 1): ('ble_rsp_connection_get_rssi', '<Bb', ('connection', 'rssi'), None),
+    (0x00, 3, 2): ('ble_rsp_connection_update', '<BH', ('connection', 'result'), None),
+    (0x00, 3, 3): ('ble_rsp_connection_version_update', '<BH', ('connection', 'result'), None),
+    (0x00, 3, 4): ('ble_rsp_connection_channel_map_get', '<BB', ('connection',), 'map'),
+    (0x00, 3, 5): ('ble_rsp_connection_channel_map_set', '<BH', ('connection', 'result'), None),
+    (0x00, 3, 6): ('ble_rsp_connection_features_get', '<BH', ('connection', 'result'), None),
+    (0x00, 3, 7): ('ble_rsp_connection_get_status', '<B', ('connection',), None),
+    (0x00, 3, 8): ('ble_rsp_connection_raw_tx', '<B', ('connection',), None),
+    (0x00, 4, 0): ('ble_rsp_attclient_find_by_type_value', '<BH', ('connection', 'result'), None),
+    (0x00, 4, 1): ('ble_rsp_attclient_read_by_group_type', '<BH', ('connection', 'result'), None),
+    (0x00, 4, 2): ('ble_rsp_attclient_read_by_type', '<BH', ('connection', 'result'), None),
+    (0x00, 4, 3): ('ble_rsp_attclient_find_information', '<BH', ('connection', 'result'), None),
+    (0x00, 4, 4): ('ble_rsp_attclient_read_by_handle', '<BH', ('connection', 'result'), None),
+    (0x00, 4, 5): ('ble_rsp_attclient_attribute_write', '<BH', ('connection', 'result'), None),
+    (0x00, 4, 6): ('ble_rsp_attclient_write_command', '<BH', ('connection', 'result'), None),
+    (0x00, 4, 7): ('ble_rsp_attclient_indicate_confirm', '<H', ('result',), None),
+    (0x00, 4, 8): ('ble_rsp_attclient_read_long', '<BH', ('connection', 'result'), None),
+    (0x00, 4, 9): ('ble_rsp_attclient_prepare_write', '<BH', ('connection', 'result'), None),
+    (0x00, 4, 10): ('ble_rsp_attclient_execute_write', '<BH', ('connection', 'result'), None),
+    (0x00, 4, 11): ('ble_rsp_attclient_read_multiple', '<BH', ('connection', 'result'), None),
+    (0x00, 5, 0): ('ble_rsp_sm_encrypt_start', '<BH', ('handle', 'result'), None),
+    (0x00, 5, 1): ('ble_rsp_sm_set_bondable_mode', None, (), None),
+    (0x00, 5, 2): ('ble_rsp_sm_delete_bonding', '<H', ('result',), None),
+    (0x00, 5, 3): ('ble_rsp_sm_set_parameters', None, (), None),
+    (0x00, 5, 4): ('ble_rsp_sm_passkey_entry', '<H', ('result',), None),
+    (0x00, 5, 5): ('ble_rsp_sm_get_bonds', '<B', ('bonds',), None),
+    (0x00, 5, 6): ('ble_rsp_sm_set_oob_data', None, (), None),
+    (0x00, 6, 0): ('ble_rsp_gap_set_privacy_flags', None, (), None),
+    (0x00, 6, 1): ('ble_rsp_gap_set_mode', '<H', ('result',), None),
+    (0x00, 6, 2): ('ble_rsp_gap_discover', '<H', ('result',), None),
+    (0x00, 6, 3): ('ble_rsp_gap_connect_direct', '<HB', ('result', 'connection_handle'), None),
+    (0x00, 6, 4): ('ble_rsp_gap_end_procedure', '<H', ('result',), None),
+    (0x00, 6, 5): ('ble_rsp_gap_connect_selective', '<HB', ('result', 'connection_handle'), None),
+    (0x00, 6, 6): ('ble_rsp_gap_set_filtering', '<H', ('result',), None),
+    (0x00, 6, 7): ('ble_rsp_gap_set_scan_parameters', '<H', ('result',), None),
+    (0x00, 6, 8): ('ble_rsp_gap_set_adv_parameters', '<H', ('result',), None),
+    (0x00, 6, 9): ('ble_rsp_gap_set_adv_data', '<H', ('result',), None),
+    (0x00, 6, 10): ('ble_rsp_gap_set_directed_connectable_mode', '<H', ('result',), None),
+    (0x00, 7, 0): ('ble_rsp_hardware_io_port_config_irq', '<H', ('result',), None),
+    (0x00, 7, 1): ('ble_rsp_hardware_set_soft_timer', '<H', ('result',), None),
+    (0x00, 7, 2): ('ble_rsp_hardware_adc_read', '<H', ('result',), None),
+    (0x00, 7, 3): ('ble_rsp_hardware_io_port_config_direction', '<H', ('result',), None),
+    (0x00, 7, 4): ('ble_rsp_hardware_io_port_config_function', '<H', ('result',), None),
+    (0x00, 7, 5): ('ble_rsp_hardware_io_port_config_pull', '<H', ('result',), None),
+    (0x00, 7, 6): ('ble_rsp_hardware_io_port_write', '<H', ('result',), None),
+    (0x00, 7, 7): ('ble_rsp_hardware_io_port_read', '<HBB', ('result', 'port', 'data'), None),
+    (0x00, 7, 8): ('ble_rsp_hardware_spi_config', '<H', ('result',), None),
+    (0x00, 7, 9): ('ble_rsp_hardware_spi_transfer', '<HBB', ('result', 'channel'), 'data'),
+    (0x00, 7, 10): ('ble_rsp_hardware_i2c_read', '<HB', ('result',), 'data'),
+    (0x00, 7, 11): ('ble_rsp_hardware_i2c_write', '<B', ('written',), None),
+    (0x00, 7, 12): ('ble_rsp_hardware_set_txpower', None, (), None),
+    (0x00, 7, 13): ('ble_rsp_hardware_timer_comparator', '<H', ('result',), None),
+    (0x00, 8, 0): ('ble_rsp_test_phy_tx', None, (), None),
+    (0x00, 8, 1): ('ble_rsp_test_phy_rx', None, (), None),
+    (0x00, 8, 2): ('ble_rsp_test_phy_end', '<H', ('counter',), None),
+    (0x00, 8, 3): ('ble_rsp_test_phy_reset', None, (), None),
+    (0x00, 8, 4): ('ble_rsp_test_get_channel_map', '<B', (), 'channel_map'),
+    (0x00, 8, 5): ('ble_rsp_test_debug', '<B', (), 'output'),
+
+    # events
+    (0x80, 0, 0): ('ble_evt_system_boot', '<HHHHHBB', ('major', 'minor', 'patch', 'build', 'll_version', 'protocol_version', 'hw'), None),
+    (0x80, 0, 1): ('ble_evt_system_debug', '<B', (), 'data'),
+    (0x80, 0, 2): ('ble_evt_system_endpoint_watermark_rx', '<BB', ('endpoint', 'data'), None),
+    (0x80, 0, 3): ('ble_evt_system_endpoint_watermark_tx', '<BB', ('endpoint', 'data'), None),
+    (0x80, 0, 4): ('ble_evt_system_script_failure', '<HH', ('address', 'reason'), None),
+    (0x80, 0, 5): ('ble_evt_system_no_license_key', None, (), None),
+    (0x80, 1, 0): ('ble_evt_flash_ps_key', '<HB', ('key',), 'value'),
+    (0x80, 2, 0): ('ble_evt_attributes_value', '<BBHHB', ('connection', 'reason', 'handle', 'offset'), 'value'),
+    (0x80, 2, 1): ('ble_evt_attributes_user_read_request', '<BHHB', ('connection', 'handle', 'offset', 'maxsize'), None),
+    (0x80, 2, 2): ('ble_evt_attributes_status', '<HB', ('handle', 'flags'), None),
+    (0x80, 3, 0): ('ble_evt_connection_status', '<BB6sBHHHB', ('connection', 'flags', 'address', 'address_type', 'conn_interval', 'timeout', 'latency', 'bonding'), None),
+    (0x80, 3, 1): ('ble_evt_connection_version_ind', '<BBHH', ('connection', 'vers_nr', 'comp_id', 'sub_vers_nr'), None),
+    (0x80, 3, 2): ('ble_evt_connection_feature_ind', '<BB', ('connection',), 'features'),
+    (0x80, 3, 3): ('ble_evt_connection_raw_rx', '<BB', ('connection',), 'data'),
+    (0x80, 3, 4): ('ble_evt_connection_disconnected', '<BH', ('connection', 'reason'), None),
+    (0x80, 4, 0): ('ble_evt_attclient_indicated', '<BH', ('connection', 'attrhandle'), None),
+    (0x80, 4, 1): ('ble_evt_attclient_procedure_completed', '<BHH', ('connection', 'result', 'chrhandle'), None),
+    (0x80, 4, 2): ('ble_evt_attclient_group_found', '<BHHB', ('connection', 'start', 'end'), 'uuid'),
+    (0x80, 4, 3): ('ble_evt_attclient_attribute_found', '<BHHBB', ('connection', 'chrdecl', 'value', 'properties'), 'uuid'),
+    (0x80, 4, 4): ('ble_evt_attclient_find_information_found', '<BHB', ('connection', 'chrhandle'), 'uuid'),
+    (0x80, 4, 5): ('ble_evt_attclient_attribute_value', '<BHBB', ('connection', 'atthandle', 'type'), 'value'),
+    (0x80, 4, 6): ('ble_evt_attclient_read_multiple_response', '<BB', ('connection',), 'handles'),
+    (0x80, 5, 0): ('ble_evt_sm_smp_data', '<BBB', ('handle', 'packet'), 'data'),
+    (0x80, 5, 1): ('ble_evt_sm_bonding_fail', '<BH', ('handle', 'result'), None),
+    (0x80, 5, 2): ('ble_evt_sm_passkey_display', '<BI', ('handle', 'passkey'), None),
+    (0x80, 5, 3): ('ble_evt_sm_passkey_request', '<B', ('handle',), None),
+    (0x80, 5, 4): ('ble_evt_sm_bond_status', '<BBBB', ('bond', 'keysize', 'mitm', 'keys'), None),
+    (0x80, 6, 0): ('ble_evt_gap_scan_response', '<bB6sBBB', ('rssi', 'packet_type', 'sender', 'address_type', 'bond'), 'data'),
+    (0x80, 6, 1): ('ble_evt_gap_mode_changed', '<BB', ('discover', 'connect'), None),
+    (0x80, 7, 0): ('ble_evt_hardware_io_port_status', '<IBBB', ('timestamp', 'port', 'irq', 'state'), None),
+    (0x80, 7, 1): ('ble_evt_hardware_soft_timer', '<B', ('handle',), None),
+    (0x80, 7, 2): ('ble_evt_hardware_adc_result', '<Bh', ('input', 'value'), None),
+}
+
+# events other than responses that also mean the device is idle again
+IDLE_EVENTS = ('ble_evt_system_boot',)
+
+
+# command builders, installed as BGLib methods
+def ble_cmd_system_reset(self, boot_in_dfu):
+    return struct.pack('<4BB', 0, 1, 0, 0, boot_in_dfu)
+def ble_cmd_system_hello(self):
+    return struct.pack('<4B', 0, 0, 0, 1)
+def ble_cmd_system_address_get(self):
+    return struct.pack('<4B', 0, 0, 0, 2)
+def ble_cmd_system_reg_write(self, address, value):
+    return struct.pack('<4BHB', 0, 3, 0, 3, address, value)
+def ble_cmd_system_reg_read(self, address):
+    return struct.pack('<4BH', 0, 2, 0, 4, address)
+def ble_cmd_system_get_counters(self):
+    return struct.pack('<4B', 0, 0, 0, 5)
+def ble_cmd_system_get_connections(self):
+    return struct.pack('<4B', 0, 0, 0, 6)
+def ble_cmd_system_read_memory(self, address, length):
+    return struct.pack('<4BIB', 0, 5, 0, 7, address, length)
+def ble_cmd_system_get_info(self):
+    return struct.pack('<4B', 0, 0, 0, 8)
+def ble_cmd_system_endpoint_tx(self, endpoint, data):
+    return struct.pack('<4BBB' + str(len(data)) + 's', 0, 2 + len(data), 0, 9, endpoint, len(data), bytes(i for i in data))
+def ble_cmd_system_whitelist_append(self, address, address_type):
+    return struct.pack('<4B6sB', 0, 7, 0, 10, bytes(i for i in address), address_type)
+def ble_cmd_system_whitelist_remove(self, address, address_type):
+    return struct.pack('<4B6sB', 0, 7, 0, 11, bytes(i for i in address), address_type)
+def ble_cmd_system_whitelist_clear(self):
+    return struct.pack('<4B', 0, 0, 0, 12)
+def ble_cmd_system_endpoint_rx(self, endpoint, size):
+    return struct.pack('<4BBB', 0, 2, 0, 13, endpoint, size)
+def ble_cmd_system_endpoint_set_watermarks(self, endpoint, rx, tx):
+    return struct.pack('<4BBBB', 0, 3, 0, 14, endpoint, rx, tx)
+def ble_cmd_flash_ps_defrag(self):
+    return struct.pack('<4B', 0, 0, 1, 0)
+def ble_cmd_flash_ps_dump(self):
+    return struct.pack('<4B', 0, 0, 1, 1)
+def ble_cmd_flash_ps_erase_all(self):
+    return struct.pack('<4B', 0, 0, 1, 2)
+def ble_cmd_flash_ps_save(self, key, value):
+    return struct.pack('<4BHB' + str(len(value)) + 's', 0, 3 + len(value), 1, 3, key, len(value), bytes(i for i in value))
+def ble_cmd_flash_ps_load(self, key):
+    return struct.pack('<4BH', 0, 2, 1, 4, key)
+def ble_cmd_flash_ps_erase(self, key):
+    return struct.pack('<4BH', 0, 2, 1, 5, key)
+def ble_cmd_flash_erase_page(self, page):
+    return struct.pack('<4BB', 0, 1, 1, 6, page)
+def ble_cmd_flash_write_words(self, address, words):
+    return struct.pack('<4BHB' + str(len(words)) + 's', 0, 3 + len(words), 1, 7, address, len(words), bytes(i for i in words))
+def ble_cmd_attributes_write(self, handle, offset, value):
+    return struct.pack('<4BHBB' + str(len(value)) + 's', 0, 4 + len(value), 2, 0, handle, offset, len(value), bytes(i for i in value))
+def ble_cmd_attributes_read(self, handle, offset):
+    return struct.pack('<4BHH', 0, 4, 2, 1, handle, offset)
+def ble_cmd_attributes_read_type(self, handle):
+    return struct.pack('<4BH', 0, 2, 2, 2, handle)
+def ble_cmd_attributes_user_read_response(self, connection, att_error, value):
+    return struct.pack('<4BBBB' + str(len(value)) + 's', 0, 3 + len(value), 2, 3, connection, att_error, len(value), bytes(i for i in value))
+def ble_cmd_attributes_user_write_response(self, connection, att_error):
+    return struct.pack('<4BBB', 0, 2, 2, 4, connection, att_error)
+def ble_cmd_connection_disconnect(self, connection):
+    return struct.pack('<4BB', 0, 1, 3, 0, connection)
+def ble_cmd_connection_get_rssi(self, connection):
+    return struct.pack('<4BB', 0, 1, 3, 1, connection)
+def ble_cmd_connection_update(self, connection, interval_min, interval_max, latency, timeout):
+    return struct.pack('<4BBHHHH', 0, 9, 3, 2, connection, interval_min, interval_max, latency, timeout)
+def ble_cmd_connection_version_update(self, connection):
+    return struct.pack('<4BB', 0, 1, 3, 3, connection)
+def ble_cmd_connection_channel_map_get(self, connection):
+    return struct.pack('<4BB', 0, 1, 3, 4, connection)
+def ble_cmd_connection_channel_map_set(self, connection, map):
+    return struct.pack('<4BBB' + str(len(map)) + 's', 0, 2 + len(map), 3, 5, connection, len(map), bytes(i for i in map))
+def ble_cmd_connection_features_get(self, connection):
+    return struct.pack('<4BB', 0, 1, 3, 6, connection)
+def ble_cmd_connection_get_status(self, connection):
+    return struct.pack('<4BB', 0, 1, 3, 7, connection)
+def ble_cmd_connection_raw_tx(self, connection, data):
+    return struct.pack('<4BBB' + str(len(data)) + 's', 0, 2 + len(data), 3, 8, connection, len(data), bytes(i for i in data))
+def ble_cmd_attclient_find_by_type_value(self, connection, start, end, uuid, value):
+    return struct.pack('<4BBHHHB' + str(len(value)) + 's', 0, 8 + len(value), 4, 0, connection, start, end, uuid, len(value), bytes(i for i in value))
+def ble_cmd_attclient_read_by_group_type(self, connection, start, end, uuid):
+    return struct.pack('<4BBHHB' + str(len(uuid)) + 's', 0, 6 + len(uuid), 4, 1, connection, start, end, len(uuid), bytes(i for i in uuid))
+def ble_cmd_attclient_read_by_type(self, connection, start, end, uuid):
+    return struct.pack('<4BBHHB' + str(len(uuid)) + 's', 0, 6 + len(uuid), 4, 2, connection, start, end, len(uuid), bytes(i for i in uuid))
+def ble_cmd_attclient_find_information(self, connection, start, end):
+    return struct.pack('<4BBHH', 0, 5, 4, 3, connection, start, end)
+def ble_cmd_attclient_read_by_handle(self, connection, chrhandle):
+    return struct.pack('<4BBH', 0, 3, 4, 4, connection, chrhandle)
+def ble_cmd_attclient_attribute_write(self, connection, atthandle, data):
+    return struct.pack('<4BBHB' + str(len(data)) + 's', 0, 4 + len(data), 4, 5, connection, atthandle, len(data), bytes(i for i in data))
+def ble_cmd_attclient_write_command(self, connection, atthandle, data):
+    return struct.pack('<4BBHB' + str(len(data)) + 's', 0, 4 + len(data), 4, 6, connection, atthandle, len(data), bytes(i for i in data))
+def ble_cmd_attclient_indicate_confirm(self, connection):
+    return struct.pack('<4BB', 0, 1, 4, 7, connection)
+def ble_cmd_attclient_read_long(self, connection, chrhandle):
+    return struct.pack('<4BBH', 0, 3, 4, 8, connection, chrhandle)
+def ble_cmd_attclient_prepare_write(self, connection, atthandle, offset, data):
+    return struct.pack('<4BBHHB' + str(len(data)) + 's', 0, 6 + len(data), 4, 9, connection, atthandle, offset, len(data), bytes(i for i in data))
+def ble_cmd_attclient_execute_write(self, connection, commit):
+    return struct.pack('<4BBB', 0, 2, 4, 10, connection, commit)
+def ble_cmd_attclient_read_multiple(self, connection, handles):
+    return struct.pack('<4BBB' + str(len(handles)) + 's', 0, 2 + len(handles), 4, 11, connection, len(handles), bytes(i for i in handles))
+def ble_cmd_sm_encrypt_start(self, handle, bonding):
+    return struct.pack('<4BBB', 0, 2, 5, 0, handle, bonding)
+def ble_cmd_sm_set_bondable_mode(self, bondable):
+    return struct.pack('<4BB', 0, 1, 5, 1, bondable)
+def ble_cmd_sm_delete_bonding(self, handle):
+    return struct.pack('<4BB', 0, 1, 5, 2, handle)
+def ble_cmd_sm_set_parameters(self, mitm, min_key_size, io_capabilities):
+    return struct.pack('<4BBBB', 0, 3, 5, 3, mitm, min_key_size, io_capabilities)
+def ble_cmd_sm_passkey_entry(self, handle, passkey):
+    return struct.pack('<4BBI', 0, 5, 5, 4, handle, passkey)
+def ble_cmd_sm_get_bonds(self):
+    return struct.pack('<4B', 0, 0, 5, 5)
+def ble_cmd_sm_set_oob_data(self, oob):
+    return struct.pack('<4BB' + str(len(oob)) + 's', 0, 1 + len(oob), 5, 6, len(oob), bytes(i for i in oob))
+def ble_cmd_gap_set_privacy_flags(self, peripheral_privacy, central_privacy):
+    return struct.pack('<4BBB', 0, 2, 6, 0, peripheral_privacy, central_privacy)
+def ble_cmd_gap_set_mode(self, discover, connect):
+    return struct.pack('<4BBB', 0, 2, 6, 1, discover, connect)
+def ble_cmd_gap_discover(self, mode):
+    return struct.pack('<4BB', 0, 1, 6, 2, mode)
+def ble_cmd_gap_connect_direct(self, address, addr_type, conn_interval_min, conn_interval_max, timeout, latency):
+    return struct.pack('<4B6sBHHHH', 0, 15, 6, 3, bytes(i for i in address), addr_type, conn_interval_min, conn_interval_max, timeout, latency)
+def ble_cmd_gap_end_procedure(self):
+    return struct.pack('<4B', 0, 0, 6, 4)
+def ble_cmd_gap_connect_selective(self, conn_interval_min, conn_interval_max, timeout, latency):
+    return struct.pack('<4BHHHH', 0, 8, 6, 5, conn_interval_min, conn_interval_max, timeout, latency)
+def ble_cmd_gap_set_filtering(self, scan_policy, adv_policy, scan_duplicate_filtering):
+    return struct.pack('<4BBBB', 0, 3, 6, 6, scan_policy, adv_policy, scan_duplicate_filtering)
+def ble_cmd_gap_set_scan_parameters(self, scan_interval, scan_window, active):
+    return struct.pack('<4BHHB', 0, 5, 6, 7, scan_interval, scan_window, active)
+def ble_cmd_gap_set_adv_parameters(self, adv_interval_min, adv_interval_max, adv_channels):
+    return struct.pack('<4BHHB', 0, 5, 6, 8, adv_interval_min, adv_interval_max, adv_channels)
+def ble_cmd_gap_set_adv_data(self, set_scanrsp, adv_data):
+    return struct.pack('<4BBB' + str(len(adv_data)) + 's', 0, 2 + len(adv_data), 6, 9, set_scanrsp, len(adv_data), bytes(i for i in adv_data))
+def ble_cmd_gap_set_directed_connectable_mode(self, address, addr_type):
+    return struct.pack('<4B6sB', 0, 7, 6, 10, bytes(i for i in address), addr_type)
+def ble_cmd_hardware_io_port_config_irq(self, port, enable_bits, falling_edge):
+    return struct.pack('<4BBBB', 0, 3, 7, 0, port, enable_bits, falling_edge)
+def ble_cmd_hardware_set_soft_timer(self, time, handle, single_shot):
+    return struct.pack('<4BIBB', 0, 6, 7, 1, time, handle, single_shot)
+def ble_cmd_hardware_adc_read(self, input, decimation, reference_selection):
+    return struct.pack('<4BBBB', 0, 3, 7, 2, input, decimation, reference_selection)
+def ble_cmd_hardware_io_port_config_direction(self, port, direction):
+    return struct.pack('<4BBB', 0, 2, 7, 3, port, direction)
+def ble_cmd_hardware_io_port_config_function(self, port, function):
+    return struct.pack('<4BBB', 0, 2, 7, 4, port, function)
+def ble_cmd_hardware_io_port_config_pull(self, port, tristate_mask, pull_up):
+    return struct.pack('<4BBBB', 0, 3, 7, 5, port, tristate_mask, pull_up)
+def ble_cmd_hardware_io_port_write(self, port, mask, data):
+    return struct.pack('<4BBBB', 0, 3, 7, 6, port, mask, data)
+def ble_cmd_hardware_io_port_read(self, port, mask):
+    return struct.pack('<4BBB', 0, 2, 7, 7, port, mask)
+def ble_cmd_hardware_spi_config(self, channel, polarity, phase, bit_order, baud_e, baud_m):
+    return struct.pack('<4BBBBBBB', 0, 6, 7, 8, channel, polarity, phase, bit_order, baud_e, baud_m)
+def ble_cmd_hardware_spi_transfer(self, channel, data):
+    return struct.pack('<4BBB' + str(len(data)) + 's', 0, 2 + len(data), 7, 9, channel, len(data), bytes(i for i in data))
+def ble_cmd_hardware_i2c_read(self, address, stop, length):
+    return struct.pack('<4BBBB', 0, 3, 7, 10, address, stop, length)
+def ble_cmd_hardware_i2c_write(self, address, stop, data):
+    return struct.pack('<4BBBB' + str(len(data)) + 's', 0, 3 + len(data), 7, 11, address, stop, len(data), bytes(i for i in data))
+def ble_cmd_hardware_set_txpower(self, power):
+    return struct.pack('<4BB', 0, 1, 7, 12, power)
+def ble_cmd_hardware_timer_comparator(self, timer, channel, mode, comparator_value):
+    return struct.pack('<4BBBBH', 0, 5, 7, 13, timer, channel, mode, comparator_value)
+def ble_cmd_test_phy_tx(self, channel, length, type):
+    return struct.pack('<4BBBB', 0, 3, 8, 0, channel, length, type)
+def ble_cmd_test_phy_rx(self, channel):
+    return struct.pack('<4BB', 0, 1, 8, 1, channel)
+def ble_cmd_test_phy_end(self):
+    return struct.pack('<4B', 0, 0, 8, 2)
+def ble_cmd_test_phy_reset(self):
+    return struct.pack('<4B', 0, 0, 8, 3)
+def ble_cmd_test_get_channel_map(self):
+    return struct.pack('<4B', 0, 0, 8, 4)
+def ble_cmd_test_debug(self, input):
+    return struct.pack('<4BB' + str(len(input)) + 's', 0, 1 + len(input), 8, 5, len(input), bytes(i for i in input))
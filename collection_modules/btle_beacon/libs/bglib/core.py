@@ -0,0 +1,450 @@
+#!/usr/bin/env python
+""" Bluegiga BGAPI/BGLib implementation
+
+Changelog:
+    2026-10-18 - Split into a package, BLE and Wi-Fi command sets are
+                 loaded on first use from ble.py and wifi.py
+               - Table driven packet dispatch and chunked framing
+               - feed() stamps the chunk it dispatches in rx_time
+               - Event handlers live in a tuple on the instance, looking an
+                 event up or firing it no longer allocates a handler object
+    2013-05-04 - Fixed single-item struct.unpack returns (@zwasson on Github)
+    2013-04-28 - Fixed numerous uint8array/bd_addr command arg errors
+               - Added 'debug' support
+    2013-04-16 - Fixed 'bglib_on_idle' to be 'on_idle'
+    2013-04-15 - Added wifi BGAPI support in addition to BLE BGAPI
+               - Fixed references to 'this' instead of 'self'
+    2013-04-11 - Initial release
+
+============================================
+Bluegiga BGLib Python interface library
+2013-05-04 by Jeff Rowberg <jeff@rowberg.net>
+Updates should (hopefully) always be available at https://github.com/jrowberg/bglib
+
+============================================
+BGLib Python interface library code is placed under the MIT license
+Copyright (c) 2013 Jeff Rowberg
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+===============================================
+
+"""
+
+__author__ = "Jeff Rowberg"
+__license__ = "MIT"
+__version__ = "2013-05-04"
+__email__ = "jeff@rowberg.net"
+
+import importlib
+import select
+import struct
+import threading
+import time
+
+
+# thanks to Masaaki Shibata for Python event handler code
+# http://www.emptypage.jp/notes/pyevent.en.html
+
+class BGAPIEvent(object):
+
+    """An event on BGLib, eg. ble_evt_gap_scan_response.
+
+    The first access on an instance stores a BGAPIEventHandler in the
+    instance dict under the event's name.  From then on attribute lookups
+    find the handler there without calling back into the descriptor, and
+    += / -= store the same handler back.
+    """
+
+    def __init__(self, doc=None, name=None):
+        self.__doc__ = doc
+        self.name = name
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self.handler(obj)
+
+    def handler(self, obj):
+        """The handler list of this event on obj, created on first use"""
+        handler = obj.__dict__.get(self.name)
+        if handler is None:
+            # setdefault so two threads asking at once end up with the same one
+            handler = obj.__dict__.setdefault(self.name, BGAPIEventHandler(self, obj))
+        return handler
+
+
+class BGAPIEventHandler(object):
+
+    """The handlers of one event on one object.
+
+    They are kept in a tuple that add() and remove() replace, so fire()
+    walks a snapshot without copying and handlers may subscribe and
+    unsubscribe from other threads, or from a handler, while it runs.
+    """
+
+    __slots__ = ('event', 'obj', 'handlers')
+
+    def __init__(self, event, obj):
+
+        self.event = event
+        self.obj = obj
+        self.handlers = ()
+
+    def add(self, func):
+
+        """Add new event handler function.
+
+        Event handler function must be defined like func(sender, earg).
+        You can add handler also by using '+=' operator.
+        """
+
+        self.handlers = self.handlers + (func,)
+        return self
+
+    def remove(self, func):
+
+        """Remove existing event handler function.
+
+        You can remove handler also by using '-=' operator.
+        """
+
+        handlers = list(self.handlers)
+        handlers.remove(func)
+        self.handlers = tuple(handlers)
+        return self
+
+    def fire(self, earg=None):
+
+        """Fire event and call all handler functions
+
+        You can call EventHandler object itself like e(earg) instead of
+        e.fire(earg).
+        """
+
+        for func in self.handlers:
+            func(self.obj, earg)
+
+    def __len__(self):
+        return len(self.handlers)
+
+    __iadd__ = add
+    __isub__ = remove
+    __call__ = fire
+
+
+class BGAPIPacketDecoder(object):
+
+    """Precompiled decoder for one BGAPI response or event.
+
+    The fixed part of the payload is unpacked with a struct.Struct built once
+    when the command set is loaded.  A trailing uint8array (eg. the advertisement data of a
+    scan response) is handed over as a bytes slice under the tail name.
+    decode() is generated per packet type, the way namedtuple builds its
+    methods, so it returns a dict literal instead of zipping names at runtime.
+    """
+
+    __slots__ = ('event', 'descriptor', 'struct', 'fields', 'tail', 'idle', 'decode')
+
+    def __init__(self, event, fmt, fields, tail, idle):
+        self.event = event
+        self.descriptor = None # the BGAPIEvent installed on BGLib for this event
+        self.struct = struct.Struct(fmt) if fmt else None
+        self.fields = fields
+        self.tail = tail
+        self.idle = idle
+        self.decode = self._compile()
+
+    def _compile(self):
+        items = ["'%s': %s" % (name, name) for name in self.fields]
+        lines = ['def decode(_packet):']
+        if self.struct is not None:
+            # a tail is prefixed by its length, always the last struct member
+            names = list(self.fields) + (['_length'] if self.tail else [])
+            lines.append('    %s, = _unpack_from(_packet, 4)' % ', '.join(names))
+        if self.tail is not None:
+            offset = 4 + (self.struct.size if self.struct else 0)
+            items.append("'%s': _packet[%d:]" % (self.tail, offset))
+        lines.append('    return {%s}' % ', '.join(items))
+        namespace = {'_unpack_from': self.struct.unpack_from if self.struct else None}
+        exec('\n'.join(lines), namespace)
+        return namespace['decode']
+
+
+def compile_packet_decoders(packets, idle_events):
+    decoders = {}
+    for key, (event, fmt, fields, tail) in packets.items():
+        idle = key[0] & 0x80 == 0 or event in idle_events
+        decoders[key] = BGAPIPacketDecoder(event, fmt, fields, tail, idle)
+    return decoders
+
+
+_command_set_lock = threading.Lock()
+
+
+class BGLib(object):
+
+    # command sets are imported on first use, keyed on their attribute prefix
+    command_sets = {'ble': '.ble', 'wifi': '.wifi'}
+    loaded_command_sets = ()
+    packet_decoders = {}
+
+    on_busy = BGAPIEvent()
+    on_idle = BGAPIEvent()
+    on_timeout = BGAPIEvent()
+    on_before_tx_command = BGAPIEvent()
+    on_tx_command_complete = BGAPIEvent()
+
+    bgapi_rx_buffer = b""
+    bgapi_rx_expected_length = 0
+    bgapi_rx_frame = None
+    busy = False
+    packet_mode = False
+    chunked_mode = False
+    debug = False
+    packets_skipped = 0 # packets framed but not decoded because nobody listens
+    rx_time = None # time.time() when feed() got the chunk it is dispatching
+
+    def send_command(self, ser, packet):
+        if self.packet_mode: packet = chr(len(packet) & 0xFF) + packet
+        if self.debug: print('=>[ ' + ' '.join(['%02X' % b for b in packet]) + ' ]')
+        self.on_before_tx_command()
+        self.busy = True
+        self.on_busy()
+        ser.write(packet)
+        self.on_tx_command_complete()
+
+    def check_activity(self, ser, timeout=0):
+        if self.chunked_mode:
+            return self.check_activity_chunked(ser, timeout)
+        if timeout > 0:
+            try:
+                ser.timeout = timeout
+                while 1:
+                    x = ser.read()
+                    if len(x) > 0:
+                        self.parse(x)
+                    else: # timeout
+                        self.busy = False
+                        self.on_idle()
+                        self.on_timeout()
+                    if not self.busy: # finished
+                        break
+            except Exception as e:
+                print('exception encountered in bglib: %s'%e)
+        else:
+            while ser.inWaiting(): self.parse(ser.read())
+        return self.busy
+
+    def wait_activity(self, ser, timeout):
+        """Block until bytes arrive or timeout seconds pass, then frame and
+        dispatch everything waiting on the port.
+
+        Unlike check_activity a quiet port is not a BGAPI timeout, so this is
+        the call to sit in while scanning.  Returns the number of bytes read.
+
+        The wait is a select() on the port's file descriptor, so the port
+        timeout is never touched.  Ports without one (Windows, replayed
+        captures) get their timeout lowered to the shortest wait asked for,
+        once, and longer waits read until their deadline.
+        """
+        waiting = ser.in_waiting
+        if not waiting:
+            try:
+                fd = ser.fileno()
+            except (AttributeError, OSError, ValueError):
+                fd = None
+            if fd is not None:
+                if not select.select([fd], [], [], timeout)[0]:
+                    return 0
+                waiting = ser.in_waiting
+        if waiting:
+            data = ser.read(waiting)
+        else:
+            if not ser.timeout or ser.timeout > timeout: # changing it reconfigures the port
+                ser.timeout = timeout
+            deadline = time.time() + timeout
+            data = ser.read(1)
+            while not data and time.time() < deadline:
+                data = ser.read(1)
+        if data:
+            waiting = ser.in_waiting
+            if waiting:
+                data += ser.read(waiting)
+            self.feed(data)
+        return len(data)
+
+    def check_activity_chunked(self, ser, timeout=0):
+        """Same contract as check_activity, but reads everything waiting on the
+        port in one call and hands whole chunks to feed() instead of parsing
+        one byte at a time."""
+        if timeout > 0:
+            try:
+                ser.timeout = timeout
+                while 1:
+                    x = ser.read(ser.in_waiting or 1)
+                    if len(x) > 0:
+                        self.feed(x)
+                    else: # timeout
+                        self.busy = False
+                        self.on_idle()
+                        self.on_timeout()
+                    if not self.busy: # finished
+                        break
+            except Exception as e:
+                print('exception encountered in bglib: %s'%e)
+        else:
+            waiting = ser.in_waiting
+            while waiting:
+                self.feed(ser.read(waiting))
+                waiting = ser.in_waiting
+        return self.busy
+
+    def feed(self, data):
+        """Frame a chunk of received bytes and dispatch every complete packet.
+
+        Bytes are appended to a reusable bytearray and packets are sliced out of
+        it through a memoryview, so the cost is one copy per packet rather than
+        one buffer rebuild per byte.  A trailing partial packet stays buffered
+        until the next chunk arrives.  Bytes that cannot start a packet are
+        dropped, the same way parse() drops them.
+        """
+        self.rx_time = time.time()
+        frame = self.bgapi_rx_frame
+        if frame is None:
+            frame = self.bgapi_rx_frame = bytearray()
+        frame += data
+        end = len(frame)
+        pos = 0
+        packets = []
+        with memoryview(frame) as view:
+            while pos < end:
+                header = frame[pos]
+                if header != 0x00 and header != 0x80 and header != 0x08 and header != 0x88:
+                    pos += 1
+                    continue
+                if end - pos < 2:
+                    break
+                length = 4 + (header & 0x07) + frame[pos + 1]
+                if end - pos < length:
+                    break
+                packets.append(view[pos:pos + length].tobytes())
+                pos += length
+        del frame[:pos]
+
+        # dispatch after the buffer is settled so handlers may safely re-enter
+        # check_activity (eg. the timeout handler resetting the device)
+        for packet in packets:
+            self.parse_packet(packet)
+
+    def parse(self, barray):
+        b=barray[0]
+        if len(self.bgapi_rx_buffer) == 0 and (b == 0x00 or b == 0x80 or b == 0x08 or b == 0x88):
+            self.bgapi_rx_buffer+=bytes([b])
+        elif len(self.bgapi_rx_buffer) == 1:
+            self.bgapi_rx_buffer+=bytes([b])
+            self.bgapi_rx_expected_length = 4 + (self.bgapi_rx_buffer[0] & 0x07) + self.bgapi_rx_buffer[1]
+        elif len(self.bgapi_rx_buffer) > 1:
+            self.bgapi_rx_buffer+=bytes([b])
+
+        """
+        BGAPI packet structure (as of 2012-11-07):
+            Byte 0:
+                  [7] - 1 bit, Message Type (MT)         0 = Command/Response, 1 = Event
+                [6:3] - 4 bits, Technology Type (TT)     0000 = Bluetooth 4.0 single mode, 0001 = Wi-Fi
+                [2:0] - 3 bits, Length High (LH)         Payload length (high bits)
+            Byte 1:     8 bits, Length Low (LL)          Payload length (low bits)
+            Byte 2:     8 bits, Class ID (CID)           Command class ID
+            Byte 3:     8 bits, Command ID (CMD)         Command ID
+            Bytes 4-n:  0 - 2048 Bytes, Payload (PL)     Up to 2048 bytes of payload
+        """
+
+        #print'%02X: %d, %d' % (b, len(self.bgapi_rx_buffer), self.bgapi_rx_expected_length)
+        if self.bgapi_rx_expected_length > 0 and len(self.bgapi_rx_buffer) == self.bgapi_rx_expected_length:
+            packet = self.bgapi_rx_buffer
+            self.bgapi_rx_buffer = b""
+            self.parse_packet(packet)
+
+    def has_handlers(self, event):
+        """True if at least one handler is subscribed to the named event."""
+        # read the instance dict directly, a miss would go through __getattr__
+        handler = self.__dict__.get(event)
+        return bool(handler is not None and handler.handlers)
+
+    def parse_packet(self, packet):
+        """Decode one complete BGAPI packet (header included) and fire its event.
+
+        Packets whose event has no subscribers are dropped without unpacking
+        the payload; responses still mark the device idle.
+        """
+        if self.debug: print('<=[ ' + ' '.join(['%02X' % b for b in packet ]) + ' ]')
+        packet_type = packet[0] & 0x88
+        key = (packet_type, packet[2], packet[3])
+        decoder = self.packet_decoders.get(key)
+        if decoder is None and self.load_command_set('wifi' if packet_type & 0x08 else 'ble'):
+            decoder = self.packet_decoders.get(key)
+        if decoder is not None:
+            # same test as has_handlers()
+            handler = self.__dict__.get(decoder.event)
+            if handler is not None and handler.handlers:
+                handler.fire(decoder.decode(packet))
+            else:
+                self.packets_skipped += 1
+            if decoder.idle:
+                self.busy = False
+                self.on_idle()
+        elif packet_type & 0x80 == 0:
+            # an unknown response still completes the pending command
+            self.busy = False
+            self.on_idle()
+
+    def __getattr__(self, name):
+        # only reached for names the class does not have yet, ie. commands and
+        # events of a command set that has not been loaded
+        technology = name.split('_', 1)[0]
+        if technology in self.command_sets and self.load_command_set(technology):
+            return getattr(self, name)
+        raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+
+    @classmethod
+    def load_command_set(cls, technology):
+        """Install the command builders, events and packet decoders of a
+        command set ('ble' or 'wifi') on the class.  Returns False if it was
+        already loaded."""
+        with _command_set_lock:
+            if technology in cls.loaded_command_sets:
+                return False
+            module = importlib.import_module(cls.command_sets[technology], __package__)
+            prefix = technology + '_cmd_'
+            for name, value in vars(module).items():
+                if name.startswith(prefix):
+                    setattr(cls, name, value)
+            compiled = compile_packet_decoders(module.PACKETS, module.IDLE_EVENTS)
+            for decoder in compiled.values():
+                decoder.descriptor = BGAPIEvent(name=decoder.event)
+                setattr(cls, decoder.event, decoder.descriptor)
+            # swap in a new dict so a parse on another thread never sees a
+            # half-filled table
+            decoders = dict(cls.packet_decoders)
+            decoders.update(compiled)
+            cls.packet_decoders = decoders
+            cls.loaded_command_sets = cls.loaded_command_sets + (technology,)
+            return True
@@ -0,0 +1,206 @@
+""" BGAPI Wi-Fi command set
+
+Command builders, response/event layout and idle events for BGLib.  BGLib
+imports this module the first time a wifi_* attribute is used or a wifi
+packet arrives, and installs everything onto the class.
+"""
+
+import struct
+
+
+# Packet layout, keyed on (message type | technology type, class ID, command
+# ID), ie. byte 0 masked with 0x88 followed by bytes 2 and 3 of the header.
+# Each entry is (event, payload struct format, field names, name of the
+# trailing uint8array or None).
+PACKETS = {
+    # responses
+    (0x08, 0, 0): ('wifi_rsp_dfu_reset', None, (), None),
+    (0x08, 0, 1): ('wifi_rsp_dfu_flash_set_address', '<H', ('result',), None),
+    (0x08, 0, 2): ('wifi_rsp_dfu_flash_upload', '<H', ('result',), None),
+    (0x08, 0, 3): ('wifi_rsp_dfu_flash_upload_finish', '<H', ('result',), None),
+    (0x08, 1, 0): ('wifi_rsp_system_sync', None, (), None),
+    (0x08, 1, 1): ('wifi_rsp_system_reset', None, (), None),
+    (0x08, 1, 2): ('wifi_rsp_system_hello', None, (), None),
+    (0x08, 1, 3): ('wifi_rsp_system_set_max_power_saving_state', '<H', ('result',), None),
+    (0x08, 2, 0): ('wifi_rsp_config_get_mac', '<HB', ('result', 'hw_interface'), None),
+    (0x08, 2, 1): ('wifi_rsp_config_set_mac', '<HB', ('result', 'hw_interface'), None),
+    (0x08, 3, 0): ('wifi_rsp_sme_wifi_on', '<H', ('result',), None),
+    (0x08, 3, 1): ('wifi_rsp_sme_wifi_off', '<H', ('result',), None),
+    (0x08, 3, 2): ('wifi_rsp_sme_power_on', '<H', ('result',), None),
+    (0x08, 3, 3): ('wifi_rsp_sme_start_scan', '<H', ('result',), None),
+    (0x08, 3, 4): ('wifi_rsp_sme_stop_scan', '<H', ('result',), None),
+    (0x08, 3, 5): ('wifi_rsp_sme_set_password', '<B', ('status',), None),
+    (0x08, 3, 6): ('wifi_rsp_sme_connect_bssid', '<HB', ('result', 'hw_interface'), None),
+    (0x08, 3, 7): ('wifi_rsp_sme_connect_ssid', '<HB', ('result', 'hw_interface'), None),
+    (0x08, 3, 8): ('wifi_rsp_sme_disconnect', '<HB', ('result', 'hw_interface'), None),
+    (0x08, 3, 9): ('wifi_rsp_sme_set_scan_channels', '<H', ('result',), None),
+    (0x08, 4, 0): ('wifi_rsp_tcpip_start_tcp_server', '<HB', ('result', 'endpoint'), None),
+    (0x08, 4, 1): ('wifi_rsp_tcpip_tcp_connect', '<HB', ('result', 'endpoint'), None),
+    (0x08, 4, 2): ('wifi_rsp_tcpip_start_udp_server', '<HB', ('result', 'endpoint'), None),
+    (0x08, 4, 3): ('wifi_rsp_tcpip_udp_connect', '<HB', ('result', 'endpoint'), None),
+    (0x08, 4, 4): ('wifi_rsp_tcpip_configure', '<H', ('result',), None),
+    (0x08, 4, 5): ('wifi_rsp_tcpip_dns_configure', '<H', ('result',), None),
+    (0x08, 4, 6): ('wifi_rsp_tcpip_dns_gethostbyname', '<H', ('result',), None),
+    (0x08, 5, 0): ('wifi_rsp_endpoint_send', '<HB', ('result', 'endpoint'), None),
+    (0x08, 5, 1): ('wifi_rsp_endpoint_set_streaming', '<HB', ('result', 'endpoint'), None),
+    (0x08, 5, 2): ('wifi_rsp_endpoint_set_active', '<HB', ('result', 'endpoint'), None),
+    (0x08, 5, 3): ('wifi_rsp_endpoint_set_streaming_destination', '<HB', ('result', 'endpoint'), None),
+    (0x08, 5, 4): ('wifi_rsp_endpoint_close', '<HB', ('result', 'endpoint'), None),
+    (0x08, 6, 0): ('wifi_rsp_hardware_set_soft_timer', '<H', ('result',), None),
+    (0x08, 6, 1): ('wifi_rsp_hardware_external_interrupt_config', '<H', ('result',), None),
+    (0x08, 6, 2): ('wifi_rsp_hardware_change_notification_config', '<H', ('result',), None),
+    (0x08, 6, 3): ('wifi_rsp_hardware_change_notification_pullup', '<H', ('result',), None),
+    (0x08, 6, 4): ('wifi_rsp_hardware_io_port_config_direction', '<H', ('result',), None),
+    (0x08, 6, 5): ('wifi_rsp_hardware_io_port_config_open_drain', '<H', ('result',), None),
+    (0x08, 6, 6): ('wifi_rsp_hardware_io_port_write', '<H', ('result',), None),
+    (0x08, 6, 7): ('wifi_rsp_hardware_io_port_read', '<HBH', ('result', 'port', 'data'), None),
+    (0x08, 6, 8): ('wifi_rsp_hardware_output_compare', '<H', ('result',), None),
+    (0x08, 6, 9): ('wifi_rsp_hardware_adc_read', '<HBH', ('result', 'input', 'value'), None),
+    (0x08, 7, 0): ('wifi_rsp_flash_ps_defrag', '<H', ('result',), None),
+    (0x08, 7, 1): ('wifi_rsp_flash_ps_dump', '<H', ('result',), None),
+    (0x08, 7, 2): ('wifi_rsp_flash_ps_erase_all', '<H', ('result',), None),
+    (0x08, 7, 3): ('wifi_rsp_flash_ps_save', '<H', ('result',), None),
+    (0x08, 7, 4): ('wifi_rsp_flash_ps_load', '<HB', ('result',), 'value'),
+    (0x08, 7, 5): ('wifi_rsp_flash_ps_erase', '<H', ('result',), None),
+    (0x08, 8, 0): ('wifi_rsp_i2c_start_read', '<H', ('result',), None),
+    (0x08, 8, 1): ('wifi_rsp_i2c_start_write', '<H', ('result',), None),
+    (0x08, 8, 2): ('wifi_rsp_i2c_stop', '<H', ('result',), None),
+
+    # events
+    (0x88, 0, 0): ('wifi_evt_dfu_boot', '<I', ('version',), None),
+    (0x88, 1, 0): ('wifi_evt_system_boot', '<HHHHHHH', ('major', 'minor', 'patch', 'build', 'bootloader_version', 'tcpip_version', 'hw'), None),
+    (0x88, 1, 1): ('wifi_evt_system_state', '<H', ('state',), None),
+    (0x88, 1, 2): ('wifi_evt_system_sw_exception', '<IB', ('address', 'type'), None),
+    (0x88, 1, 3): ('wifi_evt_system_power_saving_state', '<B', ('state',), None),
+    (0x88, 2, 0): ('wifi_evt_config_mac_address', '<B', ('hw_interface',), None),
+    (0x88, 3, 0): ('wifi_evt_sme_wifi_is_on', '<H', ('result',), None),
+    (0x88, 3, 1): ('wifi_evt_sme_wifi_is_off', '<H', ('result',), None),
+    (0x88, 3, 2): ('wifi_evt_sme_scan_result', '<bhbBB', ('channel', 'rssi', 'snr', 'secure'), 'ssid'),
+    (0x88, 3, 3): ('wifi_evt_sme_scan_result_drop', None, (), None),
+    (0x88, 3, 4): ('wifi_evt_sme_scanned', '<b', ('status',), None),
+    (0x88, 3, 5): ('wifi_evt_sme_connected', '<bB', ('status', 'hw_interface'), None),
+    (0x88, 3, 6): ('wifi_evt_sme_disconnected', '<HB', ('reason', 'hw_interface'), None),
+    (0x88, 3, 7): ('wifi_evt_sme_interface_status', '<BB', ('hw_interface', 'status'), None),
+    (0x88, 3, 8): ('wifi_evt_sme_connect_failed', '<HB', ('reason', 'hw_interface'), None),
+    (0x88, 3, 9): ('wifi_evt_sme_connect_retry', '<B', ('hw_interface',), None),
+    (0x88, 4, 0): ('wifi_evt_tcpip_configuration', '<B', ('use_dhcp',), None),
+    (0x88, 4, 1): ('wifi_evt_tcpip_dns_configuration', '<B', ('index',), None),
+    (0x88, 4, 2): ('wifi_evt_tcpip_endpoint_status', '<BHH', ('endpoint', 'local_port', 'remote_port'), None),
+    (0x88, 4, 3): ('wifi_evt_tcpip_dns_gethostbyname_result', '<HB', ('result',), 'name'),
+    (0x88, 5, 0): ('wifi_evt_endpoint_syntax_error', '<B', ('endpoint',), None),
+    (0x88, 5, 1): ('wifi_evt_endpoint_data', '<BB', ('endpoint',), 'data'),
+    (0x88, 5, 2): ('wifi_evt_endpoint_status', '<BIBbB', ('endpoint', 'type', 'streaming', 'destination', 'active'), None),
+    (0x88, 5, 3): ('wifi_evt_endpoint_closing', '<HB', ('reason', 'endpoint'), None),
+    (0x88, 6, 0): ('wifi_evt_hardware_soft_timer', '<B', ('handle',), None),
+    (0x88, 6, 1): ('wifi_evt_hardware_change_notification', '<I', ('timestamp',), None),
+    (0x88, 6, 2): ('wifi_evt_hardware_external_interrupt', '<BI', ('irq', 'timestamp'), None),
+    (0x88, 7, 0): ('wifi_evt_flash_ps_key', '<HB', ('key',), 'value'),
+}
+
+# events other than responses that also mean the device is idle again
+IDLE_EVENTS = ('wifi_evt_dfu_boot',)
+
+
+# command builders, installed as BGLib methods
+def wifi_cmd_dfu_reset(self, dfu):
+    return struct.pack('<4BB', 0, 1, 0, 0, dfu)
+def wifi_cmd_dfu_flash_set_address(self, address):
+    return struct.pack('<4BI', 0, 4, 0, 1, address)
+def wifi_cmd_dfu_flash_upload(self):
+    return struct.pack('<4BB' + str(len(data)) + 's', 0, 1 + len(data), 0, 2, data, len(data), bytes(i for i in data))
+def wifi_cmd_dfu_flash_upload_finish(self):
+    return struct.pack('<4B', 0, 0, 0, 3)
+def wifi_cmd_system_sync(self):
+    return struct.pack('<4B', 0, 0, 1, 0)
+def wifi_cmd_system_reset(self, dfu):
+    return struct.pack('<4BB', 0, 1, 1, 1, dfu)
+def wifi_cmd_system_hello(self):
+    return struct.pack('<4B', 0, 0, 1, 2)
+def wifi_cmd_system_set_max_power_saving_state(self, state):
+    return struct.pack('<4BB', 0, 1, 1, 3, state)
+def wifi_cmd_config_get_mac(self, hw_interface):
+    return struct.pack('<4BB', 0, 1, 2, 0, hw_interface)
+def wifi_cmd_config_set_mac(self, hw_interface):
+    return struct.pack('<4BB', 0, 1, 2, 1, hw_interface, mac)
+def wifi_cmd_sme_wifi_on(self):
+    return struct.pack('<4B', 0, 0, 3, 0)
+def wifi_cmd_sme_wifi_off(self):
+    return struct.pack('<4B', 0, 0, 3, 1)
+def wifi_cmd_sme_power_on(self, enable):
+    return struct.pack('<4BB', 0, 1, 3, 2, enable)
+def wifi_cmd_sme_start_scan(self, hw_interface):
+    return struct.pack('<4BBB' + str(len(chList)) + 's', 0, 2 + len(chList), 3, 3, hw_interface, chList, len(chList), bytes(i for i in chList))
+def wifi_cmd_sme_stop_scan(self):
+    return struct.pack('<4B', 0, 0, 3, 4)
+def wifi_cmd_sme_set_password(self):
+    return struct.pack('<4BB' + str(len(password)) + 's', 0, 1 + len(password), 3, 5, password, len(password), bytes(i for i in password))
+def wifi_cmd_sme_connect_bssid(self):
+    return struct.pack('<4B', 0, 0, 3, 6, bssid)
+def wifi_cmd_sme_connect_ssid(self):
+    return struct.pack('<4BB' + str(len(ssid)) + 's', 0, 1 + len(ssid), 3, 7, ssid, len(ssid), bytes(i for i in ssid))
+def wifi_cmd_sme_disconnect(self):
+    return struct.pack('<4B', 0, 0, 3, 8)
+def wifi_cmd_sme_set_scan_channels(self, hw_interface):
+    return struct.pack('<4BBB' + str(len(chList)) + 's', 0, 2 + len(chList), 3, 9, hw_interface, chList, len(chList), bytes(i for i in chList))
+def wifi_cmd_tcpip_start_tcp_server(self, port, default_destination):
+    return struct.pack('<4BHb', 0, 3, 4, 0, port, default_destination)
+def wifi_cmd_tcpip_tcp_connect(self, port, routing):
+    return struct.pack('<4BHb', 0, 3, 4, 1, address, port, routing)
+def wifi_cmd_tcpip_start_udp_server(self, port, default_destination):
+    return struct.pack('<4BHb', 0, 3, 4, 2, port, default_destination)
+def wifi_cmd_tcpip_udp_connect(self, port, routing):
+    return struct.pack('<4BHb', 0, 3, 4, 3, address, port, routing)
+def wifi_cmd_tcpip_configure(self, use_dhcp):
+    return struct.pack('<4BB', 0, 1, 4, 4, address, netmask, gateway, use_dhcp)
+def wifi_cmd_tcpip_dns_configure(self, index):
+    return struct.pack('<4BB', 0, 1, 4, 5, index, address)
+def wifi_cmd_tcpip_dns_gethostbyname(self):
+    return struct.pack('<4BB' + str(len(name)) + 's', 0, 1 + len(name), 4, 6, name, len(name), bytes(i for i in name))
+def wifi_cmd_endpoint_send(self, endpoint):
+    return struct.pack('<4BBB' + str(len(data)) + 's', 0, 2 + len(data), 5, 0, endpoint, data, len(data), bytes(i for i in data))
+def wifi_cmd_endpoint_set_streaming(self, endpoint, streaming):
+    return struct.pack('<4BBB', 0, 2, 5, 1, endpoint, streaming)
+def wifi_cmd_endpoint_set_active(self, endpoint, active):
+    return struct.pack('<4BBB', 0, 2, 5, 2, endpoint, active)
+def wifi_cmd_endpoint_set_streaming_destination(self, endpoint, streaming_destination):
+    return struct.pack('<4BBb', 0, 2, 5, 3, endpoint, streaming_destination)
+def wifi_cmd_endpoint_close(self, endpoint):
+    return struct.pack('<4BB', 0, 1, 5, 4, endpoint)
+def wifi_cmd_hardware_set_soft_timer(self, time, handle, single_shot):
+    return struct.pack('<4BIBB', 0, 6, 6, 0, time, handle, single_shot)
+def wifi_cmd_hardware_external_interrupt_config(self, enable, polarity):
+    return struct.pack('<4BBB', 0, 2, 6, 1, enable, polarity)
+def wifi_cmd_hardware_change_notification_config(self, enable):
+    return struct.pack('<4BI', 0, 4, 6, 2, enable)
+def wifi_cmd_hardware_change_notification_pullup(self, pullup):
+    return struct.pack('<4BI', 0, 4, 6, 3, pullup)
+def wifi_cmd_hardware_io_port_config_direction(self, port, mask, direction):
+    return struct.pack('<4BBHH', 0, 5, 6, 4, port, mask, direction)
+def wifi_cmd_hardware_io_port_config_open_drain(self, port, mask, open_drain):
+    return struct.pack('<4BBHH', 0, 5, 6, 5, port, mask, open_drain)
+def wifi_cmd_hardware_io_port_write(self, port, mask, data):
+    return struct.pack('<4BBHH', 0, 5, 6, 6, port, mask, data)
+def wifi_cmd_hardware_io_port_read(self, port, mask):
+    return struct.pack('<4BBH', 0, 3, 6, 7, port, mask)
+def wifi_cmd_hardware_output_compare(self, index, bit32, timer, mode, compare_value):
+    return struct.pack('<4BBBBBI', 0, 8, 6, 8, index, bit32, timer, mode, compare_value)
+def wifi_cmd_hardware_adc_read(self, input):
+    return struct.pack('<4BB', 0, 1, 6, 9, input)
+def wifi_cmd_flash_ps_defrag(self):
+    return struct.pack('<4B', 0, 0, 7, 0)
+def wifi_cmd_flash_ps_dump(self):
+    return struct.pack('<4B', 0, 0, 7, 1)
+def wifi_cmd_flash_ps_erase_all(self):
+    return struct.pack('<4B', 0, 0, 7, 2)
+def wifi_cmd_flash_ps_save(self, key):
+    return struct.pack('<4BHB' + str(len(value)) + 's', 0, 3 + len(value), 7, 3, key, value, len(value), bytes(i for i in value))
+def wifi_cmd_flash_ps_load(self, key):
+    return struct.pack('<4BH', 0, 2, 7, 4, key)
+def wifi_cmd_flash_ps_erase(self, key):
+    return struct.pack('<4BH', 0, 2, 7, 5, key)
+def wifi_cmd_i2c_start_read(self, endpoint, slave_address, length):
+    return struct.pack('<4BBHB', 0, 4, 8, 0, endpoint, slave_address, length)
+def wifi_cmd_i2c_start_write(self, endpoint, slave_address):
+    return struct.pack('<4BBH', 0, 3, 8, 1, endpoint, slave_address)
+def wifi_cmd_i2c_stop(self, endpoint):
+    return struct.pack('<4BB', 0, 1, 8, 2, endpoint)
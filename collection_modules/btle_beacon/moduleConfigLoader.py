@@ -82,7 +82,7 @@ def loadModule(thisConfig, logger, configParser):
     try:
         configValue=configParser.getint('ModuleConfig','abandoned_client_cleanup_interval')
     except:
-        configValue = 300000
+        configValue = 1000
     logger.info("Abandoned client cleanup interval in milliseconds : %s" % configValue)
     thisConfig['AbandonedClientCleanupInterval'] = configValue
 
@@ -94,9 +94,25 @@ def loadModule(thisConfig, logger, configParser):
     logger.info("Abandoned client timeout in milliseconds : %s" % configValue)
     thisConfig['AbandonedClientTimeout'] = configValue
 
+    """Registry shards"""
+    try:
+        configValue=configParser.getint('ModuleConfig','btle_registry_shards')
+    except:
+        configValue = 16
+    logger.info("Registry shards : %s" % configValue)
+    thisConfig['BtleRegistryShards'] = configValue
+
+    """Btle vectorized batches, registered client state kept in NumPy columns and batches worked through with array operations"""
+    try:
+        configValue=configParser.getboolean('ModuleConfig','btle_vectorized_batches')
+    except:
+        configValue = False
+    logger.info("Btle vectorized batches : %s" % configValue)
+    thisConfig['BtleVectorizedBatches'] = configValue
+
     """Btle rssi client in threshold"""
     try:
-        configValue=configParser.getint('ModuleConfig','btle_rssi_client_in_threshold')
+        configValue=configParser.getfloat('ModuleConfig','btle_rssi_client_in_threshold')
     except:
         configValue = -68
     logger.info("Btle rssi client in threshold : %s" % configValue)
@@ -110,13 +126,31 @@ def loadModule(thisConfig, logger, configParser):
     logger.info("Btle rssi client in threshold type : %s" % configValue)
     thisConfig['BtleRssiClientInThresholdType'] = configValue
 
-    """Btle device id (com5 or /dev/ttyACM0)"""
+    """Btle path loss model (log_distance or altbeacon), how distance is estimated from rssi"""
+    try:
+        configValue=configParser.get('ModuleConfig','btle_path_loss_model')
+    except:
+        configValue = "log_distance"
+    logger.info("Btle path loss model : %s" % configValue)
+    thisConfig['BtlePathLossModel'] = configValue
+
+    """Btle path loss exponent for the log_distance model, 2 in free space"""
+    try:
+        configValue=configParser.getfloat('ModuleConfig','btle_path_loss_exponent')
+    except:
+        configValue = 2.0
+    logger.info("Btle path loss exponent : %s" % configValue)
+    thisConfig['BtlePathLossExponent'] = configValue
+
+    """Btle device id (com5 or /dev/ttyACM0), comma separated when several devices are used"""
     try:
         configValue=configParser.get('ModuleConfig','btle_device_id')
     except:
         configValue = "com3"
-    logger.info("Btle device id : %s" % configValue)
-    thisConfig['BtleDeviceId'] = configValue
+    configValue = [deviceId.strip() for deviceId in configValue.split(',') if deviceId.strip()]
+    logger.info("Btle device ids : %s" % configValue)
+    thisConfig['BtleDeviceIds'] = configValue
+    thisConfig['BtleDeviceId'] = configValue[0]
 
     """Btle device baud rate is 38400 range is 1200 - 2000000"""
     try:
@@ -174,6 +208,30 @@ def loadModule(thisConfig, logger, configParser):
     logger.info("Btle rssi error variance : %s" % configValue)
     thisConfig['BtleRssiErrorVariance'] = configValue
 
+    """Btle rssi filter (average, ema, median or kalman), how each beacon's rssi samples are smoothed"""
+    try:
+        configValue=configParser.get('ModuleConfig','btle_rssi_filter')
+    except:
+        configValue = "average"
+    logger.info("Btle rssi filter : %s" % configValue)
+    thisConfig['BtleRssiFilter'] = configValue
+
+    """Btle rssi kalman process noise in dB^2, how much the real rssi is expected to move between samples"""
+    try:
+        configValue=configParser.getfloat('ModuleConfig','btle_rssi_kalman_process_noise')
+    except:
+        configValue = 1
+    logger.info("Btle rssi kalman process noise : %s" % configValue)
+    thisConfig['BtleRssiKalmanProcessNoise'] = configValue
+
+    """Btle rssi kalman measurement noise in dB^2, how noisy a single sample is"""
+    try:
+        configValue=configParser.getfloat('ModuleConfig','btle_rssi_kalman_measurement_noise')
+    except:
+        configValue = 16
+    logger.info("Btle rssi kalman measurement noise : %s" % configValue)
+    thisConfig['BtleRssiKalmanMeasurementNoise'] = configValue
+
     """Btle device tx power"""
     try:
         configValue=configParser.getint('ModuleConfig','btle_device_tx_power')
@@ -190,6 +248,183 @@ def loadModule(thisConfig, logger, configParser):
     logger.info("Btle client out count threshold : %s" % configValue)
     thisConfig['BtleClientOutCountThreshold'] = configValue
 
+    """Btle reader mode (blocking, poll or asyncio)"""
+    try:
+        configValue=configParser.get('ModuleConfig','btle_reader_mode')
+    except:
+        configValue = "blocking"
+    logger.info("Btle reader mode : %s" % configValue)
+    thisConfig['BtleReaderMode'] = configValue
+
+    """Btle reader timeout in milliseconds"""
+    try:
+        configValue=configParser.getint('ModuleConfig','btle_reader_timeout')
+    except:
+        configValue = 250
+    logger.info("Btle reader timeout in milliseconds : %s" % configValue)
+    thisConfig['BtleReaderTimeout'] = configValue
+
+    """Btle batch size, how many adverts the reader hands over at once"""
+    try:
+        configValue=configParser.getint('ModuleConfig','btle_batch_size')
+    except:
+        configValue = 64
+    logger.info("Btle batch size : %s" % configValue)
+    thisConfig['BtleBatchSize'] = configValue
+
+    """Btle batch timeout in milliseconds, the longest an advert waits for its batch to fill"""
+    try:
+        configValue=configParser.getint('ModuleConfig','btle_batch_timeout')
+    except:
+        configValue = 20
+    logger.info("Btle batch timeout in milliseconds : %s" % configValue)
+    thisConfig['BtleBatchTimeout'] = configValue
+
+    """Btle queue size, how many batches can wait for the event manager"""
+    try:
+        configValue=configParser.getint('ModuleConfig','btle_queue_size')
+    except:
+        configValue = 1024
+    logger.info("Btle queue size : %s" % configValue)
+    thisConfig['BtleQueueSize'] = configValue
+
+    """Btle queue overflow policy (drop_oldest, drop_newest or block)"""
+    try:
+        configValue=configParser.get('ModuleConfig','btle_queue_overflow')
+    except:
+        configValue = "drop_oldest"
+    logger.info("Btle queue overflow : %s" % configValue)
+    thisConfig['BtleQueueOverflow'] = configValue
+
+    """Btle stats interval in milliseconds, how often reader, queue and consumer stats are logged"""
+    try:
+        configValue=configParser.getint('ModuleConfig','btle_stats_interval')
+    except:
+        configValue = 60000
+    logger.info("Btle stats interval in milliseconds : %s" % configValue)
+    thisConfig['BtleStatsInterval'] = configValue
+
+    """Btle dedup window in milliseconds, only used with more than one device"""
+    try:
+        configValue=configParser.getint('ModuleConfig','btle_dedup_window')
+    except:
+        configValue = 250
+    logger.info("Btle dedup window in milliseconds : %s" % configValue)
+    thisConfig['BtleDedupWindow'] = configValue
+
+    """Btle capture file, records the raw serial stream from the device when set"""
+    try:
+        configValue=configParser.get('ModuleConfig','btle_capture_file')
+    except:
+        configValue = ""
+    logger.info("Btle capture file : %s" % configValue)
+    thisConfig['BtleCaptureFile'] = configValue
+
+    """Btle replay file, reads a capture instead of the device when set"""
+    try:
+        configValue=configParser.get('ModuleConfig','btle_replay_file')
+    except:
+        configValue = ""
+    logger.info("Btle replay file : %s" % configValue)
+    thisConfig['BtleReplayFile'] = configValue
+
+    """Btle replay speed, 1 is the recorded pace and 0 as fast as possible"""
+    try:
+        configValue=configParser.getfloat('ModuleConfig','btle_replay_speed')
+    except:
+        configValue = 1
+    logger.info("Btle replay speed : %s" % configValue)
+    thisConfig['BtleReplaySpeed'] = configValue
+
+    """Btle scan interval in milliseconds, how often the device moves to the next advertising channel"""
+    try:
+        configValue=configParser.getfloat('ModuleConfig','btle_scan_interval')
+    except:
+        configValue = 125
+    logger.info("Btle scan interval in milliseconds : %s" % configValue)
+    thisConfig['BtleScanInterval'] = configValue
+
+    """Btle scan window in milliseconds, how long the device listens in each interval"""
+    try:
+        configValue=configParser.getfloat('ModuleConfig','btle_scan_window')
+    except:
+        configValue = 125
+    logger.info("Btle scan window in milliseconds : %s" % configValue)
+    thisConfig['BtleScanWindow'] = configValue
+
+    """Btle scan duplicate filtering, the device reports each advertiser once per scan instead of every advert"""
+    try:
+        configValue=configParser.getboolean('ModuleConfig','btle_scan_duplicate_filtering')
+    except:
+        configValue = False
+    logger.info("Btle scan duplicate filtering : %s" % configValue)
+    thisConfig['BtleScanDuplicateFiltering'] = configValue
+
+    """Btle scan restart interval in milliseconds, with duplicate filtering the scan is restarted this often so beacons are reported again"""
+    try:
+        configValue=configParser.getint('ModuleConfig','btle_scan_restart_interval')
+    except:
+        configValue = 1000
+    logger.info("Btle scan restart interval in milliseconds : %s" % configValue)
+    thisConfig['BtleScanRestartInterval'] = configValue
+
+    """Btle adaptive scan, backs the scan off when the pipeline is saturated and scans harder when it is quiet"""
+    try:
+        configValue=configParser.getboolean('ModuleConfig','btle_adaptive_scan')
+    except:
+        configValue = False
+    logger.info("Btle adaptive scan : %s" % configValue)
+    thisConfig['BtleAdaptiveScan'] = configValue
+
+    """Btle adaptive scan period in milliseconds, how often the scan parameters are reconsidered"""
+    try:
+        configValue=configParser.getint('ModuleConfig','btle_adaptive_scan_period')
+    except:
+        configValue = 5000
+    logger.info("Btle adaptive scan period in milliseconds : %s" % configValue)
+    thisConfig['BtleAdaptiveScanPeriod'] = configValue
+
+    """Btle adaptive scan max rate, scan responses per second per device before the scan backs off"""
+    try:
+        configValue=configParser.getint('ModuleConfig','btle_adaptive_scan_max_rate')
+    except:
+        configValue = 2000
+    logger.info("Btle adaptive scan max rate : %s" % configValue)
+    thisConfig['BtleAdaptiveScanMaxRate'] = configValue
+
+    """Btle adaptive scan min window in milliseconds, the shortest window the scan backs off to"""
+    try:
+        configValue=configParser.getfloat('ModuleConfig','btle_adaptive_scan_min_window')
+    except:
+        configValue = 15
+    logger.info("Btle adaptive scan min window in milliseconds : %s" % configValue)
+    thisConfig['BtleAdaptiveScanMinWindow'] = configValue
+
+    """Btle whitelist mode (off, learn or enforce)"""
+    try:
+        configValue=configParser.get('ModuleConfig','btle_whitelist_mode')
+    except:
+        configValue = "off"
+    logger.info("Btle whitelist mode : %s" % configValue)
+    thisConfig['BtleWhitelistMode'] = configValue
+
+    """Btle whitelist, comma separated beacon MACs the devices report in enforce mode"""
+    try:
+        configValue=configParser.get('ModuleConfig','btle_whitelist')
+    except:
+        configValue = ""
+    configValue = [mac.strip() for mac in configValue.split(',') if mac.strip()]
+    logger.info("Btle whitelist : %s" % configValue)
+    thisConfig['BtleWhitelist'] = configValue
+
+    """Btle whitelist file, known beacon MACs one per line, registered beacons are appended"""
+    try:
+        configValue=configParser.get('ModuleConfig','btle_whitelist_file')
+    except:
+        configValue = ""
+    logger.info("Btle whitelist file : %s" % configValue)
+    thisConfig['BtleWhitelistFile'] = configValue
+
     """Slack channel webhook url"""
     try:
         configValue=configParser.get('ModuleConfig','slack_channel_webhook_url')
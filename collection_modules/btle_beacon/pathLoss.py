@@ -0,0 +1,58 @@
+"""
+Distance from rssi for the distance threshold type.
+
+An iBeacon advertises its measured power, the rssi a receiver sees 1m away.
+The distance follows from how far the smoothed rssi has dropped below it:
+
+    log_distance   log-distance path loss, d = 10^((txPower - rssi) / (10 n)).
+                   n is btle_path_loss_exponent, 2 in free space, 2.5-4
+                   indoors with people and furniture in the way
+    altbeacon      the curve fitted to Nexus 4 measurements by the AltBeacon
+                   library, d = 0.89976 (rssi/txPower)^7.7095 + 0.111 past 1m
+
+estimateDistance works on one sample.  estimateDistances does the same for
+whole arrays in one pass with NumPy, which EventManager uses for every
+client a batch touches.  NumPy is optional, HAVE_NUMPY says whether the
+batch path can be used.
+"""
+
+try:
+    import numpy
+    HAVE_NUMPY = True
+except ImportError:
+    numpy = None
+    HAVE_NUMPY = False
+
+LOG_DISTANCE = 'log_distance'
+ALTBEACON = 'altbeacon'
+PATH_LOSS_MODELS = (LOG_DISTANCE, ALTBEACON)
+
+# AltBeacon curve fit coefficients
+_A, _B, _C = 0.89976, 7.7095, 0.111
+
+def estimateDistance(rssi, txPower, model=LOG_DISTANCE, exponent=2.0):
+    """Metres from one rssi sample and the beacon's measured power at 1m"""
+    if model == LOG_DISTANCE:
+        return 10**((txPower - rssi)/(10*exponent))
+    elif model == ALTBEACON:
+        if txPower == 0:
+            # no measured power, as far away as the NumPy version makes it
+            return float('inf')
+        ratio = rssi/txPower
+        if ratio < 1:
+            return ratio**10
+        return _A*ratio**_B + _C
+    raise ValueError("path loss model must be one of %s, not %s" % (', '.join(PATH_LOSS_MODELS), model))
+
+def estimateDistances(rssi, txPower, model=LOG_DISTANCE, exponent=2.0):
+    """estimateDistance over arrays of rssi and measured power, needs numpy"""
+    rssi = numpy.asarray(rssi, dtype=numpy.float64)
+    txPower = numpy.asarray(txPower, dtype=numpy.float64)
+    if model == LOG_DISTANCE:
+        return numpy.power(10.0, (txPower - rssi)/(10*exponent))
+    elif model == ALTBEACON:
+        # both sides of the where are computed, a missing measured power gives inf like estimateDistance
+        with numpy.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            ratio = rssi/txPower
+            return numpy.where(ratio < 1, ratio**10, _A*ratio**_B + _C)
+    raise ValueError("path loss model must be one of %s, not %s" % (', '.join(PATH_LOSS_MODELS), model))
@@ -1,10 +1,30 @@
 """
-this file has three classes.  All the classes are related to tracking clients that are in range
+this file has four classes.  All the classes are related to tracking clients that are in range
 
 RegistryEvent
+RegistryShard
 RegisteredClientRegistry
 RegistryEventHandler
 
+RegisteredClientRegistry splits the clients over btle_registry_shards
+shards picked by the hash of the udid, each with its own lock, so the
+collection loop, the sweep timer and any other scanner thread only wait
+for each other when they touch the same shard.  Every shard keeps an
+expiry index next to its clients, a heap of (expiry time, udid) with one
+live entry per client.  Updates do not touch the heap.  A sweep pops the
+entries that are due, expires the clients that really have not been seen
+and pushes the rest back at their real expiry time.  A client is looked
+at about once per timeout no matter how often the sweep runs, so sweeps
+cost O(expired) plus that trickle of re-arms instead of a walk over the
+whole registry.  Entries of removed
+clients are left in the heap and skipped when they come up.  The sweep
+takes one shard lock at a time and fires the removed events after letting
+go of it, and snapshot() copies one shard at a time, so neither holds up
+the updates for more than a shard's worth of work.
+
+The registry events are looked up once per registry, the handler object
+is cached in the instance dict, so firing one on every add and update
+is a dict hit and a loop over a tuple.
 """
 
 from simplesensor.shared import ThreadsafeLogger
@@ -13,38 +33,39 @@ import os
 import os.path
 import logging
 import logging.config
+import heapq
+import threading
 import time
 
 class RegistryEvent(object):
 
     def __init__(self, doc=None):
         self.__doc__ = doc
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
 
     def __get__(self, obj, objtype=None):
         if obj is None:
             return self
-        return RegistryEventHandler(self, obj)
-
-    def __set__(self, obj, value):
-        pass
+        # cached on the instance, later lookups find it there and skip the descriptor
+        handler = obj.__dict__.get(self.name)
+        if handler is None:
+            handler = obj.__dict__.setdefault(self.name, RegistryEventHandler(self, obj))
+        return handler
 
 
 class RegistryEventHandler(object):
+    """The handlers of one event on one registry, in a tuple that add and remove
+    replace so a fire on another thread walks a consistent snapshot"""
+    __slots__ = ('event', 'obj', 'handlers')
 
     def __init__(self, event, obj):
 
         self.event = event
         self.obj = obj
-
-    def _getfunctionlist(self):
-
-        """(internal use) """
-
-        try:
-            eventhandler = self.obj.__eventhandler__
-        except AttributeError:
-            eventhandler = self.obj.__eventhandler__ = {}
-        return eventhandler.setdefault(self.event, [])
+        self.handlers = ()
 
     def add(self, func):
 
@@ -54,7 +75,7 @@ class RegistryEventHandler(object):
         You can add handler also by using '+=' operator.
         """
 
-        self._getfunctionlist().append(func)
+        self.handlers = self.handlers + (func,)
         return self
 
     def remove(self, func):
@@ -64,7 +85,9 @@ class RegistryEventHandler(object):
         You can remove handler also by using '-=' operator.
         """
 
-        self._getfunctionlist().remove(func)
+        handlers = list(self.handlers)
+        handlers.remove(func)
+        self.handlers = tuple(handlers)
         return self
 
     def fire(self, earg=None):
@@ -75,13 +98,23 @@ class RegistryEventHandler(object):
         e.fire(earg).
         """
 
-        for func in self._getfunctionlist():
+        for func in self.handlers:
             func(self.obj, earg)
 
     __iadd__ = add
     __isub__ = remove
     __call__ = fire
 
+class RegistryShard(object):
+    """One stripe of the registry, its clients and their expiry index behind one lock"""
+    __slots__ = ('clients', 'expiryHeap', 'expiryScheduled', 'lock')
+
+    def __init__(self):
+        self.clients = {} # udid -> registered client
+        self.expiryHeap = [] # (expiry time, udid)
+        self.expiryScheduled = {} # udid -> expiry time of its live heap entry
+        self.lock = threading.Lock()
+
 class RegisteredClientRegistry(object):
     eventRegisteredClientRemoved = RegistryEvent()
     eventRegisteredClientAdded = RegistryEvent()
@@ -93,37 +126,66 @@ class RegisteredClientRegistry(object):
         self.loggingQueue = loggingQueue
         self.logger = ThreadsafeLogger(loggingQueue, __name__)
 
-        self.rClients = {}  #registered clients
         self.collectionPointConfig = collectionPointConfig #collection point config
 
+        self.shards = [RegistryShard() for _ in range(max(1, self.collectionPointConfig['BtleRegistryShards']))]
+        self._clientTimeout = self.collectionPointConfig['AbandonedClientTimeout']/1000
+
+    def shardFor(self,udid):
+        return self.shards[hash(udid) % len(self.shards)]
+
+    def __len__(self):
+        return sum(len(shard.clients) for shard in self.shards)
+
+    def snapshot(self):
+        """A list of the registered clients, copied a shard at a time so it is safe to walk while clients come and go"""
+        clients = []
+        for shard in self.shards:
+            with shard.lock:
+                clients.extend(shard.clients.values())
+        return clients
+
     def getRegisteredClient(self,udid):
         """Get an existing registered client by udid and if its found return it.  If no existing registered client is found return None."""
-        try:
-            eClient = self.rClients[udid]
-        except KeyError:
-            eClient = None
-
-        return eClient
+        # a single dict lookup, it never sees a half done add or remove
+        return self.shardFor(udid).clients.get(udid)
 
     def sweepOldClients(self):
         """look at the registry and look for expired inactive clients.  Returns a list of removed clients"""
-        self.logger.debug("*** Sweeping clients existing count %s***"%len(self.rClients))
+        self.logger.debug("*** Sweeping clients existing count %s***"%len(self))
 
         clientsToBeRemoved=[] #list of clients to be cleaned up
 
-        currentExpireTime = time.time() - (self.collectionPointConfig['AbandonedClientTimeout']/1000)
-
-        for udid in self.rClients:
-            regClient = self.rClients[udid]
-
-            if regClient.lastRegisteredTime < currentExpireTime:
-                clientsToBeRemoved.append(regClient)
+        now = time.time()
+
+        for shard in self.shards:
+            # expiry check and removal in one lock hold, an update of the same client waits for it or goes first
+            with shard.lock:
+                heap = shard.expiryHeap
+                while heap and heap[0][0] < now:
+                    expireTime, udid = heapq.heappop(heap)
+                    if shard.expiryScheduled.get(udid) != expireTime:
+                        continue # left behind by a removed client
+                    regClient = shard.clients.get(udid)
+                    if regClient is None:
+                        del shard.expiryScheduled[udid]
+                        continue
+
+                    expireTime = regClient.lastRegisteredTime + self._clientTimeout
+                    if expireTime < now:
+                        del shard.expiryScheduled[udid]
+                        del shard.clients[udid]
+                        clientsToBeRemoved.append(regClient)
+                    else:
+                        # seen since it was scheduled, come back when it could really expire
+                        shard.expiryScheduled[udid] = expireTime
+                        heapq.heappush(heap, (expireTime, udid))
 
         for client in clientsToBeRemoved:
             self.logger.debug("Client sweep removing udid %s"%client.getUdid())
-            self.removeRegisteredClient(client)
+            self.eventRegisteredClientRemoved(client)#throw event
 
-        self.logger.debug("*** End of sweeping tags existing count %s***"%len(self.rClients))
+        self.logger.debug("*** End of sweeping tags existing count %s***"%len(self))
 
         self.eventSweepComplete(clientsToBeRemoved)
 
@@ -131,15 +193,32 @@ class RegisteredClientRegistry(object):
 
     def addNewRegisteredClient(self,registeredClient):
         self.logger.debug("in addNewRegisteredClient with %s"%registeredClient.getUdid())
-        self.rClients[registeredClient.getUdid()] = registeredClient
+        self.__store(registeredClient)
         self.eventRegisteredClientAdded(registeredClient)#throw event
 
     def updateRegisteredClient(self,registeredClient):
         self.logger.debug("in updateRegisteredClient with %s"%registeredClient.getUdid())
-        self.rClients[registeredClient.getUdid()] = registeredClient
+        self.__store(registeredClient)
         self.eventRegisteredClientUpdated(registeredClient)#throw event
 
     def removeRegisteredClient(self,registeredClient):
         self.logger.debug("in removeRegisteredClient with %s"%registeredClient.getUdid())
-        self.rClients.pop(registeredClient.getUdid())
-        self.eventRegisteredClientRemoved(registeredClient)#throw event
\ No newline at end of file
+        udid = registeredClient.getUdid()
+        shard = self.shardFor(udid)
+        with shard.lock:
+            removed = shard.clients.pop(udid, None)
+            shard.expiryScheduled.pop(udid, None)
+        # a sweep may have got to it first, only one of them throws the event
+        if removed is not None:
+            self.eventRegisteredClientRemoved(registeredClient)#throw event
+
+    def __store(self,registeredClient):
+        """Put the client in its shard and, if it is not there yet, in the shard's expiry index"""
+        udid = registeredClient.getUdid()
+        shard = self.shardFor(udid)
+        with shard.lock:
+            shard.clients[udid] = registeredClient
+            if udid not in shard.expiryScheduled:
+                expireTime = registeredClient.lastRegisteredTime + self._clientTimeout
+                shard.expiryScheduled[udid] = expireTime
+                heapq.heappush(shard.expiryHeap, (expireTime, udid))
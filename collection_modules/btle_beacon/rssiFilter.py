@@ -0,0 +1,168 @@
+"""
+Per-beacon RSSI smoothing.
+
+Every registered client keeps one of these filters and feeds it each rssi
+sample.  estimate is the smoothed rssi the in/out decisions and averageRssi
+use.  The filters keep a fixed amount of state per beacon and do a fixed
+amount of work per sample:
+
+    average    moving average over the last btle_rssi_max_sample_size samples,
+               a ring buffer and a running sum
+    ema        exponential moving average with alpha 2/(max sample size + 1),
+               the same centre of mass as the moving average
+    median     median of the last max sample size samples, a ring buffer and
+               a sorted copy updated with bisect, cost grows with the window
+               and not with the beacon count
+    kalman     1-D Kalman filter on a constant rssi, btle_rssi_kalman_process_noise
+               and btle_rssi_kalman_measurement_noise are its Q and R in dB^2
+
+Outliers are rejected before they reach the filter.  A sample further from
+the estimate than btle_rssi_error_variance times the estimate (12% of -70dB
+is about 8dB) is an anomaly and dropped.  btle_anomaly_reset_limit anomalies
+in a row mean the beacon really moved, the filter starts over from that
+sample.  ready() tells whether btle_rssi_needed_sample_size samples have
+been accepted since the last start.
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, insort
+
+AVERAGE = 'average'
+EMA = 'ema'
+MEDIAN = 'median'
+KALMAN = 'kalman'
+RSSI_FILTERS = (AVERAGE, EMA, MEDIAN, KALMAN)
+
+class RssiFilter(ABC):
+    __slots__ = ('estimate', 'samples', 'anomalies', 'errorVariance', 'anomalyResetLimit')
+
+    def __init__(self, errorVariance, anomalyResetLimit):
+        self.errorVariance = errorVariance
+        self.anomalyResetLimit = anomalyResetLimit
+        self.reset()
+
+    def reset(self):
+        self.estimate = None
+        self.samples = 0 # accepted since the last reset
+        self.anomalies = 0 # rejected in a row
+
+    def add(self, rssi):
+        """Feed one sample, returns False if it was rejected as an anomaly"""
+        if self.estimate is not None and abs(rssi - self.estimate) > abs(self.estimate)*self.errorVariance:
+            self.anomalies += 1
+            if self.anomalies < self.anomalyResetLimit:
+                return False
+            self.reset()
+        self.anomalies = 0
+        self.samples += 1
+        self.update(rssi)
+        return True
+
+    def ready(self, neededSamples):
+        return self.samples >= neededSamples
+
+    @abstractmethod
+    def update(self, rssi):
+        """Fold an accepted sample into estimate"""
+
+
+class MovingAverageRssiFilter(RssiFilter):
+    __slots__ = ('ring', 'index', 'total')
+
+    def __init__(self, size, errorVariance, anomalyResetLimit):
+        self.ring = array('b', bytes(max(size, 1)))
+        RssiFilter.__init__(self, errorVariance, anomalyResetLimit)
+
+    def reset(self):
+        RssiFilter.reset(self)
+        self.index = 0
+        self.total = 0
+
+    def update(self, rssi):
+        ring = self.ring
+        if self.samples > len(ring):
+            self.total -= ring[self.index]
+        ring[self.index] = rssi
+        self.total += rssi
+        self.index = (self.index + 1) % len(ring)
+        self.estimate = self.total/min(self.samples, len(ring))
+
+
+class ExponentialRssiFilter(RssiFilter):
+    __slots__ = ('alpha',)
+
+    def __init__(self, size, errorVariance, anomalyResetLimit):
+        self.alpha = 2/(max(size, 1) + 1)
+        RssiFilter.__init__(self, errorVariance, anomalyResetLimit)
+
+    def update(self, rssi):
+        if self.estimate is None:
+            self.estimate = float(rssi)
+        else:
+            self.estimate += self.alpha*(rssi - self.estimate)
+
+
+class MedianRssiFilter(RssiFilter):
+    __slots__ = ('ring', 'index', 'ordered')
+
+    def __init__(self, size, errorVariance, anomalyResetLimit):
+        self.ring = array('b', bytes(max(size, 1)))
+        RssiFilter.__init__(self, errorVariance, anomalyResetLimit)
+
+    def reset(self):
+        RssiFilter.reset(self)
+        self.index = 0
+        self.ordered = []
+
+    def update(self, rssi):
+        ring = self.ring
+        ordered = self.ordered
+        if self.samples > len(ring):
+            del ordered[bisect_left(ordered, ring[self.index])]
+        ring[self.index] = rssi
+        insort(ordered, rssi)
+        self.index = (self.index + 1) % len(ring)
+        middle = len(ordered)//2
+        self.estimate = ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle])/2
+
+
+class KalmanRssiFilter(RssiFilter):
+    __slots__ = ('processNoise', 'measurementNoise', 'covariance')
+
+    def __init__(self, processNoise, measurementNoise, errorVariance, anomalyResetLimit):
+        self.processNoise = processNoise
+        self.measurementNoise = measurementNoise
+        RssiFilter.__init__(self, errorVariance, anomalyResetLimit)
+
+    def reset(self):
+        RssiFilter.reset(self)
+        self.covariance = 0.0
+
+    def update(self, rssi):
+        if self.estimate is None:
+            self.estimate = float(rssi)
+            self.covariance = self.measurementNoise
+            return
+        covariance = self.covariance + self.processNoise
+        gain = covariance/(covariance + self.measurementNoise)
+        self.estimate += gain*(rssi - self.estimate)
+        self.covariance = (1 - gain)*covariance
+
+
+def createRssiFilter(config):
+    """The filter btle_rssi_filter picks, set up from the module config"""
+    kind = config['BtleRssiFilter']
+    size = config['BtleRssiMaxSampleSize']
+    errorVariance = config['BtleRssiErrorVariance']
+    anomalyResetLimit = config['BtleAnomalyResetLimit']
+    if kind == AVERAGE:
+        return MovingAverageRssiFilter(size, errorVariance, anomalyResetLimit)
+    elif kind == EMA:
+        return ExponentialRssiFilter(size, errorVariance, anomalyResetLimit)
+    elif kind == MEDIAN:
+        return MedianRssiFilter(size, errorVariance, anomalyResetLimit)
+    elif kind == KALMAN:
+        return KalmanRssiFilter(config['BtleRssiKalmanProcessNoise'], config['BtleRssiKalmanMeasurementNoise'],
+            errorVariance, anomalyResetLimit)
+    raise ValueError("rssi filter must be one of %s, not %s" % (', '.join(RSSI_FILTERS), kind))
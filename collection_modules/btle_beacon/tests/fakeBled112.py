@@ -0,0 +1,60 @@
+"""
+A BLED112 stand-in on a pty for the reader tests.
+
+The scanner opens the slave end like a serial port.  A thread on the master
+end answers every BGAPI command with a successful response, the way
+beaconGenerator does on a pty, and records which commands came in.  send()
+writes events such as scan responses to the scanner.
+"""
+
+import os
+import select
+import threading
+import tty
+from simplesensor.collection_modules.btle_beacon.benchmarks.beaconGenerator import commandResponse
+
+
+class FakeBled112(object):
+
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.commands = [] # (class, command) of every command received, in order
+        self.commandReceived = threading.Condition()
+        self.alive = True
+        self.thread = threading.Thread(target=self.answerCommands)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def answerCommands(self):
+        buffer = b''
+        while self.alive:
+            if not select.select([self.master], [], [], 0.05)[0]:
+                continue
+            try:
+                buffer += os.read(self.master, 256)
+            except OSError:
+                return
+            while len(buffer) >= 4 and len(buffer) >= 4 + (((buffer[0] & 0x07) << 8) | buffer[1]):
+                length = 4 + (((buffer[0] & 0x07) << 8) | buffer[1])
+                command, buffer = buffer[:length], buffer[length:]
+                os.write(self.master, commandResponse(command))
+                with self.commandReceived:
+                    self.commands.append((command[2], command[3]))
+                    self.commandReceived.notify_all()
+
+    def waitForCommands(self, count, timeout=5):
+        """Wait until count commands came in, returns whether they did"""
+        with self.commandReceived:
+            return self.commandReceived.wait_for(lambda: len(self.commands) >= count, timeout)
+
+    def send(self, data):
+        os.write(self.master, data)
+
+    def close(self):
+        self.alive = False
+        self.thread.join()
+        os.close(self.master)
+        os.close(self.slave)
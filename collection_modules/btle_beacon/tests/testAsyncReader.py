@@ -0,0 +1,110 @@
+"""
+The asyncio reader against a BLED112 stand-in on a pty, through the real
+pyserial-asyncio transport.
+
+    python -m unittest simplesensor.collection_modules.btle_beacon.tests.testAsyncReader
+"""
+
+import asyncio
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+import unittest
+from simplesensor.collection_modules.btle_beacon import moduleConfigLoader as configLoader
+from simplesensor.collection_modules.btle_beacon.benchmarks.replayBenchmark import drain
+from simplesensor.collection_modules.btle_beacon.benchmarks.dispatchBenchmark import scanResponsePacket
+from simplesensor.collection_modules.btle_beacon.tests.fakeBled112 import FakeBled112
+
+try:
+    import serial_asyncio
+    from simplesensor.collection_modules.btle_beacon.devices.bluegiga.btleAsyncCollectionPoint import BtleAsyncCollectionPoint
+    HAVE_SERIAL_ASYNCIO = True
+except ImportError:
+    HAVE_SERIAL_ASYNCIO = False
+
+# collectionPoint imports the reader as devices.bluegiga.btleThread, relative to the module folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from simplesensor.collection_modules.btle_beacon.collectionPoint import BtleCollectionPoint
+
+
+@unittest.skipUnless(os.name == 'posix' and HAVE_SERIAL_ASYNCIO, 'needs a pty and pyserial-asyncio')
+class AsyncCollectionPointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loggingQueue = mp.Queue()
+        self.stopDraining = drain(self.loggingQueue)
+        self.config = configLoader.load(self.loggingQueue, __name__)
+        self.device = FakeBled112()
+
+    def tearDown(self):
+        self.device.close()
+        self.stopDraining()
+
+    def testStartSendsScanSetup(self):
+        collectionPoint = BtleAsyncCollectionPoint(lambda sender, args: None, self.config, self.loggingQueue,
+            deviceId=self.device.port)
+
+        async def start():
+            await asyncio.wait_for(collectionPoint.start(), 10)
+            collectionPoint.stop()
+            await collectionPoint.waitClosed()
+        asyncio.run(start())
+
+        # every setup command was answered, in the order the scanner sends them
+        expected = [(command[2], command[3]) for command in collectionPoint.scanSetupCommands()]
+        self.assertEqual(self.device.commands, expected)
+
+
+@unittest.skipUnless(os.name == 'posix' and HAVE_SERIAL_ASYNCIO, 'needs a pty and pyserial-asyncio')
+class AsyncReaderModeTest(unittest.TestCase):
+    """btle_reader_mode asyncio, every device on the one event loop thread of BtleCollectionPoint"""
+
+    def setUp(self):
+        self.loggingQueue = mp.Queue()
+        self.stopDraining = drain(self.loggingQueue)
+        self.devices = [FakeBled112(), FakeBled112()]
+
+    def tearDown(self):
+        for device in self.devices:
+            device.close()
+        self.stopDraining()
+
+    def testDevicesScanAndDeliverAdverts(self):
+        collectionPoint = BtleCollectionPoint({}, queue.Queue(), queue.Queue(), self.loggingQueue)
+        config = collectionPoint.moduleConfig
+        config['BtleReaderMode'] = 'asyncio'
+        config['BtleDeviceIds'] = [device.port for device in self.devices]
+        # the readers only get their BGLib once the event loop starts them, count the commands on one of our own
+        scanner = BtleAsyncCollectionPoint(None, config, self.loggingQueue)
+        scanner.ble = scanner.createBGLib()
+        setupCommands = len(scanner.scanSetupCommands())
+        collectionPoint.startReaders()
+        try:
+            for device in self.devices:
+                self.assertTrue(device.waitForCommands(setupCommands), 'scan setup never reached %s' % device.port)
+            for i, device in enumerate(self.devices):
+                device.send(scanResponsePacket(bytes([i + 1])*6, -60, config['BtleAdvertisingMajor'],
+                    config['BtleAdvertisingMinor'], -59))
+
+            # each device's advert comes through in a batch once the batch timeout passes
+            heardBy = set()
+            deadline = time.time() + 5
+            while len(heardBy) < len(self.devices) and time.time() < deadline:
+                try:
+                    batch = collectionPoint.queueBLE.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                heardBy.add(batch.deviceId)
+            self.assertEqual(heardBy, set(config['BtleDeviceIds']))
+        finally:
+            for btleThread in collectionPoint.btleThreads:
+                btleThread.stop()
+            for BLEThread in collectionPoint.BLEThreads:
+                BLEThread.join(5)
+        self.assertFalse(any(BLEThread.is_alive() for BLEThread in collectionPoint.BLEThreads))
+
+
+if __name__ == '__main__':
+    unittest.main()